@@ -0,0 +1,119 @@
+import secrets
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.router import BankOfferResponse, naive_utc
+from src.bot.broadcast import create_broadcast
+from src.config.settings import settings
+from src.db.database import get_db, get_read_db
+from src.db.export import EXPORT_TABLES, export_filename, export_table, log_progress
+from src.db.models import Broadcast
+from src.db.queries import bank_offers_by_time
+
+
+async def verify_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Проверка токена admin API; без настроенного токена admin API выключено"""
+    if not settings.admin_api_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_api_token):
+        raise HTTPException(status_code=403, detail="Доступ запрещен")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(verify_admin_token)])
+
+
+class BroadcastRequest(BaseModel):
+    message: str = Field(..., min_length=1, max_length=4096, description="Текст; переводится на язык получателя")
+    language_code: Optional[str] = Field(None, description="Только пользователи с этим языком")
+    min_score: Optional[int] = Field(None, ge=0, description="Только пользователи с баллом не ниже")
+
+
+class BroadcastResponse(BaseModel):
+    id: int
+    message: str
+    language_code: Optional[str] = None
+    min_score: Optional[int] = None
+    last_user_id: int
+    sent_count: int
+    blocked_count: int
+    failed_count: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
+
+
+@router.get("/export/{table}")
+async def export(table: str, format: Literal["csv", "parquet"] = "csv"):
+    """
+    Потоковая выгрузка таблицы для аналитики
+
+    CSV отдается сжатым gzip, Parquet - группами строк по
+    `export_chunk_rows`. Таблица не загружается в память целиком.
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail="Таблица не найдена")
+
+    media_type = "application/gzip" if format == "csv" else "application/vnd.apache.parquet"
+    return StreamingResponse(
+        export_table(table, format, log_progress()),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(table, format)}"'},
+    )
+
+
+@router.get("/banks/{bank_code}/offers", response_model=List[BankOfferResponse])
+async def bank_offers(
+    bank_code: str,
+    db: AsyncSession = Depends(get_read_db),
+    since: Optional[datetime] = Query(None, description="Начало периода, по умолчанию - сутки назад"),
+    until: Optional[datetime] = Query(None, description="Конец периода, по умолчанию - сейчас"),
+    limit: int = Query(100, ge=1, le=1000, description="Не больше ответов"),
+):
+    """Ответы банка за период, от новых к старым"""
+    until = naive_utc(until) if until else datetime.utcnow()
+    since = naive_utc(since) if since else until - timedelta(days=1)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="Начало периода должно быть раньше конца")
+
+    result = await db.execute(bank_offers_by_time(bank_code, since, until, limit))
+    return [BankOfferResponse.model_validate(offer, from_attributes=True) for offer in result.scalars()]
+
+
+@router.post("/broadcasts", response_model=BroadcastResponse, status_code=201)
+async def start_broadcast(request: BroadcastRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Запуск рассылки
+
+    Рассылку выполняют процессы бота в фоне; прогресс - в GET /admin/broadcasts/{id}.
+    """
+    broadcast = await create_broadcast(db, request.message, request.language_code, request.min_score)
+    await db.commit()
+    return BroadcastResponse.model_validate(broadcast, from_attributes=True)
+
+
+@router.get("/broadcasts/{broadcast_id}", response_model=BroadcastResponse)
+async def get_broadcast(broadcast_id: int, db: AsyncSession = Depends(get_db)):
+    """Прогресс рассылки"""
+    broadcast = await db.get(Broadcast, broadcast_id)
+    if broadcast is None:
+        raise HTTPException(status_code=404, detail="Рассылка не найдена")
+    return BroadcastResponse.model_validate(broadcast, from_attributes=True)
+
+
+@router.post("/broadcasts/{broadcast_id}/cancel", response_model=BroadcastResponse)
+async def cancel_broadcast(broadcast_id: int, db: AsyncSession = Depends(get_db)):
+    """Остановка рассылки: текущая страница досылается, следующие - нет"""
+    result = await db.execute(select(Broadcast).where(Broadcast.id == broadcast_id).with_for_update())
+    broadcast = result.scalar_one_or_none()
+    if broadcast is None:
+        raise HTTPException(status_code=404, detail="Рассылка не найдена")
+    if broadcast.finished_at is None and broadcast.cancelled_at is None:
+        broadcast.cancelled_at = datetime.utcnow()
+        await db.commit()
+    return BroadcastResponse.model_validate(broadcast, from_attributes=True)
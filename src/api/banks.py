@@ -0,0 +1,370 @@
+import asyncio
+import logging
+import secrets
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+from fastapi import APIRouter, Header, HTTPException, Request
+from prometheus_client import Counter, Gauge
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import select, update
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, InterfaceError, OperationalError
+
+from src.bot.middleware.send_limit import SendPriority, send_as
+from src.bot.utils import format_bank_offers
+from src.config.settings import settings
+from src.core.banks import BankDecision
+from src.core.enums import BankOfferStatus, LoanStatus
+from src.db.database import get_db_context
+from src.db.jobs import JobHandler, new_job
+from src.db.models import LoanApplication, User
+from src.db.queries import approved_offer_counts, insert_bank_offers
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/banks")
+
+DECISIONS = Counter("bank_decisions_total", "Decisions pushed by partner banks", ["outcome"])
+DECISIONS_PENDING = Gauge("bank_decisions_pending", "Accepted bank decisions not yet written to the database")
+
+# Ответ банка: (ID заявки, решение)
+Decision = Tuple[int, BankDecision]
+# Новые одобрения заявки: (telegram_id, язык, предложения)
+Approval = Tuple[int, str, List[BankDecision]]
+
+# Уведомления о предложениях, записанных процессом API без бота
+BANK_OFFERS_JOB = "bank_offers"
+
+# Пределы колонок bank_offers: значение вне них база отвергнет вместе со всей пачкой
+INT4_MAX = 2**31 - 1
+AMOUNT_MAX = Decimal(10) ** 13  # Numeric(15, 2)
+
+# Ошибки соединения с базой: пачка повторяется, пока база не вернется
+RETRYABLE_ERRORS = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+# Классы SQLSTATE: 08 - соединение, 57 - остановка сервера; 22 - данные, 23 - ограничения
+RETRYABLE_SQLSTATES = ("08", "57")
+REJECTED_SQLSTATES = ("22", "23")
+
+
+def _sqlstate(error: DBAPIError) -> str:
+    # asyncpg-диалект SQLAlchemy отдает ошибки данных общим DBAPIError: класс виден только по коду
+    return getattr(error.orig, "sqlstate", None) or ""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Ошибка соединения с базой: повтор той же пачки может пройти"""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    return isinstance(error, DBAPIError) and (
+        error.connection_invalidated or _sqlstate(error)[:2] in RETRYABLE_SQLSTATES
+    )
+
+
+def is_rejected(error: Exception) -> bool:
+    """База отвергла данные пачки: повтор без изменений не пройдет"""
+    if isinstance(error, (DataError, IntegrityError)):
+        return True
+    return isinstance(error, DBAPIError) and _sqlstate(error)[:2] in REJECTED_SQLSTATES
+
+
+class BankDecisionIn(BaseModel):
+    application_id: int = Field(..., gt=0, le=INT4_MAX)
+    status: BankOfferStatus
+    annual_rate: Optional[Decimal] = Field(None, ge=0, le=100)
+    amount: Optional[Decimal] = Field(None, gt=0, lt=AMOUNT_MAX)
+    term_months: Optional[int] = Field(None, gt=0, le=INT4_MAX)
+
+    @model_validator(mode="after")
+    def check_offer(self) -> "BankDecisionIn":
+        if self.status == BankOfferStatus.APPROVED and self.annual_rate is None:
+            raise ValueError("annual_rate is required for an approved decision")
+        return self
+
+
+class BankDecisionsRequest(BaseModel):
+    decisions: List[BankDecisionIn] = Field(..., min_length=1, max_length=1000)
+
+
+async def notify_offers(bot: Bot, approvals: Iterable[Approval]) -> None:
+    """Уведомления о новых предложениях; темп задает SendLimitMiddleware"""
+    from src.bot.i18n import simple_gettext
+
+    async def send(telegram_id: int, lang_code: str, offers: List[BankDecision]) -> None:
+        text = format_bank_offers(offers, lambda msg: simple_gettext(lang_code, msg))
+        try:
+            await bot.send_message(telegram_id, text, parse_mode="Markdown")
+        except TelegramAPIError as e:
+            # Решение уже сохранено - пользователь увидит его в /my_app
+            logger.warning(f"Bank offer notification to {telegram_id} failed: {e}")
+
+    with send_as(SendPriority.NOTIFICATION):
+        await asyncio.gather(*(send(*approval) for approval in approvals))
+
+
+def bank_offers_payload(approvals: Iterable[Approval]) -> Dict[str, Any]:
+    """Параметры задачи BANK_OFFERS_JOB"""
+    return {
+        "approvals": [
+            {
+                "telegram_id": telegram_id,
+                "lang_code": lang_code,
+                "offers": [{"bank_code": offer.bank_code, "annual_rate": str(offer.annual_rate)} for offer in offers],
+            }
+            for telegram_id, lang_code, offers in approvals
+        ]
+    }
+
+
+def bank_offers_job(bot: Bot) -> JobHandler:
+    """Обработчик задачи BANK_OFFERS_JOB для JobWorker"""
+    async def run(payload: dict) -> None:
+        await notify_offers(bot, [
+            (
+                approval["telegram_id"],
+                approval["lang_code"],
+                [
+                    BankDecision(offer["bank_code"], BankOfferStatus.APPROVED, annual_rate=Decimal(offer["annual_rate"]))
+                    for offer in approval["offers"]
+                ],
+            )
+            for approval in payload["approvals"]
+        ])
+    return run
+
+
+class BankDecisionIngestion:
+    """
+    Прием решений партнерских банков
+
+    Банки присылают решения пачками после своих пакетных расчетов.
+    Эндпоинт только кладет решения в буфер и отвечает 202; фоновая задача
+    пишет накопленное пачками до bank_ingest_batch_size: четыре запроса
+    на пачку вместо транзакции на каждое решение. Переполненный буфер
+    означает, что запись не успевает: эндпоинт отвечает 503, банк повторит.
+
+    Уведомления отправляет bot (бот webhook-приема этого процесса). Без
+    него уведомления ставятся задачей BANK_OFFERS_JOB в той же транзакции:
+    их отправят процессы бота в пределах своей доли send_global_rate.
+    """
+
+    def __init__(
+        self,
+        bot: Optional[Bot],
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> None:
+        self.bot = bot
+        self.batch_size = batch_size or settings.bank_ingest_batch_size
+        self.flush_seconds = settings.bank_ingest_flush_seconds if flush_seconds is None else flush_seconds
+        self._queue: asyncio.Queue[Decision] = asyncio.Queue(queue_size or settings.bank_ingest_queue_size)
+        self._writer: Optional[asyncio.Task] = None
+        self._notifications: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, decisions: List[Decision]) -> bool:
+        """Решения одного запроса принимаются целиком или не принимаются"""
+        if self._queue.maxsize - self._queue.qsize() < len(decisions):
+            DECISIONS.labels("rejected").inc(len(decisions))
+            return False
+        for decision in decisions:
+            self._queue.put_nowait(decision)
+        DECISIONS_PENDING.set(self._queue.qsize())
+        return True
+
+    async def start(self) -> None:
+        self._writer = asyncio.create_task(self.run())
+        logger.info("Bank decision ingestion started")
+
+    async def stop(self, drain_seconds: Optional[float] = None) -> None:
+        """Остановка: принятые решения дописываются, уведомления досылаются"""
+        drain_seconds = settings.update_drain_seconds if drain_seconds is None else drain_seconds
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_seconds)
+        except asyncio.TimeoutError:
+            logger.error(f"Bank decision ingestion stopped with {len(self)} decisions not written")
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+        if self._notifications:
+            await asyncio.wait(self._notifications, timeout=drain_seconds)
+        logger.info("Bank decision ingestion stopped")
+
+    async def _next_batch(self) -> List[Decision]:
+        """Пачка решений: ждем первое, затем копим до flush_seconds или batch_size"""
+        batch = [await self._queue.get()]
+        if self._queue.qsize() + 1 < self.batch_size:
+            await asyncio.sleep(self.flush_seconds)
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def apply(self, batch: List[Decision]) -> Dict[int, Approval]:
+        """
+        Запись пачки решений в одной транзакции
+
+        Решения по неизвестным и не отправленным в банк заявкам
+        отбрасываются. Повтор уже сохраненного решения ничего не меняет.
+
+        Returns:
+            Новые одобрения по заявкам: {ID заявки: (telegram_id, язык, предложения)}
+        """
+        from src.bot.i18n import simple_gettext
+
+        # Повтор внутри пачки: остается последнее решение банка
+        decisions = {(application_id, decision.bank_code): decision for application_id, decision in batch}
+        application_ids = {application_id for application_id, _ in decisions}
+
+        async with get_db_context() as db:
+            result = await db.execute(
+                select(LoanApplication.id, User.telegram_id, User.language_code)
+                .join(User, User.id == LoanApplication.user_id)
+                .where(LoanApplication.id.in_(application_ids))
+                .where(LoanApplication.status == LoanStatus.SENT)
+            )
+            recipients = {row.id: (row.telegram_id, row.language_code or "ru") for row in result}
+
+            known = [(key[0], decision) for key, decision in decisions.items() if key[0] in recipients]
+            DECISIONS.labels("unknown_application").inc(len(decisions) - len(known))
+            if not known:
+                return {}
+
+            now = datetime.utcnow()
+            stored = (await db.execute(insert_bank_offers(known, now))).all()
+            DECISIONS.labels("duplicate").inc(len(known) - len(stored))
+            DECISIONS.labels("stored").inc(len(stored))
+            if not stored:
+                return {}
+
+            # Итог в заявке считается по всем ответам, а не только по этой пачке
+            counts = await db.execute(approved_offer_counts({row.application_id for row in stored}))
+            params = []
+            for application_id, approved in counts:
+                lang_code = recipients[application_id][1]
+                bank_response = (
+                    simple_gettext(lang_code, 'Approved by {count} banks').format(count=approved)
+                    if approved else simple_gettext(lang_code, 'Declined')
+                )
+                params.append({"id": application_id, "bank_response": bank_response, "bank_response_at": now})
+            # UPDATE по первичному ключу с пачкой параметров - один executemany
+            await db.execute(update(LoanApplication), params)
+
+            offers: Dict[int, List[BankDecision]] = defaultdict(list)
+            for row in stored:
+                if row.status == BankOfferStatus.APPROVED:
+                    offers[row.application_id].append(
+                        BankDecision(row.bank_code, row.status, annual_rate=row.annual_rate)
+                    )
+            approvals = {
+                application_id: (*recipients[application_id], application_offers)
+                for application_id, application_offers in offers.items()
+            }
+            if approvals and self.bot is None:
+                db.add(new_job(BANK_OFFERS_JOB, bank_offers_payload(approvals.values())))
+        return approvals
+
+    async def apply_or_split(self, batch: List[Decision]) -> Dict[int, Approval]:
+        """
+        Запись пачки; решения, которые база отвергает, отбрасываются
+
+        Пачка с ошибкой данных делится пополам, пока отвергнутое решение
+        не останется одно: остальные решения пачки записываются.
+        Ошибки соединения пробрасываются - пачка повторяется целиком.
+        """
+        try:
+            return await self.apply(batch)
+        except DBAPIError as e:
+            if not is_rejected(e):
+                raise
+            if len(batch) == 1:
+                DECISIONS.labels("rejected_by_db").inc()
+                logger.error(f"Bank decision {batch[0]} rejected by the database, dropped: {e.orig}")
+                return {}
+        middle = len(batch) // 2
+        approvals = await self.apply_or_split(batch[:middle])
+        approvals.update(await self.apply_or_split(batch[middle:]))
+        return approvals
+
+    async def run(self) -> None:
+        """Фоновая запись; при потере соединения с БД пачка повторяется, буфер тем временем копится"""
+        while True:
+            batch = await self._next_batch()
+            while True:
+                try:
+                    approvals = await self.apply_or_split(batch)
+                    break
+                except Exception as e:
+                    if not is_retryable(e):
+                        # Повтор не поможет: пачка отбрасывается, а не блокирует прием
+                        approvals = {}
+                        DECISIONS.labels("failed").inc(len(batch))
+                        logger.error(f"Bank decision batch of {len(batch)} dropped: {e}", exc_info=True)
+                        break
+                    logger.error(f"Bank decision batch of {len(batch)} failed, retrying: {e}", exc_info=True)
+                    await asyncio.sleep(settings.bank_ingest_retry_seconds)
+
+            for _ in batch:
+                self._queue.task_done()
+            DECISIONS_PENDING.set(self._queue.qsize())
+
+            if approvals and self.bot is not None:
+                task = asyncio.create_task(notify_offers(self.bot, approvals.values()))
+                self._notifications.add(task)
+                task.add_done_callback(self._notifications.discard)
+
+
+def create_ingestion(bot: Optional[Bot] = None) -> BankDecisionIngestion:
+    """
+    Прием решений
+
+    Args:
+        bot: Бот webhook-приема этого процесса; без него уведомления
+            отправляют процессы бота (задачи BANK_OFFERS_JOB)
+    """
+    return BankDecisionIngestion(bot)
+
+
+@router.post("/{bank_code}/decisions", status_code=202)
+async def push_decisions(
+    bank_code: str,
+    payload: BankDecisionsRequest,
+    request: Request,
+    x_bank_token: Optional[str] = Header(None),
+):
+    """
+    Решения банка по заявкам
+
+    Ответ 202 означает, что решения приняты в буфер; запись в базу
+    и уведомление пользователей происходят в фоне.
+    """
+    ingestion: Optional[BankDecisionIngestion] = getattr(request.app.state, "bank_decisions", None)
+    token = settings.bank_api_tokens.get(bank_code)
+    if ingestion is None or not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_bank_token or not secrets.compare_digest(x_bank_token.encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Доступ запрещен")
+
+    decisions = [
+        (
+            decision.application_id,
+            BankDecision(
+                bank_code,
+                decision.status,
+                annual_rate=decision.annual_rate,
+                amount=decision.amount,
+                term_months=decision.term_months,
+            ),
+        )
+        for decision in payload.decisions
+    ]
+    if not ingestion.submit(decisions):
+        logger.warning(f"Bank decision buffer is full, {len(decisions)} decisions from {bank_code} rejected")
+        raise HTTPException(status_code=503, detail="Decision buffer is full")
+
+    return {"accepted": len(decisions)}
@@ -4,18 +4,35 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_client import make_asgi_app
 
+from src.api import admin, banks, webhook
 from src.api.router import router
 from src.config.settings import settings
-from src.db.database import close_db, init_db
+from src.db.database import check_schema_version, close_db
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Управление жизненным циклом приложения"""
     # Startup
-    await init_db()
+    await check_schema_version()
+    # Webhook бота принимается этим же приложением
+    app.state.webhook = webhook.create_ingestion() if settings.webhook_enabled else None
+    if app.state.webhook is not None:
+        await app.state.webhook.start()
+    # Решения банков принимаются, если банкам выданы токены. Уведомления
+    # отправляет этот процесс, только если он сам и есть бот (webhook без
+    # процессов бота): иначе лимит send_global_rate превысил бы лишний отправитель
+    app.state.bank_decisions = None
+    if settings.bank_api_tokens:
+        sends_as_bot = app.state.webhook is not None and settings.bot_workers == 1
+        app.state.bank_decisions = banks.create_ingestion(app.state.webhook.bot if sends_as_bot else None)
+        await app.state.bank_decisions.start()
     yield
     # Shutdown
+    if app.state.bank_decisions is not None:
+        await app.state.bank_decisions.stop()
+    if app.state.webhook is not None:
+        await app.state.webhook.stop()
     await close_db()
 
 
@@ -39,6 +56,9 @@ app.add_middleware(
 
 # Подключаем роутеры
 app.include_router(router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1", tags=["admin"])
+app.include_router(banks.router, prefix="/api/v1", tags=["banks"])
+app.include_router(webhook.router)
 
 # Метрики Prometheus
 if settings.metrics_enabled:
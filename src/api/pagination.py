@@ -0,0 +1,34 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """
+    Кодирование позиции keyset-пагинации в непрозрачный курсор
+
+    Args:
+        created_at: Дата создания последнего элемента страницы
+        item_id: ID последнего элемента страницы
+
+    Returns:
+        Курсор для передачи клиенту
+    """
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Декодирование курсора
+
+    Raises:
+        ValueError: Если курсор поврежден
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Некорректный курсор") from e
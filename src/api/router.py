@@ -1,17 +1,20 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List, Optional
+from typing import AsyncGenerator, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import select
+from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.enums import LoanStatus, LoanType
+from src.api.pagination import decode_cursor, encode_cursor
+from src.core.enums import BankOfferStatus, LoanStatus, LoanType
 from src.core.pdn import PDNCalculator
 from src.core.scoring import PersonalData, ScoringCalculator
-from src.db.database import get_db
-from src.db.models import LoanApplication, PersonalData as PersonalDataModel, User
+from src.db.database import get_read_db, get_read_db_context
+from src.db.models import PersonalData as PersonalDataModel
+from src.db.queries import application_offers, score_history_buckets, user_applications, user_by_telegram_id
 
 router = APIRouter()
 
@@ -67,6 +70,29 @@ class LoanApplicationResponse(BaseModel):
     created_at: datetime
 
 
+class LoanApplicationPage(BaseModel):
+    items: List[LoanApplicationResponse]
+    next_cursor: Optional[str] = None
+
+
+class BankOfferResponse(BaseModel):
+    application_id: int
+    bank_code: str
+    status: BankOfferStatus
+    annual_rate: Optional[Decimal] = None
+    amount: Optional[Decimal] = None
+    term_months: Optional[int] = None
+    received_at: datetime
+
+
+class ScoreHistoryPoint(BaseModel):
+    bucket: datetime
+    min_score: int
+    max_score: int
+    last_score: int
+    points: int
+
+
 @router.post("/calculate/pdn", response_model=PDNCalculationResponse)
 async def calculate_pdn(request: PDNCalculationRequest):
     """Расчет показателя долговой нагрузки"""
@@ -130,51 +156,125 @@ async def calculate_scoring(request: ScoringRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/users/{telegram_id}/applications", response_model=List[LoanApplicationResponse])
+@router.get("/users/{telegram_id}/applications", response_model=LoanApplicationPage)
 async def get_user_applications(
     telegram_id: int,
-    db: AsyncSession = Depends(get_db),
-    include_archived: bool = False
+    db: AsyncSession = Depends(get_read_db),
+    include_archived: bool = False,
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    stream: bool = Query(False, description="Потоковая выдача в формате JSON Lines"),
 ):
-    """Получение заявок пользователя"""
+    """
+    Получение заявок пользователя
+
+    Заявки отдаются от новых к старым страницами по `limit` штук,
+    следующая страница запрашивается по `next_cursor`. В режиме `stream`
+    все заявки начиная с курсора отдаются потоком JSON Lines без `limit`.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     # Находим пользователя
-    result = await db.execute(
-        select(User).where(User.telegram_id == telegram_id)
-    )
+    result = await db.execute(user_by_telegram_id(telegram_id))
     user = result.scalar_one_or_none()
     
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     
-    # Получаем заявки
-    query = select(LoanApplication).where(LoanApplication.user_id == user.id)
-    
-    if not include_archived:
-        query = query.where(LoanApplication.is_archived == False)
+    query = user_applications(user.id, include_archived=include_archived, after=after)
     
-    query = query.order_by(LoanApplication.created_at.desc())
+    if stream:
+        return StreamingResponse(
+            stream_applications(query, telegram_id),
+            media_type="application/x-ndjson",
+        )
     
-    result = await db.execute(query)
+    # Берем на одну запись больше, чтобы понять, есть ли следующая страница
+    result = await db.execute(query.limit(limit + 1))
     applications = result.scalars().all()
     
-    return [
-        LoanApplicationResponse(
-            id=app.id,
-            loan_type=app.loan_type,
-            amount=app.amount,
-            annual_rate=app.annual_rate,
-            term_months=app.term_months,
-            monthly_payment=app.monthly_payment,
-            pdn_value=app.pdn_value,
-            status=app.status,
-            created_at=app.created_at
-        )
-        for app in applications
-    ]
+    next_cursor = None
+    if len(applications) > limit:
+        applications = applications[:limit]
+        last = applications[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    return LoanApplicationPage(
+        items=[
+            LoanApplicationResponse.model_validate(app, from_attributes=True)
+            for app in applications
+        ],
+        next_cursor=next_cursor,
+    )
+
 
+async def stream_applications(query: Select, telegram_id: int) -> AsyncGenerator[str, None]:
+    """Потоковая выдача заявок через серверный курсор"""
+    # Сессия зависимости закрывается до отправки ответа, поэтому открываем свою
+    async with get_read_db_context(telegram_id) as db:
+        applications = await db.stream_scalars(query.execution_options(yield_per=500))
+        async for app in applications:
+            item = LoanApplicationResponse.model_validate(app, from_attributes=True)
+            yield item.model_dump_json() + "\n"
+
+
+@router.get("/users/{telegram_id}/applications/{application_id}/offers", response_model=List[BankOfferResponse])
+async def get_application_offers(
+    telegram_id: int,
+    application_id: int,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Предложения банков по заявке
 
-@router.get("/webhook/{webhook_secret}", include_in_schema=False)
-async def telegram_webhook(webhook_secret: str):
-    """Эндпоинт для Telegram webhook"""
-    # Этот эндпоинт будет использоваться ботом
-    return {"status": "ok"}
\ No newline at end of file
+    Сначала одобренные по возрастанию ставки (первое - лучшее), затем отказы.
+    """
+    result = await db.execute(user_by_telegram_id(telegram_id))
+    user = result.scalar_one_or_none()
+    
+    if not user:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
+    
+    result = await db.execute(application_offers(user.id, application_id))
+    return [BankOfferResponse.model_validate(offer, from_attributes=True) for offer in result.scalars()]
+
+
+def naive_utc(moment: datetime) -> datetime:
+    """История хранится в UTC без часового пояса"""
+    if moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+@router.get("/users/{telegram_id}/score-history", response_model=List[ScoreHistoryPoint])
+async def get_score_history(
+    telegram_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    since: Optional[datetime] = Query(None, description="Начало периода, по умолчанию - год назад"),
+    until: Optional[datetime] = Query(None, description="Конец периода, по умолчанию - сейчас"),
+    bucket: Literal["day", "week", "month"] = Query("week", description="Интервал точек графика"),
+):
+    """
+    История скоринг-балла пользователя для графика
+
+    Каждая точка - интервал `bucket` с минимальным, максимальным
+    и последним баллом за интервал.
+    """
+    until = naive_utc(until) if until else datetime.utcnow()
+    since = naive_utc(since) if since else until - timedelta(days=365)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="Начало периода должно быть раньше конца")
+    
+    result = await db.execute(user_by_telegram_id(telegram_id))
+    user = result.scalar_one_or_none()
+    
+    if not user:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
+    
+    result = await db.execute(score_history_buckets(user.id, since, until, bucket))
+    return [ScoreHistoryPoint.model_validate(row, from_attributes=True) for row in result]
\ No newline at end of file
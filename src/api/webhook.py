@@ -0,0 +1,88 @@
+import logging
+import secrets
+from typing import List, Optional, Union
+
+from aiogram import Bot
+from aiogram.types import Update
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from src.bot.scheduler import UpdateScheduler
+from src.bot.shards import ShardRouter, create_scheduler
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+UpdateSink = Union[UpdateScheduler, ShardRouter]
+
+
+class WebhookIngestion:
+    """
+    Прием обновлений Telegram через webhook
+
+    Эндпоинт только передает обновление планировщику (UpdateScheduler или,
+    при нескольких процессах бота, ShardRouter) и сразу отвечает Telegram.
+    Переполненная очередь означает, что обработчики не успевают: эндпоинт
+    отвечает 503, и Telegram повторит доставку позже.
+    """
+
+    def __init__(self, bot: Bot, scheduler: UpdateSink, allowed_updates: List[str]) -> None:
+        self.bot = bot
+        self.scheduler = scheduler
+        self.allowed_updates = allowed_updates
+
+    async def start(self) -> None:
+        """Запуск планировщика и регистрация webhook"""
+        await self.scheduler.start()
+        await self.bot.set_webhook(
+            settings.webhook_url.rstrip("/") + settings.get_webhook_path(),
+            secret_token=settings.webhook_secret,
+            allowed_updates=self.allowed_updates,
+        )
+        logger.info("Webhook ingestion started")
+
+    async def stop(self) -> None:
+        """Остановка приема: webhook не удаляется - его обслуживают другие экземпляры API"""
+        try:
+            await self.scheduler.stop()
+        finally:
+            await self.bot.session.close()
+        logger.info("Webhook ingestion stopped")
+
+
+def create_ingestion() -> WebhookIngestion:
+    from src.bot.dispatcher import create_bot, create_dispatcher
+
+    bot = create_bot()
+    dp = create_dispatcher()
+    return WebhookIngestion(bot, create_scheduler(bot, dp), dp.resolve_used_update_types())
+
+
+@router.post("/webhook/{webhook_secret}", include_in_schema=False)
+async def telegram_webhook(
+    webhook_secret: str,
+    request: Request,
+    secret_token: Optional[str] = Header(None, alias="X-Telegram-Bot-Api-Secret-Token"),
+):
+    """Эндпоинт для Telegram webhook"""
+    ingestion: Optional[WebhookIngestion] = getattr(request.app.state, "webhook", None)
+    # Неверный секрет неотличим от несуществующего пути
+    if ingestion is None or not settings.webhook_secret:
+        raise HTTPException(status_code=404)
+    if not secrets.compare_digest(webhook_secret.encode(), settings.webhook_secret.encode()):
+        raise HTTPException(status_code=404)
+    if not secrets.compare_digest((secret_token or "").encode(), settings.webhook_secret.encode()):
+        raise HTTPException(status_code=403)
+
+    try:
+        update = Update.model_validate(await request.json(), context={"bot": ingestion.bot})
+    except ValueError as e:
+        # На 500 Telegram повторял бы доставку без конца: ответ 200, обновление отбрасывается
+        logger.error(f"Malformed webhook update dropped: {e}")
+        return {"status": "ignored"}
+    if not ingestion.scheduler.submit(update):
+        logger.warning(f"Update queue is full, update {update.update_id} rejected")
+        raise HTTPException(status_code=503, detail="Update queue is full")
+
+    return {"status": "ok"}
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError
+from prometheus_client import Counter
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.bot.middleware.send_limit import SendPriority, send_as
+from src.config.settings import settings
+from src.db.database import get_db_context
+from src.db.jobs import JobHandler, new_job
+from src.db.models import Broadcast, User
+from src.db.queries import broadcast_recipients
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_JOB = "broadcast"
+
+BROADCAST_MESSAGES = Counter("bot_broadcast_messages_total", "Broadcast messages by outcome", ["outcome"])
+
+
+@dataclass
+class PageResult:
+    """Итог отправки страницы получателей"""
+    sent: int = 0
+    failed: int = 0
+    blocked: List[int] = field(default_factory=list)  # users.id заблокировавших бота
+
+
+async def create_broadcast(
+    db: AsyncSession,
+    message: str,
+    language_code: Optional[str] = None,
+    min_score: Optional[int] = None,
+) -> Broadcast:
+    """
+    Рассылка и задача на ее выполнение в одной транзакции
+
+    Args:
+        db: Сессия БД
+        message: Исходный текст; переводится на язык получателя через simple_gettext
+        language_code: Только пользователи с этим языком
+        min_score: Только пользователи с баллом не ниже
+    """
+    broadcast = Broadcast(message=message, language_code=language_code, min_score=min_score, last_user_id=0)
+    db.add(broadcast)
+    await db.flush()
+    db.add(new_job(BROADCAST_JOB, {"broadcast_id": broadcast.id}))
+    return broadcast
+
+
+async def send_page(bot: Bot, recipients: Sequence[Row], render: Callable[[str], str]) -> PageResult:
+    """
+    Отправка страницы получателей
+
+    Все сообщения страницы ставятся в очередь сразу: темп задает
+    SendLimitMiddleware (общий лимит бота), рассылка идет с приоритетом
+    BULK и не задерживает ответы пользователям.
+    """
+    result = PageResult()
+
+    async def send(recipient: Row) -> None:
+        try:
+            # Текст рассылки - простой текст: "_" или "*" в нем не должны ломать разметку
+            await bot.send_message(recipient.telegram_id, render(recipient.language_code or "ru"), parse_mode=None)
+        except TelegramForbiddenError:
+            result.blocked.append(recipient.id)
+        except TelegramAPIError as e:
+            result.failed += 1
+            logger.debug(f"Broadcast message to {recipient.telegram_id} failed: {e}")
+        else:
+            result.sent += 1
+
+    with send_as(SendPriority.BULK):
+        await asyncio.gather(*(send(recipient) for recipient in recipients))
+
+    BROADCAST_MESSAGES.labels("sent").inc(result.sent)
+    BROADCAST_MESSAGES.labels("blocked").inc(len(result.blocked))
+    BROADCAST_MESSAGES.labels("failed").inc(result.failed)
+    return result
+
+
+async def run_broadcast(
+    bot: Bot,
+    broadcast_id: int,
+    batch_size: Optional[int] = None,
+    slice_seconds: Optional[float] = None,
+) -> None:
+    """
+    Выполнение рассылки в пределах одной задачи
+
+    Получатели читаются страницами по keyset users.id. После каждой
+    страницы в одной транзакции сохраняются позиция и счетчики и
+    отмечаются заблокировавшие бота пользователи: после сбоя повторно
+    отправляется не больше одной страницы. Через slice_seconds задача
+    ставит задачу-продолжение - аренда задачи не истекает посреди рассылки.
+    """
+    from src.bot.i18n import simple_gettext
+
+    batch_size = batch_size or settings.broadcast_batch_size
+    deadline = time.monotonic() + (slice_seconds or settings.broadcast_slice_seconds)
+    texts: Dict[str, str] = {}
+
+    # Текст переводится один раз на язык, а не на каждого получателя
+    def render(lang_code: str) -> str:
+        if lang_code not in texts:
+            texts[lang_code] = simple_gettext(lang_code, message)
+        return texts[lang_code]
+
+    while True:
+        async with get_db_context() as db:
+            result = await db.execute(select(Broadcast).where(Broadcast.id == broadcast_id))
+            broadcast = result.scalar_one_or_none()
+            if broadcast is None or broadcast.finished_at or broadcast.cancelled_at:
+                return
+
+            position = broadcast.last_user_id
+            message = broadcast.message
+            result = await db.execute(
+                broadcast_recipients(position, batch_size, broadcast.language_code, broadcast.min_score)
+            )
+            recipients = result.all()
+            if not recipients:
+                broadcast.finished_at = datetime.utcnow()
+                logger.info(
+                    f"Broadcast {broadcast_id} finished: {broadcast.sent_count} sent, "
+                    f"{broadcast.blocked_count} blocked, {broadcast.failed_count} failed"
+                )
+                return
+
+        page = await send_page(bot, recipients, render)
+
+        async with get_db_context() as db:
+            if page.blocked:
+                await db.execute(
+                    update(User).where(User.id.in_(page.blocked)).values(bot_blocked_at=datetime.utcnow())
+                )
+            # Позиция сверяется: если ее сдвинул другой запуск этой рассылки - уступаем ему
+            result = await db.execute(
+                update(Broadcast)
+                .where(Broadcast.id == broadcast_id)
+                .where(Broadcast.last_user_id == position)
+                .values(
+                    last_user_id=recipients[-1].id,
+                    sent_count=Broadcast.sent_count + page.sent,
+                    blocked_count=Broadcast.blocked_count + len(page.blocked),
+                    failed_count=Broadcast.failed_count + page.failed,
+                )
+            )
+            if result.rowcount == 0:
+                logger.warning(f"Broadcast {broadcast_id} was advanced by another run, stopping")
+                return
+
+            if time.monotonic() >= deadline:
+                db.add(new_job(BROADCAST_JOB, {"broadcast_id": broadcast_id}))
+                return
+
+
+def broadcast_job(bot: Bot) -> JobHandler:
+    """Обработчик задачи BROADCAST_JOB для JobWorker"""
+    async def run(payload: dict) -> None:
+        await run_broadcast(bot, payload["broadcast_id"])
+    return run
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import BotCommand
+
+from src.api import banks
+from src.bot import broadcast
+from src.bot.handlers import bank_flow, loan, onboarding, personal_data, referral, score, settings
+from src.bot.middleware.fsm import BufferedFSMContextMiddleware
+from src.bot.middleware.i18n import I18nMiddleware
+from src.bot.middleware.rate_limit import RateLimitMiddleware
+from src.bot.middleware.send_limit import SendLimitMiddleware
+from src.bot.storage.factory import create_storage
+from src.config.settings import settings as app_settings
+from src.db.archive import run_archiver
+from src.db.database import check_schema_version, close_db
+from src.db.jobs import JobWorker
+from src.db.redis import close_redis, get_redis
+from src.db.score_history import score_history_writer
+
+logger = logging.getLogger(__name__)
+
+BOT_COMMANDS = [
+    BotCommand(command="start", description="Начать работу с ботом"),
+    BotCommand(command="menu", description="Главное меню"),
+    BotCommand(command="my_app", description="Моя заявка"),
+    BotCommand(command="score", description="Мои показатели"),
+    BotCommand(command="invite", description="Реферальная программа"),
+    BotCommand(command="help", description="Помощь"),
+]
+
+
+async def on_startup(dispatcher: Dispatcher, bot: Bot):
+    """Действия при запуске бота"""
+    logger.info("Starting bot...")
+    await check_schema_version()
+    logger.info("Database schema is up to date")
+    
+    # Перенос архивных заявок из рабочей таблицы в фоне - в одном процессе бота
+    if dispatcher.workflow_data.get("shard", 0) == 0:
+        dispatcher["archiver"] = asyncio.create_task(run_archiver())
+    # Отложенная запись истории баллов
+    dispatcher["score_history"] = asyncio.create_task(score_history_writer.run())
+    # Отложенные задачи: очередь в scheduled_jobs общая для всех процессов бота
+    job_worker = JobWorker({
+        bank_flow.BANK_RESPONSE_JOB: bank_flow.bank_response_job(bot),
+        broadcast.BROADCAST_JOB: broadcast.broadcast_job(bot),
+        banks.BANK_OFFERS_JOB: banks.bank_offers_job(bot),
+    })
+    dispatcher["jobs"] = asyncio.create_task(job_worker.run())
+
+
+async def on_shutdown(dispatcher: Dispatcher):
+    """Действия при остановке бота"""
+    logger.info("Shutting down bot...")
+    archiver = dispatcher.workflow_data.pop("archiver", None)
+    if archiver is not None:
+        archiver.cancel()
+    # Прерванные задачи повторятся после аренды в этом или другом процессе
+    jobs = dispatcher.workflow_data.pop("jobs", None)
+    if jobs is not None:
+        jobs.cancel()
+        await asyncio.gather(jobs, return_exceptions=True)
+    # Писатель истории дописывает буфер при отмене - дожидаемся его до закрытия пула
+    history_writer = dispatcher.workflow_data.pop("score_history", None)
+    if history_writer is not None:
+        history_writer.cancel()
+        await asyncio.gather(history_writer, return_exceptions=True)
+    await close_redis()
+    await close_db()
+    logger.info("Database connection closed")
+
+
+def create_bot() -> Bot:
+    bot = Bot(token=app_settings.bot_token, parse_mode="Markdown")
+    # Исходящие сообщения - в пределах лимитов Telegram, с повтором после 429
+    bot.session.middleware(SendLimitMiddleware())
+    return bot
+
+
+def create_dispatcher() -> Dispatcher:
+    """Диспетчер со всеми middleware, роутерами и хуками - общий для polling и webhook"""
+    storage = create_storage()
+    dp = Dispatcher(storage=storage, disable_fsm=True)
+    # Лимит проверяется первым: отклоненное обновление не читает ни хранилище FSM,
+    # ни язык пользователя из базы
+    rate_limit_redis = get_redis() if app_settings.rate_limit_backend == "redis" else None
+    dp.update.outer_middleware(RateLimitMiddleware(redis=rate_limit_redis))
+    # FSM-контекст обновления: одно чтение и одна запись хранилища на шаг диалога.
+    # Хранилище закрывает сам Dispatcher (dp.fsm.close) до on_shutdown
+    dp.update.outer_middleware(BufferedFSMContextMiddleware(storage, dp.fsm.events_isolation))
+    
+    # Регистрация middleware
+    dp.message.middleware(I18nMiddleware())
+    dp.callback_query.middleware(I18nMiddleware())
+    
+    # Регистрация роутеров
+    dp.include_router(onboarding.router)
+    dp.include_router(loan.router)
+    dp.include_router(personal_data.router)
+    dp.include_router(referral.router)
+    dp.include_router(bank_flow.router)
+    dp.include_router(score.router)
+    dp.include_router(settings.router)
+    
+    # Регистрация хуков
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
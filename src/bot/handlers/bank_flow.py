@@ -1,18 +1,41 @@
-import asyncio
-import random
+import logging
 from datetime import datetime, timedelta
+from typing import List, Optional
 
-from aiogram import F, Router, types
+from aiogram import Bot, F, Router, types
+from aiogram.exceptions import TelegramAPIError
 from aiogram.fsm.context import FSMContext
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.keyboards import Keyboards
+from src.bot.middleware.send_limit import SendPriority, send_as
 from src.bot.states import BankFlowStates
+from src.bot.utils import format_bank_offers
 from src.config.settings import settings
-from src.core.enums import LoanStatus
+from src.core.banks import (
+    BankAdapter,
+    BankError,
+    BankRequest,
+    bank_names,
+    collect_offers,
+    create_bank_adapters,
+)
+from src.core.enums import BankOfferStatus, LoanStatus
 from src.db.database import get_db_context
-from src.db.models import LoanApplication, User
+from src.db.jobs import JobHandler, new_job
+from src.db.models import LoanApplication
+from src.db.queries import (
+    active_application,
+    application_by_id,
+    application_offers,
+    insert_bank_offers,
+    user_by_telegram_id,
+)
+
+logger = logging.getLogger(__name__)
+
+BANK_RESPONSE_JOB = "bank_response"
 
 router = Router(name="bank_flow")
 
@@ -23,7 +46,7 @@ async def start_send_to_bank(callback: types.CallbackQuery, state: FSMContext, _
     async with get_db_context() as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == callback.from_user.id)
+            user_by_telegram_id(callback.from_user.id)
         )
         user = result.scalar_one_or_none()
         
@@ -33,11 +56,7 @@ async def start_send_to_bank(callback: types.CallbackQuery, state: FSMContext, _
         
         # Получаем активную заявку
         result = await db.execute(
-            select(LoanApplication)
-            .where(LoanApplication.user_id == user.id)
-            .where(LoanApplication.is_archived == False)
-            .where(LoanApplication.status == LoanStatus.NEW)
-            .order_by(LoanApplication.created_at.desc())
+            active_application(user.id, status=LoanStatus.NEW)
         )
         application = result.scalar_one_or_none()
         
@@ -94,7 +113,7 @@ async def confirm_send_to_bank(callback: types.CallbackQuery, state: FSMContext,
     async with get_db_context() as db:
         # Обновляем статус заявки
         result = await db.execute(
-            select(LoanApplication).where(LoanApplication.id == application_id)
+            application_by_id(application_id)
         )
         application = result.scalar_one_or_none()
         
@@ -104,6 +123,12 @@ async def confirm_send_to_bank(callback: types.CallbackQuery, state: FSMContext,
         
         application.status = LoanStatus.SENT
         application.sent_to_bank_at = datetime.utcnow()
+        # Ответ банка - отложенная задача в той же транзакции: переживает перезапуск бота
+        db.add(new_job(
+            BANK_RESPONSE_JOB,
+            {"user_telegram_id": callback.from_user.id, "application_id": application_id},
+            delay_seconds=settings.bank_response_delay_minutes * 60,
+        ))
         await db.commit()
     
     # Отправляем уведомление
@@ -118,9 +143,6 @@ async def confirm_send_to_bank(callback: types.CallbackQuery, state: FSMContext,
     
     await state.clear()
     await callback.answer(_('Application sent!'))
-    
-    # Запускаем симуляцию ответа банка
-    asyncio.create_task(simulate_bank_response(callback.bot, callback.from_user.id, application_id))
 
 
 @router.callback_query(BankFlowStates.confirming_send, F.data == "cancel_send")
@@ -134,100 +156,111 @@ async def cancel_send_to_bank(callback: types.CallbackQuery, state: FSMContext,
     await callback.answer()
 
 
-async def simulate_bank_response(bot, user_telegram_id: int, application_id: int):
-    """Симуляция ответа от банка"""
-    # Ждем указанное время
-    await asyncio.sleep(settings.bank_response_delay_minutes * 60)
-    
+def bank_response_job(bot: Bot) -> JobHandler:
+    """Обработчик задачи BANK_RESPONSE_JOB для JobWorker"""
+    adapters = create_bank_adapters()
+
+    async def run(payload: dict) -> None:
+        await simulate_bank_response(bot, payload["user_telegram_id"], payload["application_id"], adapters)
+    return run
+
+
+async def simulate_bank_response(
+    bot,
+    user_telegram_id: int,
+    application_id: int,
+    adapters: Optional[List[BankAdapter]] = None,
+):
+    """
+    Ответ банков на заявку
+
+    Банки опрашиваются параллельно (collect_offers) без открытой сессии БД:
+    ожидание ответов не держит соединение из пула. Ответы сохраняются
+    в bank_offers, итог - в заявке.
+
+    Raises:
+        BankError: Не ответил ни один банк - задача повторится позже
+    """
+    from src.bot.i18n import simple_gettext
+
     async with get_db_context() as db:
         # Получаем язык пользователя
-        from src.bot.i18n import simple_gettext
         result = await db.execute(
-            select(User).where(User.telegram_id == user_telegram_id)
+            user_by_telegram_id(user_telegram_id)
         )
         user = result.scalar_one_or_none()
         if not user:
             return
         
-        lang_code = user.language_code or 'ru'
-        _ = lambda msg: simple_gettext(lang_code, msg)
         # Получаем заявку
         result = await db.execute(
-            select(LoanApplication).where(LoanApplication.id == application_id)
+            application_by_id(application_id)
         )
         application = result.scalar_one_or_none()
         
-        if not application or application.status != LoanStatus.SENT:
+        # Задача может выполниться повторно (перезапуск после ответа) - отвечаем один раз
+        if not application or application.status != LoanStatus.SENT or application.bank_response_at:
             return
         
-        # Симулируем ответ банка
-        is_approved = random.random() < settings.bank_approval_probability
+        request = BankRequest(
+            application_id=application.id,
+            loan_type=application.loan_type,
+            amount=application.amount,
+            annual_rate=application.annual_rate,
+            term_months=application.term_months,
+        )
+    
+    lang_code = user.language_code or 'ru'
+    _ = lambda msg: simple_gettext(lang_code, msg)
+    
+    decisions = await collect_offers(adapters or create_bank_adapters(), request)
+    if not decisions:
+        raise BankError(f"No bank answered application {application_id}")
+    
+    offers = [decision for decision in decisions if decision.approved]
+    
+    async with get_db_context() as db:
+        # Блокировка строки: параллельный повтор задачи дождется и увидит ответ
+        result = await db.execute(
+            select(LoanApplication).where(LoanApplication.id == application_id).with_for_update()
+        )
+        application = result.scalar_one_or_none()
+        if not application or application.status != LoanStatus.SENT or application.bank_response_at:
+            return
         
-        if is_approved:
-            # Генерируем "предложения" от банков
-            banks = [
-                (_("Kapitalbank"), application.annual_rate - 2),
-                (_("Uzpromstroybank"), application.annual_rate - 1),
-                (_("Ipoteka-bank"), application.annual_rate),
-                (_("Hamkorbank"), application.annual_rate + 1),
-            ]
-            
-            # Фильтруем банки с валидными ставками
-            valid_banks = []
-            for bank_name, rate in banks:
-                if application.loan_type.value == "carloan":
-                    if 4 <= rate <= 48:
-                        valid_banks.append((bank_name, rate))
-                else:  # microloan
-                    if 18 <= rate <= 79:
-                        valid_banks.append((bank_name, rate))
-            
-            if valid_banks:
-                response_text = f"📱 **{_('SMS from banks received!')}**\n\n"
-                response_text += f"{_('Offers received:')}\n\n"
-                
-                for bank_name, rate in valid_banks[:3]:  # Показываем до 3 банков
-                    response_text += f"🏦 **{bank_name}**\n"
-                    response_text += f"   {_('Rate')}: {rate}%\n"
-                    response_text += f"   {_('Status: Pre-approved')}\n\n"
-                
-                response_text += _('Contact selected bank to complete loan.')
-                
-                bank_response = _('Approved by {count} banks').format(count=len(valid_banks))
-            else:
-                response_text = (
-                    f"📱 **{_('Response from banks received')}**\n\n"
-                    f"{_('Unfortunately, your application was not approved.')}\n"
-                    f"{_('Recommend improving credit history and try later.')}"
-                )
-                bank_response = _('Declined')
-        else:
-            response_text = (
-                f"📱 **{_('Response from banks received')}**\n\n"
-                f"{_('Unfortunately, your application was not approved.')}\n"
-                f"{_('Possible reasons:')}\n"
-                f"• {_('Insufficient income')}\n"
-                f"• {_('No credit history')}\n"
-                f"• {_('High debt burden')}\n\n"
-                f"{_('Try applying in 3 months.')}"
-            )
-            bank_response = _('Declined')
+        now = datetime.utcnow()
+        await db.execute(insert_bank_offers(((application_id, decision) for decision in decisions), now))
         
-        # Обновляем заявку
-        application.bank_response_at = datetime.utcnow()
-        application.bank_response = bank_response
+        application.bank_response_at = now
+        application.bank_response = (
+            _('Approved by {count} banks').format(count=len(offers)) if offers else _('Declined')
+        )
         await db.commit()
-        
-        # Отправляем уведомление пользователю
-        try:
+    
+    if offers:
+        response_text = format_bank_offers(offers, _)
+    else:
+        response_text = (
+            f"📱 **{_('Response from banks received')}**\n\n"
+            f"{_('Unfortunately, your application was not approved.')}\n"
+            f"{_('Possible reasons:')}\n"
+            f"• {_('Insufficient income')}\n"
+            f"• {_('No credit history')}\n"
+            f"• {_('High debt burden')}\n\n"
+            f"{_('Try applying in 3 months.')}"
+        )
+    
+    # Отправляем уведомление пользователю
+    try:
+        with send_as(SendPriority.NOTIFICATION):
             await bot.send_message(
                 user_telegram_id,
                 response_text,
                 parse_mode="Markdown"
             )
-        except Exception:
-            # Игнорируем ошибки отправки
-            pass
+    except TelegramAPIError as e:
+        # Ответ банка уже сохранен - пользователь увидит его в /my_app
+        logger.warning(f"Bank response notification to {user_telegram_id} failed: {e}")
 
 
 @router.message(F.text == "/my_app")
@@ -236,7 +269,7 @@ async def show_my_application_command(message: types.Message, _: callable):
     async with get_db_context() as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
+            user_by_telegram_id(message.from_user.id)
         )
         user = result.scalar_one_or_none()
         
@@ -248,10 +281,7 @@ async def show_my_application_command(message: types.Message, _: callable):
         
         # Получаем активную заявку
         result = await db.execute(
-            select(LoanApplication)
-            .where(LoanApplication.user_id == user.id)
-            .where(LoanApplication.is_archived == False)
-            .order_by(LoanApplication.created_at.desc())
+            active_application(user.id)
         )
         application = result.scalar_one_or_none()
         
@@ -284,6 +314,16 @@ async def show_my_application_command(message: types.Message, _: callable):
         
         if application.status == LoanStatus.SENT and application.bank_response:
             text += f"🏦 {_('Banks response')}: {application.bank_response}\n"
+            
+            # Одобренные предложения идут первыми, лучшее - первым
+            result = await db.execute(
+                application_offers(user.id, application.id)
+            )
+            names = bank_names()
+            for offer in result.scalars().all()[:3]:
+                if offer.status != BankOfferStatus.APPROVED:
+                    break
+                text += f"   • {_(names.get(offer.bank_code, offer.bank_code))}: {offer.annual_rate}%\n"
         
         text += f"\n**{loan_type}**\n"
         text += f"💰 {_('Amount')}: {format_amount(application.amount)} {_('sum')}\n"
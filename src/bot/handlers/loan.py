@@ -2,7 +2,6 @@ from decimal import Decimal
 
 from aiogram import F, Router, types
 from aiogram.fsm.context import FSMContext
-from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.keyboards import Keyboards
@@ -18,7 +17,13 @@ from src.bot.utils import (
 from src.core.enums import CarCondition, LoanStatus, LoanType, ReceiveMethod
 from src.core.pdn import PDNCalculator
 from src.db.database import get_db_context
-from src.db.models import LoanApplication, PersonalData, User
+from src.db.models import LoanApplication
+from src.db.queries import (
+    active_application,
+    archive_active_applications,
+    personal_data_by_user_id,
+    user_by_telegram_id,
+)
 
 router = Router(name="loan")
 
@@ -271,7 +276,7 @@ async def confirm_application(callback: types.CallbackQuery, state: FSMContext,
     async with get_db_context() as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == callback.from_user.id)
+            user_by_telegram_id(callback.from_user.id)
         )
         user = result.scalar_one_or_none()
         
@@ -281,10 +286,7 @@ async def confirm_application(callback: types.CallbackQuery, state: FSMContext,
         
         # Архивируем старые заявки
         await db.execute(
-            update(LoanApplication)
-            .where(LoanApplication.user_id == user.id)
-            .where(LoanApplication.is_archived == False)
-            .values(is_archived=True)
+            archive_active_applications(user.id)
         )
         
         # Создаем новую заявку
@@ -305,7 +307,7 @@ async def confirm_application(callback: types.CallbackQuery, state: FSMContext,
         
         # Обновляем доход в персональных данных
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user.id)
+            personal_data_by_user_id(user.id)
         )
         personal_data = result.scalar_one_or_none()
         
@@ -364,7 +366,7 @@ async def show_applications(callback: types.CallbackQuery, _: callable):
     async with get_db_context() as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == callback.from_user.id)
+            user_by_telegram_id(callback.from_user.id)
         )
         user = result.scalar_one_or_none()
         
@@ -374,10 +376,7 @@ async def show_applications(callback: types.CallbackQuery, _: callable):
         
         # Получаем активную заявку
         result = await db.execute(
-            select(LoanApplication)
-            .where(LoanApplication.user_id == user.id)
-            .where(LoanApplication.is_archived == False)
-            .order_by(LoanApplication.created_at.desc())
+            active_application(user.id)
         )
         application = result.scalar_one_or_none()
         
@@ -1,15 +1,19 @@
+from datetime import datetime
+
 from aiogram import F, Router, types
+from aiogram.enums import ChatMemberStatus
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.keyboards import Keyboards
+from src.bot.middleware.i18n import language_cache
 from src.bot.states import OnboardingStates
 from src.bot.utils import detect_device_type, validate_phone_number
 from src.core.referral import ReferralSystem
 from src.db.database import get_db_context
 from src.db.models import PersonalData, ReferralRegistration, User
+from src.db.queries import set_bot_blocked, user_by_referral_code, user_by_telegram_id
 
 router = Router(name="onboarding")
 
@@ -28,7 +32,7 @@ async def cmd_start(message: types.Message, state: FSMContext, _: callable):
     async with get_db_context() as db:
         # Проверяем, существует ли пользователь
         result = await db.execute(
-            select(User).where(User.telegram_id == user_id)
+            user_by_telegram_id(user_id)
         )
         user = result.scalar_one_or_none()
         
@@ -108,7 +112,7 @@ async def process_phone(message: types.Message, state: FSMContext, _: callable):
         if referral_code and ReferralSystem.validate_referral_code(referral_code):
             # Находим реферера по коду
             result = await db.execute(
-                select(User).where(User.referral_code == referral_code)
+                user_by_referral_code(referral_code)
             )
             referrer = result.scalar_one_or_none()
             
@@ -135,6 +139,8 @@ async def process_phone(message: types.Message, state: FSMContext, _: callable):
         
         db.add(personal_data)
         await db.commit()
+    # Пользователь был закэширован как незарегистрированный
+    await language_cache.invalidate(message.from_user.id)
     
     # Убираем клавиатуру
     await message.answer(
@@ -167,13 +173,14 @@ async def process_language(callback: types.CallbackQuery, state: FSMContext, _:
     async with get_db_context() as db:
         # Обновляем язык пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == callback.from_user.id)
+            user_by_telegram_id(callback.from_user.id)
         )
         user = result.scalar_one_or_none()
         
         if user:
             user.language_code = language
             await db.commit()
+    await language_cache.invalidate(callback.from_user.id)
     
     # Обновляем функцию перевода для нового языка
     from src.bot.i18n import simple_gettext
@@ -200,7 +207,7 @@ async def cmd_menu(message: types.Message, state: FSMContext, _: callable):
     """Команда для отображения главного меню"""
     async with get_db_context() as db:
         result = await db.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
+            user_by_telegram_id(message.from_user.id)
         )
         user = result.scalar_one_or_none()
         
@@ -225,4 +232,14 @@ async def show_main_menu(callback: types.CallbackQuery, state: FSMContext, _: ca
         reply_markup=Keyboards.main_menu(_)
     )
     await state.clear()
-    await callback.answer()
\ No newline at end of file
+    await callback.answer()
+
+
+@router.my_chat_member(F.chat.type == "private")
+async def bot_membership_changed(event: types.ChatMemberUpdated):
+    """Пользователь заблокировал или разблокировал бота: рассылки его пропускают"""
+    blocked = event.new_chat_member.status == ChatMemberStatus.KICKED
+    async with get_db_context() as db:
+        await db.execute(
+            set_bot_blocked(event.from_user.id, datetime.utcnow() if blocked else None)
+        )
@@ -2,7 +2,6 @@ from datetime import datetime
 
 from aiogram import F, Router, types
 from aiogram.fsm.context import FSMContext
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.keyboards import Keyboards
@@ -19,7 +18,14 @@ from src.core.enums import (
 from src.core.scoring import PersonalData as PersonalDataSchema, ScoringCalculator
 from src.core.field_protection import FieldProtectionManager
 from src.db.database import get_db_context
-from src.db.models import PersonalData, ReferralRegistration, User
+from src.db.models import PersonalData
+from src.db.queries import (
+    personal_data_by_user_id,
+    unapplied_referral_registrations,
+    user_by_id,
+    user_by_telegram_id,
+)
+from src.db.score_history import score_history_writer
 
 router = Router(name="personal_data")
 
@@ -30,7 +36,7 @@ async def start_personal_data(callback: types.CallbackQuery, state: FSMContext,
     async with get_db_context() as db:
         # Получаем данные пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == callback.from_user.id)
+            user_by_telegram_id(callback.from_user.id)
         )
         user = result.scalar_one_or_none()
         
@@ -40,7 +46,7 @@ async def start_personal_data(callback: types.CallbackQuery, state: FSMContext,
         
         # Получаем персональные данные
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user.id)
+            personal_data_by_user_id(user.id)
         )
         personal_data = result.scalar_one_or_none()
         
@@ -98,7 +104,7 @@ async def process_age(message: types.Message, state: FSMContext, _: callable):
         
         async with get_db_context() as db:
             result = await db.execute(
-                select(PersonalData).where(PersonalData.user_id == user_id)
+                personal_data_by_user_id(user_id)
             )
             personal_data = result.scalar_one_or_none()
             
@@ -138,7 +144,7 @@ async def process_gender(callback: types.CallbackQuery, state: FSMContext, _: ca
         
         async with get_db_context() as db:
             result = await db.execute(
-                select(PersonalData).where(PersonalData.user_id == user_id)
+                personal_data_by_user_id(user_id)
             )
             personal_data = result.scalar_one_or_none()
             
@@ -186,7 +192,7 @@ async def process_work_experience(message: types.Message, state: FSMContext, _:
         
         async with get_db_context() as db:
             result = await db.execute(
-                select(PersonalData).where(PersonalData.user_id == user_id)
+                personal_data_by_user_id(user_id)
             )
             personal_data = result.scalar_one_or_none()
             
@@ -231,7 +237,7 @@ async def process_address_stability(message: types.Message, state: FSMContext, _
         
         async with get_db_context() as db:
             result = await db.execute(
-                select(PersonalData).where(PersonalData.user_id == user_id)
+                personal_data_by_user_id(user_id)
             )
             personal_data = result.scalar_one_or_none()
             
@@ -271,7 +277,7 @@ async def process_housing_status(callback: types.CallbackQuery, state: FSMContex
         
         async with get_db_context() as db:
             result = await db.execute(
-                select(PersonalData).where(PersonalData.user_id == user_id)
+                personal_data_by_user_id(user_id)
             )
             personal_data = result.scalar_one_or_none()
             
@@ -315,7 +321,7 @@ async def process_marital_status(callback: types.CallbackQuery, state: FSMContex
         
         async with get_db_context() as db:
             result = await db.execute(
-                select(PersonalData).where(PersonalData.user_id == user_id)
+                personal_data_by_user_id(user_id)
             )
             personal_data = result.scalar_one_or_none()
             
@@ -359,7 +365,7 @@ async def process_education(callback: types.CallbackQuery, state: FSMContext, _:
         
         async with get_db_context() as db:
             result = await db.execute(
-                select(PersonalData).where(PersonalData.user_id == user_id)
+                personal_data_by_user_id(user_id)
             )
             personal_data = result.scalar_one_or_none()
             
@@ -409,7 +415,7 @@ async def process_closed_loans(message: types.Message, state: FSMContext, _: cal
         
         async with get_db_context() as db:
             result = await db.execute(
-                select(PersonalData).where(PersonalData.user_id == user_id)
+                personal_data_by_user_id(user_id)
             )
             personal_data = result.scalar_one_or_none()
             
@@ -466,7 +472,7 @@ async def process_region(callback: types.CallbackQuery, state: FSMContext, _: ca
         
         async with get_db_context() as db:
             result = await db.execute(
-                select(PersonalData).where(PersonalData.user_id == user_id)
+                personal_data_by_user_id(user_id)
             )
             personal_data = result.scalar_one_or_none()
             
@@ -490,7 +496,7 @@ async def process_region(callback: types.CallbackQuery, state: FSMContext, _: ca
     async with get_db_context() as db:
         # Обновляем персональные данные
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == data["user_id"])
+            personal_data_by_user_id(data["user_id"])
         )
         personal_data = result.scalar_one_or_none()
         
@@ -507,7 +513,7 @@ async def process_region(callback: types.CallbackQuery, state: FSMContext, _: ca
             
             # Получаем количество рефералов
             result = await db.execute(
-                select(User).where(User.id == data["user_id"])
+                user_by_id(data["user_id"])
             )
             user = result.scalar_one_or_none()
             
@@ -530,6 +536,7 @@ async def process_region(callback: types.CallbackQuery, state: FSMContext, _: ca
             
             # Рассчитываем скоринг
             score = ScoringCalculator.calculate_score(schema)
+            score_changed = score != personal_data.current_score
             personal_data.current_score = score
             personal_data.score_updated_at = datetime.utcnow()
             
@@ -537,9 +544,7 @@ async def process_region(callback: types.CallbackQuery, state: FSMContext, _: ca
             if user and user.referral_count > 0:
                 # Находим неприменённые бонусы
                 result = await db.execute(
-                    select(ReferralRegistration)
-                    .where(ReferralRegistration.referrer_id == user.id)
-                    .where(ReferralRegistration.bonus_applied == False)
+                    unapplied_referral_registrations(user.id)
                 )
                 registrations = result.scalars().all()
                 
@@ -548,6 +553,15 @@ async def process_region(callback: types.CallbackQuery, state: FSMContext, _: ca
             
             await db.commit()
             
+            # Точка истории пишется в фоне, после фиксации нового балла
+            if score_changed:
+                score_history_writer.record(
+                    personal_data.user_id,
+                    score,
+                    ScoringCalculator.get_matched_rules(schema),
+                    personal_data.score_updated_at,
+                )
+            
             # Получаем детализацию скоринга
             breakdown = ScoringCalculator.get_score_breakdown(schema)
             
@@ -573,7 +587,7 @@ async def show_personal_data_menu(callback: types.CallbackQuery, _: callable):
     async with get_db_context() as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == user_id)
+            user_by_telegram_id(user_id)
         )
         user = result.scalar_one_or_none()
         
@@ -586,7 +600,7 @@ async def show_personal_data_menu(callback: types.CallbackQuery, _: callable):
         
         # Получаем персональные данные пользователя
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user.id)
+            personal_data_by_user_id(user.id)
         )
         personal_data = result.scalar_one_or_none()
         
@@ -753,7 +767,7 @@ async def view_protected_data(callback: types.CallbackQuery, _: callable):
     async with get_db_context() as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == user_id)
+            user_by_telegram_id(user_id)
         )
         user = result.scalar_one_or_none()
         
@@ -762,7 +776,7 @@ async def view_protected_data(callback: types.CallbackQuery, _: callable):
             return
         
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user.id)
+            personal_data_by_user_id(user.id)
         )
         personal_data = result.scalar_one_or_none()
         
@@ -804,7 +818,7 @@ async def show_editable_fields_menu(callback: types.CallbackQuery, _: callable):
     async with get_db_context() as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == user_id)
+            user_by_telegram_id(user_id)
         )
         user = result.scalar_one_or_none()
         
@@ -813,7 +827,7 @@ async def show_editable_fields_menu(callback: types.CallbackQuery, _: callable):
             return
         
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user.id)
+            personal_data_by_user_id(user.id)
         )
         personal_data = result.scalar_one_or_none()
         
@@ -842,7 +856,7 @@ async def handle_field_edit_attempt(callback: types.CallbackQuery, state: FSMCon
     async with get_db_context() as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == user_id)
+            user_by_telegram_id(user_id)
         )
         user = result.scalar_one_or_none()
         
@@ -851,7 +865,7 @@ async def handle_field_edit_attempt(callback: types.CallbackQuery, state: FSMCon
             return
         
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user.id)
+            personal_data_by_user_id(user.id)
         )
         personal_data = result.scalar_one_or_none()
         
@@ -955,7 +969,7 @@ async def process_income_edit(message: types.Message, state: FSMContext, _: call
     
     async with get_db_context() as db:
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user_id)
+            personal_data_by_user_id(user_id)
         )
         personal_data = result.scalar_one_or_none()
         
@@ -986,7 +1000,7 @@ async def process_other_loans_payment_edit(message: types.Message, state: FSMCon
     
     async with get_db_context() as db:
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user_id)
+            personal_data_by_user_id(user_id)
         )
         personal_data = result.scalar_one_or_none()
         
@@ -1013,7 +1027,7 @@ async def process_has_loans_edit(callback: types.CallbackQuery, state: FSMContex
     
     async with get_db_context() as db:
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user_id)
+            personal_data_by_user_id(user_id)
         )
         personal_data = result.scalar_one_or_none()
         
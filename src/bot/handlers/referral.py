@@ -1,14 +1,13 @@
 from aiogram import F, Router, types
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.keyboards import Keyboards
 from src.config.settings import settings
 from src.core.referral import ReferralSystem
-from src.db.database import get_db_context
-from src.db.models import User
+from src.db.database import get_read_db_context
+from src.db.queries import user_by_telegram_id
 
 router = Router(name="referral")
 
@@ -27,10 +26,10 @@ async def show_referral_program(event: types.Message | types.CallbackQuery, stat
         user_id = event.from_user.id
         is_callback = False
     
-    async with get_db_context() as db:
+    async with get_read_db_context(user_id) as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == user_id)
+            user_by_telegram_id(user_id)
         )
         user = result.scalar_one_or_none()
         
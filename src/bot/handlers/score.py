@@ -1,6 +1,5 @@
 from aiogram import F, Router, types
 from aiogram.filters import Command
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.keyboards import Keyboards
@@ -8,8 +7,8 @@ from src.bot.utils import format_amount
 from src.core.enums import LoanStatus
 from src.core.pdn import PDNCalculator
 from src.core.scoring import PersonalData as PersonalDataSchema, ScoringCalculator
-from src.db.database import get_db_context
-from src.db.models import LoanApplication, PersonalData, User
+from src.db.database import get_read_db_context
+from src.db.queries import active_application, personal_data_by_user_id, user_by_telegram_id
 
 router = Router(name="score")
 
@@ -28,10 +27,10 @@ async def show_score(event: types.Message | types.CallbackQuery, _: callable):
         user_id = event.from_user.id
         is_callback = False
     
-    async with get_db_context() as db:
+    async with get_read_db_context(user_id) as db:
         # Получаем пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == user_id)
+            user_by_telegram_id(user_id)
         )
         user = result.scalar_one_or_none()
         
@@ -45,16 +44,13 @@ async def show_score(event: types.Message | types.CallbackQuery, _: callable):
         
         # Получаем активную заявку для ПДН
         result = await db.execute(
-            select(LoanApplication)
-            .where(LoanApplication.user_id == user.id)
-            .where(LoanApplication.is_archived == False)
-            .order_by(LoanApplication.created_at.desc())
+            active_application(user.id)
         )
         application = result.scalar_one_or_none()
         
         # Получаем персональные данные для скоринга
         result = await db.execute(
-            select(PersonalData).where(PersonalData.user_id == user.id)
+            personal_data_by_user_id(user.id)
         )
         personal_data = result.scalar_one_or_none()
         
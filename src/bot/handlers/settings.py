@@ -1,10 +1,10 @@
 from aiogram import F, Router, types
 from aiogram.filters import Command
-from sqlalchemy import select, update
 
 from src.bot.keyboards import Keyboards
+from src.bot.middleware.i18n import language_cache
 from src.db.database import get_db_context
-from src.db.models import User
+from src.db.queries import update_user_language, user_by_telegram_id
 
 router = Router(name="settings")
 
@@ -25,7 +25,7 @@ async def change_language(callback: types.CallbackQuery, _: callable):
     async with get_db_context() as db:
         # Получаем текущий язык пользователя
         result = await db.execute(
-            select(User).where(User.telegram_id == callback.from_user.id)
+            user_by_telegram_id(callback.from_user.id)
         )
         user = result.scalar_one_or_none()
         
@@ -52,11 +52,10 @@ async def process_language_choice(callback: types.CallbackQuery, _: callable):
     async with get_db_context() as db:
         # Обновляем язык пользователя
         await db.execute(
-            update(User)
-            .where(User.telegram_id == callback.from_user.id)
-            .values(language_code=lang_code)
+            update_user_language(callback.from_user.id, lang_code)
         )
         await db.commit()
+    await language_cache.invalidate(callback.from_user.id)
     
     # Отправляем сообщение на новом языке
     # Для этого нужно обновить контекст локализации
@@ -1,39 +1,134 @@
 import gettext
-import os
+import io
+import logging
+import mmap
+import struct
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 from aiogram import types
 
+logger = logging.getLogger(__name__)
+
 # Поддерживаемые языки
 SUPPORTED_LANGUAGES = {
     "ru": "Русский",
     "uz": "O'zbek"
 }
 
-# Путь к файлам переводов
-LOCALES_DIR = Path(__file__).parent.parent / "i18n"
+# Переводы: src/bot/i18n/<язык>.po - исходник, <язык>.mo - каталог, собираемый
+# python -m src.bot.i18n при сборке образа
+LOCALES_DIR = Path(__file__).parent / "i18n"
 
-# Хранилище объектов переводов
-_translations: Dict[str, gettext.GNUTranslations] = {}
+# Каталоги, загруженные в этом процессе (при первом обращении к языку)
+_translations: Dict[str, gettext.NullTranslations] = {}
 
+# Магическое число .mo в порядке байтов little-endian
+MO_MAGIC = 0x950412de
 
-def load_translations():
-    """Загрузка всех доступных переводов"""
-    for lang_code in SUPPORTED_LANGUAGES:
-        po_file = LOCALES_DIR / f"{lang_code}.po"
-        mo_file = LOCALES_DIR / f"{lang_code}.mo"
-        
-        # Компилируем .po в .mo если необходимо
-        if po_file.exists():
-            # В продакшене обычно используются предкомпилированные .mo файлы
-            # Здесь мы будем использовать .po напрямую через polib
-            try:
-                with open(po_file, 'rb') as f:
-                    _translations[lang_code] = gettext.GNUTranslations(f)
-            except Exception:
-                # Если не получилось загрузить, используем NullTranslations
-                _translations[lang_code] = gettext.NullTranslations()
+
+class MmapTranslations(gettext.NullTranslations):
+    """
+    Каталог .mo, читаемый прямо из файла через mmap
+
+    Строки не разбираются в словарь: перевод ищется двоичным поиском по
+    отсортированной таблице исходных строк. Страницы файла берутся из
+    страничного кэша ОС и общие для всех процессов бота.
+    """
+
+    def __init__(self, data: Union[mmap.mmap, bytes]) -> None:
+        super().__init__()
+        self._data = data
+        magic = struct.unpack_from("<I", data)[0]
+        self._order = "<" if magic == MO_MAGIC else ">"
+        _, self._count, self._originals, self._messages = struct.unpack_from(f"{self._order}4I", data, 4)
+        self._plural = gettext.c2py("n != 1")
+        for line in self._lookup(b"").decode().splitlines() if self._count else ():
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "plural-forms" and "plural=" in value:
+                self._plural = gettext.c2py(value.split("plural=")[1].strip().rstrip(";"))
+
+    def _entry(self, table: int, index: int) -> bytes:
+        length, offset = struct.unpack_from(f"{self._order}2I", self._data, table + 8 * index)
+        return self._data[offset:offset + length]
+
+    def _lookup(self, key: bytes) -> Optional[bytes]:
+        """Перевод строки или None; таблица исходных строк отсортирована по байтам"""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            original = self._entry(self._originals, middle)
+            if original == key:
+                return self._entry(self._messages, middle)
+            if original < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def gettext(self, message: str) -> str:
+        translated = self._lookup(message.encode())
+        return translated.decode() if translated else message
+
+    def ngettext(self, msgid1: str, msgid2: str, n: int) -> str:
+        translated = self._lookup(f"{msgid1}\x00{msgid2}".encode())
+        if translated is None:
+            return msgid1 if n == 1 else msgid2
+        forms = translated.decode().split("\x00")
+        return forms[min(self._plural(n), len(forms) - 1)]
+
+
+def compile_catalog(po_file: Path, mo_file: Optional[Path] = None) -> bytes:
+    """
+    Компиляция .po в каталог .mo
+
+    Args:
+        po_file: Исходный файл переводов
+        mo_file: Куда записать каталог (None - только вернуть)
+
+    Returns:
+        Содержимое каталога
+    """
+    from babel.messages.mofile import write_mo
+    from babel.messages.pofile import read_po
+
+    with open(po_file, "rb") as f:
+        catalog = read_po(f, abort_invalid=True)
+    buffer = io.BytesIO()
+    write_mo(buffer, catalog)
+    data = buffer.getvalue()
+    if mo_file is not None:
+        # Запись через временный файл: работающие процессы продолжают читать старый каталог
+        tmp_file = mo_file.with_suffix(".mo.tmp")
+        tmp_file.write_bytes(data)
+        tmp_file.replace(mo_file)
+    return data
+
+
+def compile_catalogs(locales_dir: Path = LOCALES_DIR) -> None:
+    """Компиляция всех .po каталога переводов в .mo рядом с ними"""
+    for po_file in sorted(locales_dir.glob("*.po")):
+        compile_catalog(po_file, po_file.with_suffix(".mo"))
+        logger.info(f"Compiled {po_file.name}")
+
+
+def load_catalog(lang_code: str, locales_dir: Path = LOCALES_DIR) -> gettext.NullTranslations:
+    """
+    Загрузка каталога языка
+
+    Собранный .mo отображается в память. Без него (или если .po новее)
+    .po компилируется в памяти процесса - так работает разработка без
+    шага сборки, но на проде это лишняя память в каждом процессе.
+    """
+    po_file = locales_dir / f"{lang_code}.po"
+    mo_file = locales_dir / f"{lang_code}.mo"
+    if mo_file.exists() and (not po_file.exists() or mo_file.stat().st_mtime >= po_file.stat().st_mtime):
+        with open(mo_file, "rb") as f:
+            return MmapTranslations(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    if po_file.exists():
+        logger.warning(f"Translations {mo_file.name} are missing or stale, run python -m src.bot.i18n")
+        return MmapTranslations(compile_catalog(po_file))
+    return gettext.NullTranslations()
 
 
 def get_user_language(user: Optional[types.User] = None, 
@@ -61,21 +156,26 @@ def get_user_language(user: Optional[types.User] = None,
     return "ru"  # Русский по умолчанию
 
 
-def get_translator(lang_code: str) -> gettext.GNUTranslations:
+def get_translator(lang_code: str) -> gettext.NullTranslations:
     """
     Получение объекта переводчика для языка
     
+    Каталог загружается при первом обращении к языку.
+    
     Args:
         lang_code: Код языка
         
     Returns:
         Объект переводчика
     """
-    if lang_code not in _translations:
+    if lang_code not in SUPPORTED_LANGUAGES:
         # Если перевод не найден, используем пустой (вернет оригинальный текст)
         return gettext.NullTranslations()
     
-    return _translations[lang_code]
+    translator = _translations.get(lang_code)
+    if translator is None:
+        translator = _translations[lang_code] = load_catalog(lang_code)
+    return translator
 
 
 class I18nContext:
@@ -99,393 +199,11 @@ class I18nContext:
         self._translator = get_translator(lang_code)
 
 
-# Временное решение для работы без .po файлов
-# В реальном приложении эти тексты будут в .po файлах
-TRANSLATIONS = {
-    "ru": {
-        # Общие
-        "Back": "Назад",
-        "Cancel": "Отмена",
-        "Main menu": "Главное меню",
-        "Settings": "Настройки",
-        "Language": "Язык",
-        "Choose language": "Выберите язык",
-        
-        # Приветствие
-        "Welcome! I'm KreditScore Bot.": "Добро пожаловать! Я бот KreditScore.",
-        "I'll help you:": "Я помогу вам:",
-        "Calculate debt burden indicator": "Рассчитать показатель долговой нагрузки",
-        "Get credit score": "Получить кредитный скоринг",
-        "Apply for a loan": "Подать заявку на кредит",
-        "Share your phone number to continue": "Поделитесь номером телефона для продолжения",
-        "Share phone number": "Поделиться номером",
-        
-        # Главное меню
-        "New application": "Новая заявка",
-        "My applications": "Мои заявки",
-        "My indicators": "Мои показатели",
-        "Personal data": "Личные данные",
-        "Referral program": "Реферальная программа",
-        
-        # Кредиты
-        "Choose loan type": "Выберите тип кредита",
-        "Car loan": "Автокредит",
-        "Microloan": "Микрозайм",
-        "Up to": "До",
-        "Rate": "Ставка",
-        "Term": "Срок",
-        "months": "мес",
-        "years": "лет",
-        
-        # ПДН и скоринг
-        "Your financial indicators": "Ваши финансовые показатели",
-        "Debt burden indicator": "Показатель долговой нагрузки",
-        "Excellent indicator!": "Отличный показатель!",
-        "Acceptable indicator": "Приемлемый показатель",
-        "High debt burden": "Высокая долговая нагрузка",
-        "Banks may approve the loan": "Банки могут одобрить кредит",
-        "Banks do not issue loans with DTI > 50%": "При ПДН > 50% банки не выдают кредиты",
-        "Credit scoring": "Кредитный скоринг",
-        "Your score": "Ваш балл",
-        "Profile completion": "Профиль заполнен на",
-        "Fill in all data to increase score": "Заполните все данные для увеличения балла",
-        
-        # Персональные данные
-        "Fill personal data": "Заполнить личные данные",
-        "Age": "Возраст",
-        "Gender": "Пол",
-        "Male": "Мужской",
-        "Female": "Женский",
-        "Marital status": "Семейное положение",
-        "Single": "Холост/Не замужем",
-        "Married": "Женат/Замужем",
-        "Divorced": "Разведен(а)",
-        "Widowed": "Вдовец/Вдова",
-        "Education": "Образование",
-        "Secondary": "Среднее",
-        "Vocational": "Среднее специальное",
-        "Incomplete higher": "Неполное высшее",
-        "Higher": "Высшее",
-        "Postgraduate": "Послевузовское",
-        "Housing status": "Статус жилья",
-        "Own": "Собственное",
-        "Own with mortgage": "Собственное (ипотека)",
-        "Rent": "Аренда",
-        "With relatives": "У родственников",
-        "Region": "Регион",
-        "Work experience (months)": "Стаж работы (месяцев)",
-        "Years at current address": "Лет по текущему адресу",
-        "Do you have other loans?": "Есть ли у вас другие кредиты?",
-        "Yes": "Да",
-        "No": "Нет",
-        "Number of closed loans": "Количество закрытых кредитов",
-        
-        # Ошибки
-        "Incorrect phone number. Try again.": "Некорректный номер телефона. Попробуйте еще раз.",
-        "You are not registered. Use /start to begin.": "Вы еще не зарегистрированы. Используйте /start для начала.",
-        "Error: user not found": "Ошибка: пользователь не найден",
-        "Error: data not found": "Ошибка: данные не найдены",
-        "Active application not found": "Активная заявка не найдена",
-        "Enter correct amount (numbers only)": "Введите корректную сумму (только цифры)",
-        "Amount must be positive": "Сумма должна быть положительной",
-        "Maximum amount": "Максимальная сумма",
-        
-        # Статусы
-        "New": "Новая",
-        "Sent to bank": "Отправлена в банк",
-        "Archived": "В архиве",
-        
-        # Подтверждения
-        "Application created successfully!": "Заявка успешно создана!",
-        "Personal data saved!": "Личные данные сохранены!",
-        "Language changed successfully": "Язык успешно изменен",
-        
-        # Реферальная программа - дополнительные
-        "Share this link with friends. When they register using your link, you will automatically receive bonus points!": "Поделитесь этой ссылкой с друзьями. Когда они зарегистрируются в боте по вашей ссылке, вы автоматически получите бонусные баллы!",
-        "discover your credit rating!": "узнай свой кредитный рейтинг!",
-        "Instant debt burden calculation": "Мгновенный расчет долговой нагрузки",
-        "Credit approval probability assessment": "Оценка вероятности одобрения кредита",
-        "Best offers from banks": "Лучшие предложения от банков",
-        "Start now": "Начни прямо сейчас",
-        
-        # Дополнительные строки
-        "Welcome! I am KreditScore Bot.": "Добро пожаловать! Я бот KreditScore.",
-        "I will help you:": "Я помогу вам:",
-        "If yes, enter total amount. If no, click Skip.": "Если да, введите общую сумму. Если нет, нажмите 'Пропустить'.",
-        "Attention! With DTI > 50% banks wont issue a loan.": "При ПДН > 50% банки не выдают кредиты",
-        "What next?": "Что дальше?",
-        
-        # Bank flow
-        "With DTI > 50% banks won't approve loan": "При ПДН > 50% банки не смогут выдать кредит",
-        "Send application to banks": "Отправка заявки в банки",
-        "Your application will be sent to all partner banks.": "Ваша заявка будет отправлена во все банки-партнеры.",
-        "Banks will review application and send offers.": "Банки рассмотрят заявку и отправят предложения.",
-        "Estimated wait time: 10 minutes": "Примерное время ожидания: 10 минут",
-        "Send application?": "Отправить заявку?",
-        "Send": "Отправить",
-        "Application sent successfully!": "Заявка успешно отправлена!",
-        "Your application sent to all partner banks.": "Ваша заявка отправлена во все банки-партнеры.",
-        "We will notify you when we receive responses.": "Мы уведомим вас, как только получим ответы.",
-        "Wait for SMS with offers from banks.": "Ожидайте SMS с предложениями от банков.",
-        "Application sent!": "Заявка отправлена!",
-        "Send canceled.": "Отправка заявки отменена.",
-        "Error: application not found": "Ошибка: заявка не найдена",
-        "SMS from banks received!": "SMS от банков получена!",
-        "Offers received:": "Поступили предложения:",
-        "Status: Pre-approved": "Статус: Предварительно одобрено",
-        "Contact selected bank to complete loan.": "Для оформления кредита обратитесь в выбранный банк.",
-        "Approved by {count} banks": "Одобрено {count} банками",
-        "Response from banks received": "Ответ от банков получен",
-        "Unfortunately, your application was not approved.": "К сожалению, ваша заявка не была одобрена.",
-        "Recommend improving credit history and try later.": "Рекомендуем улучшить кредитную историю и попробовать позже.",
-        "Declined": "Отклонено",
-        "Possible reasons:": "Возможные причины:",
-        "Insufficient income": "Недостаточный доход",
-        "No credit history": "Отсутствие кредитной истории",
-        "High debt burden": "Высокая долговая нагрузка",
-        "Try applying in 3 months.": "Попробуйте подать заявку через 3 месяца.",
-        "You have no active applications.": "У вас нет активных заявок.",
-        "Create new application for debt burden calculation.": "Создайте новую заявку для расчета долговой нагрузки.",
-        "Your current application": "Ваша текущая заявка",
-        "Date": "Дата",
-        "Status": "Статус",
-        "Banks response": "Ответ банков",
-        "Amount": "Сумма",
-        "Monthly payment": "Платеж",
-        "DTI": "ПДН",
-        
-        # Bank names
-        "Kapitalbank": "Капиталбанк",
-        "Uzpromstroybank": "Узпромстройбанк",
-        "Ipoteka-bank": "Ипотека-банк",
-        "Hamkorbank": "Хамкорбанк",
-        "sum": "сум",
-        
-        # Validation messages
-        "Rate must be between": "Ставка должна быть между",
-        "and": "и",
-        "Enter correct interest rate": "Введите корректную процентную ставку",
-        "Term must be from": "Срок должен быть от",
-        "to": "до",
-        "Enter number of months (numbers only)": "Введите количество месяцев (только цифры)",
-        "You must be over 18 years old": "Вам должно быть больше 18 лет",
-        "Enter correct age": "Введите корректный возраст",
-        "Enter age (numbers only)": "Введите возраст (только цифры)",
-        "cannot be negative": "не может быть отрицательным",
-        "Enter": "Введите",
-        "(numbers only)": "(только цифры)",
-        "Income": "Доход",
-        "Other payments": "Другие платежи",
-        "Skip": "Пропустить",
-        "Check application data": "Проверьте данные заявки",
-        "All correct?": "Все верно?",
-        "Enter loan amount": "Введите сумму кредита",
-        "Enter interest rate": "Введите процентную ставку",
-        "Enter loan term in months": "Введите срок кредита в месяцах",
-        "Enter your monthly income": "Введите ваш ежемесячный доход",
-        "Do you have monthly payments for other loans?": "Есть ли у вас ежемесячные платежи по другим кредитам?",
-        "people": "человек",
-        "Invited users": "Приглашенные пользователи",
-        "Your referral link": "Ваша реферальная ссылка",
-        "Invite friends and get bonuses!": "Приглашайте друзей и получайте бонусы!",
-        "Referral Program": "Реферальная программа",
-    },
-    "uz": {
-        # Общие
-        "Back": "Orqaga",
-        "Cancel": "Bekor qilish",
-        "Main menu": "Asosiy menyu",
-        "Settings": "Sozlamalar",
-        "Language": "Til",
-        "Choose language": "Tilni tanlang",
-        
-        # Приветствие
-        "Welcome! I'm KreditScore Bot.": "Xush kelibsiz! Men KreditScore botiman.",
-        "I'll help you:": "Men sizga yordam beraman:",
-        "Calculate debt burden indicator": "Qarz yukini hisoblash",
-        "Get credit score": "Kredit skoringni olish",
-        "Apply for a loan": "Kredit uchun ariza berish",
-        "Share your phone number to continue": "Davom etish uchun telefon raqamingizni ulashing",
-        "Share phone number": "Telefon raqamini ulashish",
-        
-        # Главное меню
-        "New application": "Yangi ariza",
-        "My applications": "Mening arizalarim",
-        "My indicators": "Mening ko'rsatkichlarim",
-        "Personal data": "Shaxsiy ma'lumotlar",
-        "Referral program": "Referal dasturi",
-        
-        # Кредиты
-        "Choose loan type": "Kredit turini tanlang",
-        "Car loan": "Avtokredit",
-        "Microloan": "Mikroqarz",
-        "Up to": "gacha",
-        "Rate": "Stavka",
-        "Term": "Muddat",
-        "months": "oy",
-        "years": "yil",
-        
-        # ПДН и скоринг
-        "Your financial indicators": "Sizning moliyaviy ko'rsatkichlaringiz",
-        "Debt burden indicator": "Qarz yuki ko'rsatkichi",
-        "Excellent indicator!": "A'lo ko'rsatkich!",
-        "Acceptable indicator": "Qoniqarli ko'rsatkich",
-        "High debt burden": "Yuqori qarz yuki",
-        "Banks may approve the loan": "Banklar kreditni tasdiqlashi mumkin",
-        "Banks do not issue loans with DTI > 50%": "QYK > 50% bo'lsa banklar kredit bermaydi",
-        "Credit scoring": "Kredit skoring",
-        "Your score": "Sizning balingiz",
-        "Profile completion": "Profil to'ldirilgan",
-        "Fill in all data to increase score": "Balni oshirish uchun barcha ma'lumotlarni to'ldiring",
-        
-        # Персональные данные
-        "Fill personal data": "Shaxsiy ma'lumotlarni to'ldirish",
-        "Age": "Yosh",
-        "Gender": "Jins",
-        "Male": "Erkak",
-        "Female": "Ayol",
-        "Marital status": "Oilaviy holat",
-        "Single": "Turmush qurmagan",
-        "Married": "Turmush qurgan",
-        "Divorced": "Ajrashgan",
-        "Widowed": "Beva",
-        "Education": "Ta'lim",
-        "Secondary": "O'rta",
-        "Vocational": "O'rta maxsus",
-        "Incomplete higher": "Tugallanmagan oliy",
-        "Higher": "Oliy",
-        "Postgraduate": "Oliy ta'limdan keyingi",
-        "Housing status": "Uy-joy holati",
-        "Own": "Shaxsiy",
-        "Own with mortgage": "Shaxsiy (ipoteka)",
-        "Rent": "Ijara",
-        "With relatives": "Qarindoshlar bilan",
-        "Region": "Viloyat",
-        "Work experience (months)": "Ish staji (oy)",
-        "Years at current address": "Joriy manzilda (yil)",
-        "Do you have other loans?": "Boshqa kreditlaringiz bormi?",
-        "Yes": "Ha",
-        "No": "Yo'q",
-        "Number of closed loans": "Yopilgan kreditlar soni",
-        
-        # Ошибки
-        "Incorrect phone number. Try again.": "Noto'g'ri telefon raqami. Qayta urinib ko'ring.",
-        "You are not registered. Use /start to begin.": "Siz ro'yxatdan o'tmagansiz. Boshlash uchun /start dan foydalaning.",
-        "Error: user not found": "Xato: foydalanuvchi topilmadi",
-        "Error: data not found": "Xato: ma'lumotlar topilmadi",
-        "Active application not found": "Faol ariza topilmadi",
-        "Enter correct amount (numbers only)": "To'g'ri summani kiriting (faqat raqamlar)",
-        "Amount must be positive": "Summa musbat bo'lishi kerak",
-        "Maximum amount": "Maksimal summa",
-        
-        # Статусы
-        "New": "Yangi",
-        "Sent to bank": "Bankka yuborildi",
-        "Archived": "Arxivda",
-        
-        # Подтверждения
-        "Application created successfully!": "Ariza muvaffaqiyatli yaratildi!",
-        "Personal data saved!": "Shaxsiy ma'lumotlar saqlandi!",
-        "Language changed successfully": "Til muvaffaqiyatli o'zgartirildi",
-        
-        # Реферальная программа - дополнительные
-        "Share this link with friends. When they register using your link, you will automatically receive bonus points!": "Bu havolani do'stlaringiz bilan ulashing. Ular sizning havolangiz orqali ro'yxatdan o'tganlarida, siz avtomatik ravishda bonus ballar olasiz!",
-        "discover your credit rating!": "kredit reytingingizni bilib oling!",
-        "Instant debt burden calculation": "Qarz yukini tezkor hisoblash",
-        "Credit approval probability assessment": "Kredit tasdiqlash ehtimolini baholash",
-        "Best offers from banks": "Banklarning eng yaxshi takliflari",
-        "Start now": "Hoziroq boshlang",
-        
-        # Дополнительные строки
-        "Welcome! I am KreditScore Bot.": "Xush kelibsiz! Men KreditScore botiman.",
-        "I will help you:": "Men sizga yordam beraman:",
-        "If yes, enter total amount. If no, click Skip.": "Ha bo'lsa, umumiy summani kiriting. Yo'q bo'lsa, 'O'tkazib yuborish' tugmasini bosing.",
-        "Attention! With DTI > 50% banks wont issue a loan.": "QYK > 50% bo'lsa banklar kredit bermaydi",
-        "What next?": "Keyin nima?",
-        
-        # Bank flow
-        "With DTI > 50% banks won't approve loan": "QYK > 50% bo'lsa banklar kredit bermaydi",
-        "Send application to banks": "Arizani banklarga yuborish",
-        "Your application will be sent to all partner banks.": "Sizning arizangiz barcha hamkor banklarga yuboriladi.",
-        "Banks will review application and send offers.": "Banklar arizani ko'rib chiqadi va takliflarni yuboradi.",
-        "Estimated wait time: 10 minutes": "Taxminiy kutish vaqti: 10 daqiqa",
-        "Send application?": "Arizani yuborasizmi?",
-        "Send": "Yuborish",
-        "Application sent successfully!": "Ariza muvaffaqiyatli yuborildi!",
-        "Your application sent to all partner banks.": "Sizning arizangiz barcha hamkor banklarga yuborildi.",
-        "We will notify you when we receive responses.": "Javoblarni olganingizda sizni xabardor qilamiz.",
-        "Wait for SMS with offers from banks.": "Banklardan takliflar bilan SMS kutib turing.",
-        "Application sent!": "Ariza yuborildi!",
-        "Send canceled.": "Yuborish bekor qilindi.",
-        "Error: application not found": "Xato: ariza topilmadi",
-        "SMS from banks received!": "Banklardan SMS keldi!",
-        "Offers received:": "Takliflar keldi:",
-        "Status: Pre-approved": "Holat: Dastlabki tasdiqlangan",
-        "Contact selected bank to complete loan.": "Kreditni rasmiylashtirish uchun tanlangan bankka murojaat qiling.",
-        "Approved by {count} banks": "{count} ta bank tomonidan tasdiqlandi",
-        "Response from banks received": "Banklardan javob keldi",
-        "Unfortunately, your application was not approved.": "Afsuski, sizning arizangiz tasdiqlanmadi.",
-        "Recommend improving credit history and try later.": "Kredit tarixini yaxshilash va keyinroq urinib ko'rishni tavsiya qilamiz.",
-        "Declined": "Rad etildi",
-        "Possible reasons:": "Mumkin bo'lgan sabablar:",
-        "Insufficient income": "Yetarli bo'lmagan daromad",
-        "No credit history": "Kredit tarixi yo'q",
-        "High debt burden": "Yuqori qarz yuki",
-        "Try applying in 3 months.": "3 oydan keyin ariza berishga harakat qiling.",
-        "You have no active applications.": "Sizda faol arizalar yo'q.",
-        "Create new application for debt burden calculation.": "Qarz yukini hisoblash uchun yangi ariza yarating.",
-        "Your current application": "Sizning joriy arizangiz",
-        "Date": "Sana",
-        "Status": "Holat",
-        "Banks response": "Banklar javobi",
-        "Amount": "Summa",
-        "Monthly payment": "Oylik to'lov",
-        "DTI": "QYK",
-        
-        # Bank names
-        "Kapitalbank": "Kapitalbank",
-        "Uzpromstroybank": "O'zsanoatqurilishbank",
-        "Ipoteka-bank": "Ipoteka-bank",
-        "Hamkorbank": "Hamkorbank",
-        "sum": "so'm",
-        
-        # Validation messages
-        "Rate must be between": "Stavka",
-        "and": "va",
-        "Enter correct interest rate": "To'g'ri foiz stavkasini kiriting",
-        "Term must be from": "Muddat",
-        "to": "gacha bo'lishi kerak",
-        "Enter number of months (numbers only)": "Oylar sonini kiriting (faqat raqamlar)",
-        "You must be over 18 years old": "Sizning yoshingiz 18 dan katta bo'lishi kerak",
-        "Enter correct age": "To'g'ri yoshni kiriting",
-        "Enter age (numbers only)": "Yoshni kiriting (faqat raqamlar)",
-        "cannot be negative": "manfiy bo'lishi mumkin emas",
-        "Enter": "Kiriting",
-        "(numbers only)": "(faqat raqamlar)",
-        "Income": "Daromad",
-        "Other payments": "Boshqa to'lovlar",
-        "Skip": "O'tkazib yuborish",
-        "Check application data": "Ariza ma'lumotlarini tekshiring",
-        "All correct?": "Hammasi to'g'rimi?",
-        "Enter loan amount": "Kredit summasini kiriting",
-        "Enter interest rate": "Foiz stavkasini kiriting",
-        "Enter loan term in months": "Kredit muddatini oylarda kiriting",
-        "Enter your monthly income": "Oylik daromadingizni kiriting",
-        "Do you have monthly payments for other loans?": "Boshqa kreditlar bo'yicha oylik to'lovlaringiz bormi?",
-        "people": "kishi",
-        "Invited users": "Taklif etilgan foydalanuvchilar",
-        "Your referral link": "Sizning referal havolangiz",
-        "Invite friends and get bonuses!": "Do'stlarni taklif eting va bonuslar oling!",
-        "Referral Program": "Referal dasturi",
-    }
-}
+def simple_gettext(lang_code: str, message: str) -> str:
+    """Перевод строки на язык пользователя"""
+    return get_translator(lang_code).gettext(message)
 
 
-def simple_gettext(lang_code: str, message: str) -> str:
-    """
-    Простая функция перевода без использования .po файлов
-    Временное решение для демонстрации
-    """
-    if lang_code in TRANSLATIONS and message in TRANSLATIONS[lang_code]:
-        return TRANSLATIONS[lang_code][message]
-    return message
\ No newline at end of file
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    compile_catalogs()
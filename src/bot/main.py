@@ -1,15 +1,16 @@
 import asyncio
 import logging
+import signal
 import sys
+from typing import Union
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.exceptions import TelegramNetworkError, TelegramServerError
 
-from src.bot.handlers import bank_flow, loan, onboarding, personal_data, referral, score, settings
-from src.bot.middleware.i18n import I18nMiddleware
-from src.bot.middleware.rate_limit import RateLimitMiddleware
+from src.bot.dispatcher import BOT_COMMANDS, create_bot, create_dispatcher
+from src.bot.scheduler import UpdateScheduler
+from src.bot.shards import ShardRouter, create_scheduler, start_shards, stop_shards
 from src.config.settings import settings as app_settings
-from src.db.database import close_db, init_db
 
 # Настройка логирования
 logging.basicConfig(
@@ -19,84 +20,97 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+POLLING_TIMEOUT = 30
+POLLING_RETRY_SECONDS = 5
 
-async def on_startup():
-    """Действия при запуске бота"""
-    logger.info("Starting bot...")
-    await init_db()
-    logger.info("Database initialized")
 
+async def poll_updates(bot: Bot, dp: Dispatcher, scheduler: Union[UpdateScheduler, ShardRouter]) -> None:
+    """Long polling: обновления передаются в планировщик, при полной очереди чтение ждет"""
+    offset = None
+    allowed_updates = dp.resolve_used_update_types()
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=POLLING_TIMEOUT, allowed_updates=allowed_updates)
+        except (TelegramNetworkError, TelegramServerError) as e:
+            logger.warning(f"Polling error: {e}, retrying in {POLLING_RETRY_SECONDS}s")
+            await asyncio.sleep(POLLING_RETRY_SECONDS)
+            continue
 
-async def on_shutdown():
-    """Действия при остановке бота"""
-    logger.info("Shutting down bot...")
-    await close_db()
-    logger.info("Database connection closed")
+        for update in updates:
+            offset = update.update_id + 1
+            if not await scheduler.put(update):
+                logger.warning(f"Update {update.update_id} dropped: chat queue is full or bot worker is unavailable")
 
 
-async def main():
-    """Основная функция запуска бота"""
-    # Инициализация бота и диспетчера
-    bot = Bot(token=app_settings.bot_token, parse_mode="Markdown")
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+async def run_polling():
+    """Polling режим для разработки"""
+    bot = create_bot()
+    dp = create_dispatcher()
+    scheduler = create_scheduler(bot, dp)
     
     # Сбрасываем webhook при старте (на случай если он был установлен)
     await bot.delete_webhook(drop_pending_updates=True)
     logger.info("Webhook deleted, starting polling mode")
     
-    # Регистрация middleware
-    dp.message.middleware(I18nMiddleware())
-    dp.callback_query.middleware(I18nMiddleware())
-    dp.message.middleware(RateLimitMiddleware())
-    dp.callback_query.middleware(RateLimitMiddleware())
+    await bot.set_my_commands(BOT_COMMANDS)
     
-    # Регистрация роутеров
-    dp.include_router(onboarding.router)
-    dp.include_router(loan.router)
-    dp.include_router(personal_data.router)
-    dp.include_router(referral.router)
-    dp.include_router(bank_flow.router)
-    dp.include_router(score.router)
-    dp.include_router(settings.router)
-    
-    # Установка команд бота
-    from aiogram.types import BotCommand
-    
-    await bot.set_my_commands([
-        BotCommand(command="start", description="Начать работу с ботом"),
-        BotCommand(command="menu", description="Главное меню"),
-        BotCommand(command="my_app", description="Моя заявка"),
-        BotCommand(command="score", description="Мои показатели"),
-        BotCommand(command="invite", description="Реферальная программа"),
-        BotCommand(command="help", description="Помощь"),
-    ])
-    
-    # Регистрация хуков
-    dp.startup.register(on_startup)
-    dp.shutdown.register(on_shutdown)
-    
-    # Запуск бота
+    await scheduler.start()
     try:
-        if app_settings.webhook_enabled:
-            # Webhook режим для продакшена
-            logger.info(f"Starting webhook on {app_settings.webhook_url}")
-            # Здесь должна быть настройка webhook
-            # await bot.set_webhook(app_settings.webhook_url + app_settings.get_webhook_path())
-            # Но для простоты используем polling
-            await dp.start_polling(bot)
-        else:
-            # Polling режим для разработки
-            logger.info("Starting polling...")
-            await dp.start_polling(bot)
+        logger.info("Starting polling...")
+        await poll_updates(bot, dp, scheduler)
+    finally:
+        try:
+            await scheduler.stop()
+        finally:
+            await bot.session.close()
+
+
+def run_webhook():
+    """
+    Webhook режим для продакшена
+
+    Обновления принимает FastAPI-приложение (src/api/webhook.py),
+    поэтому бот запускается как API-сервер.
+    """
+    import uvicorn
+
+    logger.info(f"Starting webhook on {app_settings.webhook_url}")
+    uvicorn.run("src.api.main:app", host=app_settings.api_host, port=app_settings.api_port)
+
+
+def run():
+    if app_settings.webhook_enabled:
+        run_webhook()
+    else:
+        asyncio.run(run_polling())
+
+
+def run_sharded():
+    """
+    Несколько процессов бота
+
+    bot_workers процессов обрабатывают обновления своих пользователей,
+    текущий процесс только принимает обновления (webhook или polling)
+    и передает их владельцу по telegram_id.
+    """
+    processes = start_shards()
+    logger.info(f"Started {len(processes)} bot worker processes")
+
+    # SIGTERM фронта останавливает и процессы бота
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        run()
     finally:
-        await bot.session.close()
+        stop_shards(processes)
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        if app_settings.bot_workers > 1:
+            run_sharded()
+        else:
+            run()
     except (KeyboardInterrupt, SystemExit):
         logger.info("Bot stopped")
     except Exception as e:
-        logger.error(f"Critical error: {e}", exc_info=True)
\ No newline at end of file
+        logger.error(f"Critical error: {e}", exc_info=True)
@@ -0,0 +1,128 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import Bot
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.middleware import FSMContextMiddleware
+from aiogram.fsm.storage.base import DEFAULT_DESTINY, StateType, StorageKey
+from aiogram.types import TelegramObject
+
+from src.bot.storage.base import FSMRecord, RecordStorage, state_name
+
+
+class BufferedFSMContext(FSMContext):
+    """
+    Контекст FSM одного обновления
+
+    Состояние и данные читаются из хранилища один раз при первом обращении,
+    изменения копятся в памяти и записываются одной операцией в flush.
+    Обработчик видит свои изменения сразу.
+    """
+
+    def __init__(self, storage, key: StorageKey) -> None:
+        super().__init__(storage=storage, key=key)
+        self._record: Optional[FSMRecord] = None
+        self._changed = False
+
+    async def _load(self) -> FSMRecord:
+        if self._record is None:
+            if isinstance(self.storage, RecordStorage):
+                record = await self.storage.get_record(self.key)
+            else:
+                record = FSMRecord(
+                    await self.storage.get_state(self.key),
+                    await self.storage.get_data(self.key),
+                )
+            # Копия: хранилище с кэшем не должно видеть изменения до flush
+            self._record = FSMRecord(record.state, dict(record.data))
+        return self._record
+
+    async def set_state(self, state: StateType = None) -> None:
+        record = await self._load()
+        record.state = state_name(state)
+        self._changed = True
+
+    async def get_state(self) -> Optional[str]:
+        return (await self._load()).state
+
+    async def set_data(self, data: Dict[str, Any]) -> None:
+        record = await self._load()
+        record.data = dict(data)
+        self._changed = True
+
+    async def get_data(self) -> Dict[str, Any]:
+        return dict((await self._load()).data)
+
+    async def update_data(self, data: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+        if data:
+            kwargs.update(data)
+        record = await self._load()
+        record.data.update(kwargs)
+        self._changed = True
+        return dict(record.data)
+
+    async def clear(self) -> None:
+        record = await self._load()
+        record.state = None
+        record.data = {}
+        self._changed = True
+
+    async def flush(self) -> None:
+        """Запись накопленных изменений в хранилище"""
+        if not self._changed:
+            return
+
+        record = self._record
+        if isinstance(self.storage, RecordStorage):
+            await self.storage.set_record(self.key, record.state, record.data)
+        else:
+            await self.storage.set_state(self.key, record.state)
+            await self.storage.set_data(self.key, record.data)
+        self._changed = False
+
+
+class BufferedFSMContextMiddleware(FSMContextMiddleware):
+    """
+    FSM middleware с BufferedFSMContext
+
+    Вместо трех-четырех обращений к хранилищу на шаг диалога
+    (get_data, update_data, set_state) - не больше двух: чтение
+    до обработчика и одна запись после него. Изменения записываются
+    и при ошибке в обработчике, как и без буферизации.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        context = self.resolve_event_context(data["bot"], data)
+        data["fsm_storage"] = self.storage
+        if context is None:
+            return await handler(event, data)
+
+        async with self.events_isolation.lock(key=context.key):
+            data.update({"state": context, "raw_state": await context.get_state()})
+            try:
+                return await handler(event, data)
+            finally:
+                await context.flush()
+
+    def get_context(
+        self,
+        bot: Bot,
+        chat_id: int,
+        user_id: int,
+        thread_id: Optional[int] = None,
+        destiny: str = DEFAULT_DESTINY,
+    ) -> BufferedFSMContext:
+        return BufferedFSMContext(
+            storage=self.storage,
+            key=StorageKey(
+                user_id=user_id,
+                chat_id=chat_id,
+                bot_id=bot.id,
+                thread_id=thread_id,
+                destiny=destiny,
+            ),
+        )
@@ -1,16 +1,156 @@
+import logging
+import time
+from functools import partial
 from typing import Any, Awaitable, Callable, Dict, Optional
 
 from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Message, TelegramObject
-from sqlalchemy import select
+from aiogram.types import User as TelegramUser
+from cachetools import TLRUCache
+from prometheus_client import Counter
+from redis.exceptions import RedisError
 
 from src.bot.i18n import I18nContext, get_user_language, simple_gettext
-from src.db.database import get_db_context
-from src.db.models import User
+from src.config.settings import settings
+from src.db.database import async_session_maker, current_telegram_id, get_read_db_context
+from src.db.queries import user_language
+from src.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_CACHE = Counter("bot_language_cache_total", "User language lookups by cache tier", ["result"])
+
+# Отсутствие записи в кэше (None - закэшированный незарегистрированный пользователь)
+_MISSING = object()
+
+# Метка сброшенной записи в Redis: пока она жива, язык не кэшируется повторно,
+# и чтение, начатое до смены языка, не запишет в общий кэш старый язык
+INVALIDATED = b"!"
+INVALIDATED_TTL_SECONDS = 30
+
+
+class LanguageCache:
+    """
+    Кэш языка пользователя: telegram_id -> language_code
+
+    Первый уровень - LRU в процессе, второй (language_cache_shared) - Redis,
+    общий для экземпляров бота. Незарегистрированный пользователь хранится
+    как None с коротким TTL: после регистрации язык читается из базы.
+    Смена языка вызывает invalidate после коммита.
+
+    invalidate сбрасывает первый уровень только своего процесса, поэтому
+    с общим уровнем записи в процессе живут language_cache_shared_local_ttl_seconds:
+    остальные экземпляры перечитывают язык из Redis через несколько секунд.
+
+    Общий уровень заполняется только через SET NX, а invalidate оставляет
+    вместо записи метку INVALIDATED: заполнение, прочитавшее базу до смены
+    языка, не перезапишет ее старым значением.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        shared: Optional[bool] = None,
+    ) -> None:
+        self.ttl = ttl or settings.language_cache_ttl_seconds
+        self.negative_ttl = negative_ttl or settings.language_cache_negative_ttl_seconds
+        self.shared = settings.language_cache_shared if shared is None else shared
+        local_ttl = min(self.ttl, settings.language_cache_shared_local_ttl_seconds) if self.shared else self.ttl
+        local_negative_ttl = min(self.negative_ttl, local_ttl)
+        self._local = TLRUCache(
+            maxsize=maxsize or settings.language_cache_size,
+            ttu=lambda _, value, now: now + (local_ttl if value is not None else local_negative_ttl),
+            timer=time.monotonic,
+        )
+
+    @staticmethod
+    def _key(telegram_id: int) -> str:
+        return f"lang:{telegram_id}"
+
+    async def get(
+        self,
+        telegram_id: int,
+        load: Callable[[int], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        """
+        Язык пользователя из кэша или, при промахе, из load
+
+        Args:
+            telegram_id: Telegram ID
+            load: Чтение языка из базы; None - пользователь не зарегистрирован
+
+        Returns:
+            Сохраненный язык или None
+        """
+        language = self._local.get(telegram_id, _MISSING)
+        if language is not _MISSING:
+            LANGUAGE_CACHE.labels("hit").inc()
+            return language
+
+        if self.shared:
+            try:
+                raw = await get_redis().get(self._key(telegram_id))
+            except (RedisError, OSError) as e:
+                # Общий уровень необязателен: без Redis читаем из базы
+                raw = None
+                logger.warning(f"Shared language cache unavailable: {e!r}")
+            if raw is not None and raw != INVALIDATED:
+                language = raw.decode() or None
+                self._local[telegram_id] = language
+                LANGUAGE_CACHE.labels("shared_hit").inc()
+                return language
+
+        LANGUAGE_CACHE.labels("miss").inc()
+        language = await load(telegram_id)
+        self._local[telegram_id] = language
+        if self.shared:
+            try:
+                await get_redis().set(
+                    self._key(telegram_id),
+                    language or "",
+                    ex=round(self.ttl if language is not None else self.negative_ttl),
+                    nx=True,
+                )
+            except (RedisError, OSError) as e:
+                logger.warning(f"Shared language cache unavailable: {e!r}")
+        return language
+
+    async def invalidate(self, telegram_id: int) -> None:
+        """Сброс записи после смены языка или регистрации"""
+        self._local.pop(telegram_id, None)
+        if self.shared:
+            try:
+                await get_redis().set(self._key(telegram_id), INVALIDATED, ex=INVALIDATED_TTL_SECONDS)
+            except (RedisError, OSError) as e:
+                logger.warning(f"Shared language cache unavailable, entry expires in {self.ttl}s: {e!r}")
+
+
+async def load_user_language(telegram_id: int, primary: bool = False) -> Optional[str]:
+    """
+    Сохраненный язык пользователя из базы
+
+    Args:
+        telegram_id: Telegram ID
+        primary: Читать с primary, а не с реплики (для общего кэша: отставшая
+            реплика оставила бы в нем старый язык на весь TTL)
+    """
+    session = async_session_maker() if primary else get_read_db_context(telegram_id)
+    async with session as db:
+        result = await db.execute(user_language(telegram_id))
+        return result.scalar_one_or_none()
+
+
+# Общий для middleware и обработчиков смены языка
+language_cache = LanguageCache()
 
 
 class I18nMiddleware(BaseMiddleware):
     """Middleware для обработки локализации"""
+
+    def __init__(self, cache: Optional[LanguageCache] = None) -> None:
+        self.cache = cache or language_cache
     
     async def __call__(
         self,
@@ -23,19 +163,29 @@ class I18nMiddleware(BaseMiddleware):
         if isinstance(event, (Message, CallbackQuery)):
             user = event.from_user
         
-        # Получаем сохраненный язык из БД
-        user_language = None
+        # Запоминаем пользователя обновления: по нему маршрутизируются чтения
+        # и помечаются записи для read-your-writes
+        token = current_telegram_id.set(user.id if user else None)
+        try:
+            return await self._handle(handler, event, data, user)
+        finally:
+            current_telegram_id.reset(token)
+
+    async def _handle(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+        user: Optional[TelegramUser],
+    ) -> Any:
+        # Получаем сохраненный язык: из кэша, при промахе - из БД
+        saved_language = None
         if user:
-            async with get_db_context() as db:
-                result = await db.execute(
-                    select(User).where(User.telegram_id == user.id)
-                )
-                db_user = result.scalar_one_or_none()
-                if db_user:
-                    user_language = db_user.language_code
+            load = partial(load_user_language, primary=True) if self.cache.shared else load_user_language
+            saved_language = await self.cache.get(user.id, load)
         
         # Определяем язык
-        lang_code = get_user_language(user, user_language)
+        lang_code = get_user_language(user, saved_language)
         
         # Создаем контекст i18n
         i18n = I18nContext(lang_code)
@@ -1,32 +1,107 @@
 import asyncio
-from datetime import datetime, timedelta
-from typing import Any, Awaitable, Callable, Dict, Optional
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
 
 from aiogram import BaseMiddleware
-from aiogram.types import CallbackQuery, Message, TelegramObject
-from cachetools import TTLCache
+from aiogram.types import CallbackQuery, Message, TelegramObject, Update
+from prometheus_client import Counter
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 from src.config.settings import settings
 
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = Counter("bot_rate_limited_total", "Updates rejected by the user rate limit", ["kind"])
+RATE_LIMIT_FALLBACKS = Counter(
+    "bot_rate_limit_fallbacks_total", "Rate limit checks done locally because Redis was unavailable"
+)
+
+# Минимальный размер таблицы, при котором из нее удаляются неактивные пользователи
+SWEEP_MIN_SIZE = 10_000
+
+# GCRA в Redis: проверка и запись TAT атомарны, время берется с сервера Redis,
+# поэтому часы процессов бота не влияют на лимит. Ключ живет, пока лимит действует.
+# KEYS[1] - ключ пользователя, ARGV - интервал и период в миллисекундах.
+# Возвращает 0 или через сколько миллисекунд событие пройдет
+GCRA_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now) + interval
+if tat - now > period then
+    return tat - now - period
+end
+redis.call('SET', KEYS[1], tat, 'PX', tat - now)
+return 0
+"""
+
+
+class GCRA:
+    """
+    GCRA (generic cell rate algorithm): limit событий за period
+
+    На ключ хранится одно число - теоретическое время следующего события
+    (TAT). Проверка - O(1) без истории событий; пачка до limit событий
+    проходит сразу, дальше - по одному через period / limit.
+    """
+
+    def __init__(self, limit: int, period: float = 60.0) -> None:
+        self.period = period
+        self.interval = period / limit
+        self._tat: Dict[Hashable, float] = {}
+        self._sweep_at = SWEEP_MIN_SIZE
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def hit(self, key: Hashable, now: Optional[float] = None) -> float:
+        """
+        Учет события
+
+        Returns:
+            0, если событие укладывается в лимит, иначе через сколько секунд оно пройдет
+        """
+        now = time.monotonic() if now is None else now
+        tat = max(self._tat.get(key, now), now) + self.interval
+        if tat - now > self.period:
+            return tat - now - self.period
+
+        self._tat[key] = tat
+        if len(self._tat) >= self._sweep_at:
+            self._sweep(now)
+        return 0.0
+
+    def _sweep(self, now: float) -> None:
+        """Удаление ключей с прошедшим TAT: для них лимит и так не действует"""
+        self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+        # Следующая чистка - после удвоения таблицы: в среднем O(1) на событие
+        self._sweep_at = max(SWEEP_MIN_SIZE, 2 * len(self._tat))
+
 
 class RateLimitMiddleware(BaseMiddleware):
-    """Middleware для ограничения частоты запросов"""
+    """
+    Middleware для ограничения частоты запросов
+
+    Регистрируется outer middleware обновлений раньше FSM и I18nMiddleware:
+    отклоненное обновление не доходит ни до хранилища FSM, ни до запросов
+    к базе. С redis лимит общий для всех процессов бота; пока Redis
+    недоступен, лимит считается в процессе.
+    """
 
     def __init__(
         self,
         messages_per_minute: int = None,
         commands_per_minute: int = None,
-        storage_time: int = 120,  # Время хранения в секундах
+        redis: Optional[Redis] = None,
     ):
-        self.messages_per_minute = messages_per_minute or settings.rate_limit_messages_per_minute
-        self.commands_per_minute = commands_per_minute or settings.rate_limit_commands_per_minute
-        
-        # Кэш для хранения истории запросов
-        self.message_storage = TTLCache(maxsize=10000, ttl=storage_time)
-        self.command_storage = TTLCache(maxsize=10000, ttl=storage_time)
-        
-        # Блокировка для потокобезопасности
-        self.lock = asyncio.Lock()
+        self.messages = GCRA(messages_per_minute or settings.rate_limit_messages_per_minute)
+        self.commands = GCRA(commands_per_minute or settings.rate_limit_commands_per_minute)
+        self.redis = redis
+        self._script = redis.register_script(GCRA_SCRIPT) if redis is not None else None
+        self._redis_retry_at = 0.0
 
     async def __call__(
         self,
@@ -35,26 +110,52 @@ class RateLimitMiddleware(BaseMiddleware):
         data: Dict[str, Any],
     ) -> Any:
         """Обработка события"""
-        user_id = self._get_user_id(event)
+        # На уровне обновления лимитируются только сообщения и нажатия кнопок
+        limited = event.message or event.callback_query if isinstance(event, Update) else event
+        user_id = self._get_user_id(limited)
         
         if not user_id:
             return await handler(event, data)
 
-        # Проверяем лимиты
-        is_command = self._is_command(event)
-        
-        async with self.lock:
-            if is_command:
-                if not await self._check_limit(user_id, self.command_storage, self.commands_per_minute):
-                    await self._send_limit_message(event, "команд")
-                    return
-            else:
-                if not await self._check_limit(user_id, self.message_storage, self.messages_per_minute):
-                    await self._send_limit_message(event, "сообщений")
-                    return
+        if self._is_command(limited):
+            if await self._hit(self.commands, f"{type(limited).__name__}:command", user_id):
+                RATE_LIMITED.labels("command").inc()
+                await self._send_limit_message(limited, "команд")
+                return
+        elif await self._hit(self.messages, f"{type(limited).__name__}:message", user_id):
+            RATE_LIMITED.labels("message").inc()
+            await self._send_limit_message(limited, "сообщений")
+            return
 
         return await handler(event, data)
 
+    async def _hit(self, limiter: GCRA, scope: str, user_id: int) -> float:
+        """
+        Учет события пользователя в Redis или, без Redis, в процессе
+
+        Returns:
+            0, если событие укладывается в лимит, иначе через сколько секунд оно пройдет
+        """
+        if self._script is not None and time.monotonic() >= self._redis_retry_at:
+            try:
+                retry_ms = await asyncio.wait_for(
+                    self._script(
+                        keys=[f"ratelimit:{scope}:{user_id}"],
+                        args=[round(limiter.interval * 1000), round(limiter.period * 1000)],
+                    ),
+                    settings.rate_limit_redis_timeout_seconds,
+                )
+                return retry_ms / 1000
+            except (RedisError, OSError, asyncio.TimeoutError) as e:
+                # Не ждем Redis на каждом обновлении: повторная попытка через паузу
+                self._redis_retry_at = time.monotonic() + settings.rate_limit_redis_retry_seconds
+                logger.warning(f"Redis rate limit unavailable, counting locally: {e!r}")
+
+        if self._script is not None:
+            RATE_LIMIT_FALLBACKS.inc()
+        # Проверка синхронная, без await: в цикле событий она атомарна и блокировка не нужна
+        return limiter.hit((scope, user_id))
+
     def _get_user_id(self, event: TelegramObject) -> Optional[int]:
         """Получение ID пользователя из события"""
         if isinstance(event, Message):
@@ -69,37 +170,6 @@ class RateLimitMiddleware(BaseMiddleware):
             return bool(event.text and event.text.startswith('/'))
         return False
 
-    async def _check_limit(
-        self,
-        user_id: int,
-        storage: TTLCache,
-        limit: int
-    ) -> bool:
-        """
-        Проверка лимита запросов
-        
-        Returns:
-            True если лимит не превышен
-        """
-        now = datetime.now()
-        minute_ago = now - timedelta(minutes=1)
-        
-        # Получаем историю запросов пользователя
-        user_history = storage.get(user_id, [])
-        
-        # Удаляем старые записи
-        user_history = [timestamp for timestamp in user_history if timestamp > minute_ago]
-        
-        # Проверяем лимит
-        if len(user_history) >= limit:
-            return False
-        
-        # Добавляем текущий запрос
-        user_history.append(now)
-        storage[user_id] = user_history
-        
-        return True
-
     async def _send_limit_message(self, event: TelegramObject, limit_type: str) -> None:
         """Отправка сообщения о превышении лимита"""
         message = (
@@ -110,4 +180,4 @@ class RateLimitMiddleware(BaseMiddleware):
         if isinstance(event, Message):
             await event.answer(message)
         elif isinstance(event, CallbackQuery):
-            await event.answer(message, show_alert=True)
\ No newline at end of file
+            await event.answer(message, show_alert=True)
@@ -0,0 +1,180 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Hashable, Iterator, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from cachetools import TTLCache
+from prometheus_client import Counter, Histogram
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Методы, на которые действуют лимиты Telegram на сообщения
+LIMITED_METHOD_PREFIXES = ("send", "copy", "forward", "edit")
+
+SENDS = Counter("bot_sends_total", "Rate limited Bot API calls", ["priority"])
+SEND_RETRIES = Counter("bot_send_retries_total", "Bot API calls retried after 429")
+SEND_WAIT_SECONDS = Histogram(
+    "bot_send_wait_seconds",
+    "Time a send waits for rate limit tokens",
+    ["priority"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+class SendPriority(IntEnum):
+    """Класс отправки: меньшее значение уходит раньше"""
+
+    INTERACTIVE = 0  # Ответы на действия пользователя
+    NOTIFICATION = 1  # Уведомления пользователю без его действия
+    BULK = 2  # Рассылки и уведомления администраторам
+
+
+send_priority: ContextVar[SendPriority] = ContextVar("send_priority", default=SendPriority.INTERACTIVE)
+
+
+@contextmanager
+def send_as(priority: SendPriority) -> Iterator[None]:
+    """Отправки внутри блока идут с указанным приоритетом"""
+    token = send_priority.set(priority)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity"""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Сколько ждать до появления токена"""
+        self._refill(time.monotonic())
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def reserve(self) -> float:
+        """
+        Взять токен, при необходимости в долг
+
+        Returns:
+            Сколько ждать до отправки
+        """
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def block(self, seconds: float) -> None:
+        """Следующий токен - не раньше чем через seconds (после 429)"""
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class SendLimitMiddleware(BaseRequestMiddleware):
+    """
+    Ограничение исходящих сообщений бота
+
+    Отправка ждет токен своего чата (send_chat_rate) и общий токен бота
+    (send_global_rate). Общие токены раздаются по приоритету: ответ
+    пользователю не стоит в очереди за рассылкой. Ответ 429 не теряет
+    сообщение: отправка повторяется через retry_after.
+    """
+
+    def __init__(
+        self,
+        global_rate: Optional[float] = None,
+        chat_rate: Optional[float] = None,
+        chat_burst: Optional[int] = None,
+        max_retries: Optional[int] = None,
+    ) -> None:
+        # Процессы бота делят общий лимит поровну
+        global_rate = global_rate or settings.send_global_rate / max(settings.bot_workers, 1)
+        self.chat_rate = chat_rate or settings.send_chat_rate
+        self.chat_burst = chat_burst or settings.send_chat_burst
+        self.max_retries = settings.send_max_retries if max_retries is None else max_retries
+        self.bucket = TokenBucket(global_rate, max(global_rate, 1))
+        # Бакет неактивного чата за минуту полностью восстанавливается - его можно забыть
+        self._chats: TTLCache = TTLCache(maxsize=100_000, ttl=60)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispenser: Optional[asyncio.Task] = None
+
+    def _chat_bucket(self, chat_id: Hashable) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    async def _acquire(self, priority: SendPriority) -> None:
+        """Общий токен бота: сразу, если никто не ждет, иначе в порядке приоритета"""
+        if not self._waiters and self.bucket.delay() == 0:
+            self.bucket.reserve()
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        if self._dispenser is None or self._dispenser.done():
+            self._dispenser = asyncio.create_task(self._dispense())
+        await waiter
+
+    async def _dispense(self) -> None:
+        while self._waiters:
+            await asyncio.sleep(self.bucket.delay())
+            _, _, waiter = heapq.heappop(self._waiters)
+            # Отмененная отправка токен не расходует
+            if not waiter.done():
+                self.bucket.reserve()
+                waiter.set_result(None)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None or not method.__api_method__.startswith(LIMITED_METHOD_PREFIXES):
+            return await make_request(bot, method)
+
+        priority = send_priority.get()
+        label = priority.name.lower()
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            delay = self._chat_bucket(chat_id).reserve()
+            if delay:
+                await asyncio.sleep(delay)
+            await self._acquire(priority)
+            SEND_WAIT_SECONDS.labels(label).observe(time.monotonic() - started)
+
+            try:
+                response = await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    logger.error(f"{method.__api_method__} to chat {chat_id} failed after {attempt} retries: {e.message}")
+                    raise
+                SEND_RETRIES.inc()
+                logger.warning(f"{method.__api_method__} to chat {chat_id} hit flood control, retry in {e.retry_after}s")
+                self._chat_bucket(chat_id).block(e.retry_after)
+                continue
+
+            SENDS.labels(label).inc()
+            return response
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+from prometheus_client import Counter, Gauge, Histogram
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+UPDATES_PENDING = Gauge("bot_updates_pending", "Updates waiting in the scheduler")
+CHATS_PENDING = Gauge("bot_chats_pending", "Chats with updates waiting or in progress")
+UPDATES_REJECTED = Counter("bot_updates_rejected_total", "Updates rejected by the scheduler", ["reason"])
+UPDATE_WAIT_SECONDS = Histogram(
+    "bot_update_wait_seconds",
+    "Time an update waits in the scheduler before processing",
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+def update_chat_key(update: Update) -> Hashable:
+    """Ключ очереди обновления: чат, без чата - пользователь, иначе само обновление"""
+    chat, user, _ = UserContextMiddleware.resolve_event_context(update)
+    if chat is not None:
+        return chat.id
+    if user is not None:
+        return user.id
+    return ("update", update.update_id)
+
+
+class UpdateScheduler:
+    """
+    Планировщик обновлений перед диспетчером
+
+    У каждого чата своя очередь: следующее обновление чата обрабатывается
+    только после предыдущего, поэтому двойное нажатие (два confirm_send,
+    два контакта в process_phone) видит состояние FSM после первого.
+    Разные чаты обрабатываются параллельно пулом из update_workers
+    обработчиков; чаты с ожидающими обновлениями обслуживаются по кругу.
+
+    Очередь ограничена: всего не больше update_queue_size обновлений,
+    на чат - не больше update_chat_queue_size.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        dispatcher: Dispatcher,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        chat_queue_size: Optional[int] = None,
+    ) -> None:
+        self.bot = bot
+        self.dispatcher = dispatcher
+        self.workers = workers or settings.update_workers
+        self.queue_size = queue_size or settings.update_queue_size
+        self.chat_queue_size = chat_queue_size or settings.update_chat_queue_size
+        # Ключ есть в _chats, пока чат стоит в _ready или обрабатывается
+        self._chats: Dict[Hashable, Deque[Tuple[Update, float]]] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._pending = 0
+        self._space = asyncio.Event()
+        self._space.set()
+        self._tasks: List[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def submit(self, update: Update) -> bool:
+        """
+        Постановка обновления в очередь его чата без ожидания
+
+        Returns:
+            False, если очередь переполнена и обновление отброшено
+        """
+        if self._pending >= self.queue_size:
+            UPDATES_REJECTED.labels("queue_full").inc()
+            return False
+
+        key = update_chat_key(update)
+        chat_queue = self._chats.get(key)
+        if chat_queue is None:
+            chat_queue = self._chats[key] = deque()
+            self._ready.put_nowait(key)
+            CHATS_PENDING.inc()
+        elif len(chat_queue) >= self.chat_queue_size:
+            UPDATES_REJECTED.labels("chat_queue_full").inc()
+            return False
+
+        chat_queue.append((update, asyncio.get_running_loop().time()))
+        self._pending += 1
+        UPDATES_PENDING.inc()
+        if self._pending >= self.queue_size:
+            self._space.clear()
+        return True
+
+    async def put(self, update: Update) -> bool:
+        """Постановка обновления с ожиданием места в общей очереди (для polling)"""
+        while self._pending >= self.queue_size:
+            await self._space.wait()
+        return self.submit(update)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            key = await self._ready.get()
+            chat_queue = self._chats[key]
+            update, queued_at = chat_queue.popleft()
+            self._pending -= 1
+            UPDATES_PENDING.dec()
+            self._space.set()
+            UPDATE_WAIT_SECONDS.observe(loop.time() - queued_at)
+
+            try:
+                await self.dispatcher.feed_update(self.bot, update)
+            except Exception as e:
+                logger.error(f"Update {update.update_id} processing error: {e}", exc_info=True)
+            finally:
+                # Следующее обновление чата - в конец круга, чтобы один чат не занимал обработчик
+                if chat_queue:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._chats[key]
+                    CHATS_PENDING.dec()
+                self._ready.task_done()
+
+    def start_workers(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop_workers(self, drain_seconds: Optional[float] = None) -> None:
+        """Разбор оставшихся обновлений (не дольше drain_seconds) и остановка обработчиков"""
+        drain_seconds = settings.update_drain_seconds if drain_seconds is None else drain_seconds
+        try:
+            await asyncio.wait_for(self._ready.join(), drain_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"Update scheduler not drained, {self._pending} updates dropped")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def start(self) -> None:
+        """Хуки запуска диспетчера и запуск обработчиков"""
+        await self.dispatcher.emit_startup(
+            bot=self.bot, dispatcher=self.dispatcher, bots=[self.bot], **self.dispatcher.workflow_data
+        )
+        self.start_workers()
+        logger.info(f"Update scheduler started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Разбор очереди, остановка обработчиков и хуки остановки диспетчера"""
+        await self.stop_workers()
+        await self.dispatcher.emit_shutdown(
+            bot=self.bot, dispatcher=self.dispatcher, bots=[self.bot], **self.dispatcher.workflow_data
+        )
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple, Union
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from src.bot.scheduler import UpdateScheduler, update_chat_key
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Размер строки (одного обновления) в сокете процесса
+SHARD_LINE_LIMIT = 4 * 1024 * 1024
+SHARD_CONNECT_SECONDS = 30
+# Период проверки процессов бота супервизором
+SHARD_SUPERVISE_SECONDS = 1
+
+
+def shard_of(telegram_id: int, shards: int) -> int:
+    """Номер процесса, обрабатывающего пользователя"""
+    return zlib.crc32(telegram_id.to_bytes(8, "big", signed=True)) % shards
+
+
+def update_shard(update: Update, shards: int) -> int:
+    """
+    Номер процесса для обновления
+
+    Ключ тот же, что у очереди UpdateScheduler (чат, без чата -
+    пользователь): обновления чата, в том числе группы с разными
+    пользователями, попадают в один процесс, и его планировщик сохраняет
+    их порядок. Кэш FSM-хранилища (ключ - чат и пользователь) тоже
+    не расходится между процессами.
+    """
+    key = update_chat_key(update)
+    if isinstance(key, int):
+        return shard_of(key, shards)
+    return update.update_id % shards
+
+
+def shard_socket_path(index: int) -> str:
+    return os.path.join(settings.bot_shard_socket_dir, f"kreditscore-bot-{index}.sock")
+
+
+class ShardRouter:
+    """
+    Передача обновлений процессам бота
+
+    Фронтовой процесс (webhook или polling) только выбирает процесс по
+    telegram_id и пишет обновление строкой JSON в его Unix-сокет. Процесс
+    читает сокет не быстрее, чем разбирает свою очередь, поэтому при
+    перегрузке растет буфер отправки: сверх bot_shard_buffer_bytes
+    submit отклоняет обновление, а put ждет. Разорванное соединение
+    (процесс упал и перезапускается) восстанавливается в фоне.
+    """
+
+    def __init__(self, shards: Optional[int] = None, buffer_bytes: Optional[int] = None) -> None:
+        self.shards = shards or settings.bot_workers
+        self.buffer_bytes = buffer_bytes or settings.bot_shard_buffer_bytes
+        self._connections: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._reconnects: Dict[int, asyncio.Task] = {}
+
+    async def _connect(self, index: int) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        # Процесс мог еще не открыть сокет - ждем его запуска
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SHARD_CONNECT_SECONDS
+        while True:
+            try:
+                return await asyncio.open_unix_connection(shard_socket_path(index))
+            except (FileNotFoundError, ConnectionRefusedError):
+                if loop.time() > deadline:
+                    raise
+                await asyncio.sleep(0.5)
+
+    async def start(self) -> None:
+        self._connections = [await self._connect(index) for index in range(self.shards)]
+        logger.info(f"Connected to {self.shards} bot worker processes")
+
+    async def stop(self) -> None:
+        for task in self._reconnects.values():
+            task.cancel()
+        await asyncio.gather(*self._reconnects.values(), return_exceptions=True)
+        self._reconnects = {}
+        for _, writer in self._connections:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except (ConnectionError, OSError) as e:
+                logger.warning(f"Bot worker connection close error: {e}")
+        self._connections = []
+
+    async def _reconnect(self, index: int) -> None:
+        _, writer = self._connections[index]
+        writer.close()
+        try:
+            self._connections[index] = await self._connect(index)
+            logger.info(f"Reconnected to bot worker {index}")
+        except OSError as e:
+            logger.error(f"Bot worker {index} is unavailable: {e}")
+        finally:
+            del self._reconnects[index]
+
+    def _writer(self, update: Update) -> Tuple[int, Optional[asyncio.StreamWriter]]:
+        """
+        Соединение с процессом обновления
+
+        Returns:
+            (номер процесса, writer или None, пока соединение восстанавливается)
+        """
+        index = update_shard(update, self.shards)
+        reader, writer = self._connections[index]
+        # Процесс закрывает сокет, только когда падает: конец чтения значит разрыв
+        if writer.is_closing() or reader.at_eof():
+            if index not in self._reconnects:
+                logger.warning(f"Connection to bot worker {index} lost, reconnecting")
+                self._reconnects[index] = asyncio.create_task(self._reconnect(index))
+            return index, None
+        return index, writer
+
+    @staticmethod
+    def _encode(update: Update) -> bytes:
+        return update.model_dump_json(exclude_unset=True).encode() + b"\n"
+
+    def submit(self, update: Update) -> bool:
+        """
+        Отправка обновления процессу без ожидания
+
+        Returns:
+            False, если процесс не успевает разбирать обновления или недоступен
+        """
+        _, writer = self._writer(update)
+        if writer is None or writer.transport.get_write_buffer_size() > self.buffer_bytes:
+            return False
+        writer.write(self._encode(update))
+        return True
+
+    async def put(self, update: Update) -> bool:
+        """Отправка обновления с ожиданием, пока процесс примет данные (для polling)"""
+        index, writer = self._writer(update)
+        if writer is None:
+            await asyncio.shield(self._reconnects[index])
+            index, writer = self._writer(update)
+            if writer is None:
+                return False
+        writer.write(self._encode(update))
+        try:
+            await writer.drain()
+        except (ConnectionError, OSError) as e:
+            logger.warning(f"Bot worker {index} connection error: {e}")
+            return False
+        return True
+
+
+def create_scheduler(bot: Bot, dp: Dispatcher) -> Union[UpdateScheduler, ShardRouter]:
+    """Планировщик фронтового процесса: свой UpdateScheduler или процессы бота"""
+    if settings.bot_workers > 1:
+        return ShardRouter()
+    return UpdateScheduler(bot, dp)
+
+
+async def read_updates(reader: asyncio.StreamReader, bot: Bot, scheduler: UpdateScheduler) -> None:
+    """
+    Разбор обновлений из сокета фронта
+
+    Ошибка в одной строке (слишком длинная, не разбирается) отбрасывает
+    только это обновление: соединение с фронтом остается открытым.
+    """
+    while True:
+        try:
+            line = await reader.readline()
+        except ValueError as e:
+            # Строка длиннее SHARD_LINE_LIMIT: StreamReader уже отбросил ее
+            logger.error(f"Update from the front dropped: {e}")
+            continue
+        if not line:
+            return
+        try:
+            update = Update.model_validate_json(line, context={"bot": bot})
+            # Пока очередь полна, сокет не читается - фронт видит это по буферу отправки
+            if not await scheduler.put(update):
+                logger.warning(f"Chat queue is full, update {update.update_id} dropped")
+        except Exception as e:
+            logger.error(f"Update from the front dropped: {e}", exc_info=True)
+
+
+async def serve_shard(index: int) -> None:
+    """Процесс бота: разбор обновлений из своего сокета до SIGTERM"""
+    from src.bot.dispatcher import create_bot, create_dispatcher
+
+    bot = create_bot()
+    dp = create_dispatcher()
+    dp["shard"] = index
+    scheduler = UpdateScheduler(bot, dp)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await read_updates(reader, bot, scheduler)
+        finally:
+            writer.close()
+
+    path = shard_socket_path(index)
+    if os.path.exists(path):
+        os.unlink(path)
+
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    await scheduler.start()
+    server = await asyncio.start_unix_server(handle, path, limit=SHARD_LINE_LIMIT)
+    logger.info(f"Bot worker {index} listening on {path}")
+    try:
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        server.close()
+        try:
+            await scheduler.stop()
+        finally:
+            await bot.session.close()
+        logger.info(f"Bot worker {index} stopped")
+
+
+def _run_shard(index: int) -> None:
+    # Процесс наследует настройку логирования только при fork - повторяем ее
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level),
+        format=f"%(asctime)s - shard {index} - %(name)s - %(levelname)s - %(message)s",
+    )
+    try:
+        asyncio.run(serve_shard(index))
+    except KeyboardInterrupt:
+        pass
+
+
+def _start_shard(index: int) -> multiprocessing.Process:
+    process = multiprocessing.get_context("spawn").Process(
+        target=_run_shard, args=(index,), name=f"bot-shard-{index}"
+    )
+    process.start()
+    return process
+
+
+# Супервизор процессов бота и сигнал его остановки
+_stopping = threading.Event()
+_supervisor: Optional[threading.Thread] = None
+
+
+def _supervise(processes: List[multiprocessing.Process]) -> None:
+    """Перезапуск упавших процессов бота до stop_shards"""
+    while not _stopping.wait(SHARD_SUPERVISE_SECONDS):
+        for index, process in enumerate(processes):
+            if not process.is_alive():
+                logger.error(f"{process.name} exited with code {process.exitcode}, restarting")
+                processes[index] = _start_shard(index)
+
+
+def start_shards() -> List[multiprocessing.Process]:
+    """Запуск bot_workers процессов бота и супервизора, перезапускающего упавшие"""
+    global _supervisor
+    processes = [_start_shard(index) for index in range(settings.bot_workers)]
+    _stopping.clear()
+    _supervisor = threading.Thread(target=_supervise, args=(processes,), name="bot-shard-supervisor", daemon=True)
+    _supervisor.start()
+    return processes
+
+
+def stop_shards(processes: List[multiprocessing.Process]) -> None:
+    """Остановка процессов бота: SIGTERM, затем ожидание разбора их очередей"""
+    # Сначала супервизор: иначе он перезапустит останавливаемые процессы
+    _stopping.set()
+    if _supervisor is not None:
+        _supervisor.join()
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(settings.update_drain_seconds + 5)
+        if process.is_alive():
+            logger.warning(f"{process.name} did not stop, killing")
+            process.kill()
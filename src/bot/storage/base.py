@@ -0,0 +1,58 @@
+from abc import abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import DEFAULT_DESTINY, BaseStorage, StateType, StorageKey
+
+
+def storage_key(key: StorageKey) -> str:
+    """Строковый ключ FSM: бот:чат:пользователь[:тред][:destiny]"""
+    parts = [str(key.bot_id), str(key.chat_id), str(key.user_id)]
+    if key.thread_id:
+        parts.append(str(key.thread_id))
+    if key.destiny != DEFAULT_DESTINY:
+        parts.append(key.destiny)
+    return ":".join(parts)
+
+
+def state_name(state: StateType) -> Optional[str]:
+    return state.state if isinstance(state, State) else state
+
+
+@dataclass
+class FSMRecord:
+    """Состояние и данные FSM одного ключа"""
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class RecordStorage(BaseStorage):
+    """
+    FSM-хранилище, которое читает и пишет состояние и данные одной записью
+
+    Отдельные операции BaseStorage выражены через get_record/set_record,
+    хранилища могут переопределить их более дешевыми.
+    """
+
+    @abstractmethod
+    async def get_record(self, key: StorageKey) -> FSMRecord:
+        """Состояние и данные ключа за одно обращение"""
+
+    @abstractmethod
+    async def set_record(self, key: StorageKey, state: Optional[str], data: Dict[str, Any]) -> None:
+        """Замена состояния и данных ключа за одно обращение"""
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self.get_record(key)
+        await self.set_record(key, state_name(state), record.data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self.get_record(key)).state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        record = await self.get_record(key)
+        await self.set_record(key, record.state, data)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return dict((await self.get_record(key)).data)
@@ -0,0 +1,66 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict
+
+import msgpack
+
+# Данные FSM содержат суммы и ставки в Decimal: обычный JSON или msgpack
+# превратил бы их в float или строки, поэтому Decimal и datetime
+# кодируются с меткой типа (в msgpack - типом расширения)
+
+_DECIMAL_EXT = 1
+_DATETIME_EXT = 2
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {"__decimal__": str(value)}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в данные FSM")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "__decimal__" in obj:
+            return Decimal(obj["__decimal__"])
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def dumps(data: Dict[str, Any]) -> str:
+    """Данные FSM в JSON"""
+    return json.dumps(data, default=_encode, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(raw: str) -> Dict[str, Any]:
+    """Данные FSM из JSON"""
+    return json.loads(raw, object_hook=_decode)
+
+
+def _pack_ext(value: Any) -> msgpack.ExtType:
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_DECIMAL_EXT, str(value).encode())
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_DATETIME_EXT, value.isoformat().encode())
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в данные FSM")
+
+
+def _unpack_ext(code: int, payload: bytes) -> Any:
+    if code == _DECIMAL_EXT:
+        return Decimal(payload.decode())
+    if code == _DATETIME_EXT:
+        return datetime.fromisoformat(payload.decode())
+    return msgpack.ExtType(code, payload)
+
+
+def packb(data: Dict[str, Any]) -> bytes:
+    """Данные FSM в msgpack"""
+    return msgpack.packb(data, default=_pack_ext, use_bin_type=True)
+
+
+def unpackb(raw: bytes) -> Dict[str, Any]:
+    """Данные FSM из msgpack"""
+    return msgpack.unpackb(raw, ext_hook=_unpack_ext, raw=False)
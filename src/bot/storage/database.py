@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy.dialects.postgresql import insert
+
+from src.bot.storage import codec
+from src.bot.storage.base import FSMRecord, RecordStorage, storage_key
+from src.config.settings import settings
+from src.db.database import get_db_context
+from src.db.models import BotState
+from src.db.queries import bot_state_by_key
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseStorage(RecordStorage):
+    """
+    FSM-хранилище в таблице bot_states
+
+    Чтение и запись идут через LRU-кэш в памяти. Изменение только помечает
+    ключ грязным, фоновая задача пишет грязные ключи пачкой upsert раз
+    в fsm_flush_seconds: несколько шагов диалога между сбросами сливаются
+    в одну строку, и шаг не ждет записи в базу. База читается только
+    при промахе кэша.
+
+    Кэш предполагает, что обновления одного пользователя обрабатывает
+    один процесс бота.
+    """
+
+    def __init__(
+        self,
+        cache_size: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+        flush_batch: Optional[int] = None,
+    ) -> None:
+        self.cache_size = cache_size or settings.fsm_cache_size
+        self.flush_seconds = flush_seconds or settings.fsm_flush_seconds
+        self.flush_batch = flush_batch or settings.fsm_flush_batch
+        self._cache: "OrderedDict[str, FSMRecord]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        # Ключи, чья запись в базу еще не подтверждена: их нельзя вытеснять
+        self._inflight: Set[str] = set()
+        self._ready = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def get_record(self, key: StorageKey) -> FSMRecord:
+        """Запись FSM из кэша, при промахе - из базы"""
+        name = storage_key(key)
+        record = self._cache.get(name)
+        if record is None:
+            loaded = await self._load(name)
+            # Пока шло чтение, ключ мог быть записан - значение в кэше новее
+            record = self._cache.setdefault(name, loaded)
+            self._evict()
+        else:
+            self._cache.move_to_end(name)
+        return record
+
+    async def set_record(self, key: StorageKey, state: Optional[str], data: Dict[str, Any]) -> None:
+        """Замена записи FSM; в базу она попадет при следующем сбросе"""
+        name = storage_key(key)
+        self._cache[name] = FSMRecord(state, dict(data))
+        self._cache.move_to_end(name)
+        self._mark_dirty(name)
+        self._evict()
+
+    async def _load(self, name: str) -> FSMRecord:
+        async with get_db_context() as db:
+            row = (await db.execute(bot_state_by_key(name))).first()
+
+        if row is None:
+            return FSMRecord()
+        return FSMRecord(row.state, codec.loads(row.state_data) if row.state_data else {})
+
+    def _mark_dirty(self, name: str) -> None:
+        self._dirty.add(name)
+        if len(self._dirty) >= self.flush_batch:
+            self._ready.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    def _evict(self) -> None:
+        # Вытесняются только записанные в базу ключи, начиная с давно не используемых.
+        # Ключ, который сейчас пишется, еще не в базе: после вытеснения чтение
+        # вернуло бы из базы прежнее состояние
+        while len(self._cache) > self.cache_size:
+            for name in self._cache:
+                if name not in self._dirty and name not in self._inflight:
+                    del self._cache[name]
+                    break
+            else:
+                # Все записи ждут сброса: кэш временно растет до ближайшей записи
+                self._ready.set()
+                return
+
+    async def flush(self) -> int:
+        """
+        Запись грязных ключей одним upsert
+
+        Returns:
+            Количество записанных ключей
+        """
+        if not self._dirty:
+            return 0
+
+        # Порядок ключей одинаков во всех процессах - upsert'ы не взаимоблокируются
+        names = [name for name in sorted(self._dirty) if name in self._cache]
+        now = datetime.utcnow()
+        rows = [
+            {
+                "storage_key": name,
+                "state": self._cache[name].state,
+                "state_data": codec.dumps(self._cache[name].data),
+                "updated_at": now,
+            }
+            for name in names
+        ]
+        # Снимок сделан: изменения во время записи снова пометят ключ грязным
+        self._dirty.clear()
+        self._inflight.update(names)
+
+        stmt = insert(BotState)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BotState.storage_key],
+            set_={
+                "state": stmt.excluded.state,
+                "state_data": stmt.excluded.state_data,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+
+        try:
+            async with get_db_context() as db:
+                await db.execute(stmt, rows)
+        except BaseException:
+            # Ошибка или отмена посреди записи: ключи снова ждут сброса
+            self._dirty.update(names)
+            raise
+        finally:
+            self._inflight.difference_update(names)
+
+        # Пока шла запись, кэш мог вырасти сверх размера
+        self._evict()
+        return len(rows)
+
+    async def _run(self) -> None:
+        # Флаг, а не только отмена: в Python 3.11 wait_for теряет отмену,
+        # пришедшую одновременно с событием _ready
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._ready.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"FSM storage flush error: {e}", exc_info=True)
+
+    async def close(self) -> None:
+        """Остановка фоновой записи и сброс оставшихся изменений"""
+        self._closing = True
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"FSM storage final flush error: {e}", exc_info=True)
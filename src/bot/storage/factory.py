@@ -0,0 +1,15 @@
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from src.bot.storage.database import DatabaseStorage
+from src.bot.storage.redis import RedisStorage
+from src.config.settings import settings
+
+
+def create_storage() -> BaseStorage:
+    """FSM-хранилище по настройке fsm_storage"""
+    if settings.fsm_storage == "db":
+        return DatabaseStorage()
+    if settings.fsm_storage == "redis":
+        return RedisStorage()
+    return MemoryStorage()
@@ -0,0 +1,92 @@
+from typing import Any, Dict, List, Optional
+
+from aiogram.fsm.storage.base import StateType, StorageKey
+from redis.asyncio import Redis
+
+from src.bot.storage import codec
+from src.bot.storage.base import FSMRecord, RecordStorage, state_name, storage_key
+from src.config.settings import settings
+from src.db.redis import get_redis
+
+STATE_FIELD = "state"
+DATA_FIELD = "data"
+
+
+class RedisStorage(RecordStorage):
+    """
+    FSM-хранилище в Redis, общее для всех процессов бота
+
+    Ключ FSM - один hash с полями state и data (msgpack). Каждая операция -
+    один конвейер: чтение или запись полей вместе с продлением TTL, так что
+    брошенный диалог удаляется через fsm_state_ttl_seconds бездействия.
+    Состояние и данные меняются независимо, без чтения второго поля.
+    """
+
+    def __init__(self, redis: Optional[Redis] = None, ttl: Optional[int] = None) -> None:
+        self.redis = redis or get_redis()
+        self.ttl = ttl or settings.fsm_state_ttl_seconds
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return f"fsm:{storage_key(key)}"
+
+    async def _write(self, key: StorageKey, values: Dict[str, bytes], removed: List[str]) -> None:
+        name = self._key(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if values:
+                pipe.hset(name, mapping=values)
+            if removed:
+                pipe.hdel(name, *removed)
+            # Пустой hash Redis удаляет сам; EXPIRE по отсутствующему ключу ничего не делает
+            pipe.expire(name, self.ttl)
+            await pipe.execute()
+
+    async def get_record(self, key: StorageKey) -> FSMRecord:
+        name = self._key(key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(name, STATE_FIELD, DATA_FIELD)
+            pipe.expire(name, self.ttl)
+            (state, data), _ = await pipe.execute()
+
+        return FSMRecord(
+            state.decode() if state is not None else None,
+            codec.unpackb(data) if data is not None else {},
+        )
+
+    async def set_record(self, key: StorageKey, state: Optional[str], data: Dict[str, Any]) -> None:
+        values = {}
+        removed = []
+        if state is not None:
+            values[STATE_FIELD] = state.encode()
+        else:
+            removed.append(STATE_FIELD)
+        if data:
+            values[DATA_FIELD] = codec.packb(data)
+        else:
+            removed.append(DATA_FIELD)
+        await self._write(key, values, removed)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state = state_name(state)
+        if state is None:
+            await self._write(key, {}, [STATE_FIELD])
+        else:
+            await self._write(key, {STATE_FIELD: state.encode()}, [])
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        name = self._key(key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hget(name, STATE_FIELD)
+            pipe.expire(name, self.ttl)
+            state, _ = await pipe.execute()
+        return state.decode() if state is not None else None
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        if data:
+            await self._write(key, {DATA_FIELD: codec.packb(data)}, [])
+        else:
+            await self._write(key, {}, [DATA_FIELD])
+
+    async def close(self) -> None:
+        # Клиент общий, его закрывает close_redis при остановке процесса
+        pass
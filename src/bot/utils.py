@@ -1,12 +1,23 @@
+import asyncio
+import logging
 import re
 from decimal import Decimal
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Optional, Set, Tuple
 
 from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
 from aiogram.types import User as TelegramUser
+from prometheus_client import Counter
 
+from src.bot.middleware.send_limit import SendPriority, send_as
+from src.config.settings import settings
+from src.core.banks import BankDecision, bank_names
 from src.core.enums import DeviceType
 
+logger = logging.getLogger(__name__)
+
+ADMIN_NOTIFICATIONS = Counter("bot_admin_notifications_total", "Admin notifications by outcome", ["outcome"])
+
 
 def validate_phone_number(phone: str) -> Optional[str]:
     """
@@ -166,6 +177,22 @@ def format_loan_summary(loan_data: dict, translate=None) -> str:
     return summary
 
 
+def format_bank_offers(offers: Iterable[BankDecision], translate=None) -> str:
+    """Уведомление об одобренных предложениях банков, до 3 лучших по ставке"""
+    _ = translate if translate else lambda x: x
+    names = bank_names()
+    
+    text = f"📱 **{_('SMS from banks received!')}**\n\n"
+    text += f"{_('Offers received:')}\n\n"
+    for offer in sorted(offers, key=lambda offer: offer.annual_rate)[:3]:
+        text += f"🏦 **{_(names.get(offer.bank_code, offer.bank_code))}**\n"
+        text += f"   {_('Rate')}: {offer.annual_rate}%\n"
+        text += f"   {_('Status: Pre-approved')}\n\n"
+    
+    text += _('Contact selected bank to complete loan.')
+    return text
+
+
 def detect_device_type(user: TelegramUser) -> DeviceType:
     """
     Определение типа устройства пользователя
@@ -185,11 +212,57 @@ def escape_markdown(text: str) -> str:
     return text
 
 
+# Окно повторяющихся уведомлений: (текст, получатели) -> сколько повторов подавлено
+_admin_digests: Dict[Tuple[str, Tuple[int, ...]], int] = {}
+_admin_digest_tasks: Set[asyncio.Task] = set()
+
+
+async def _send_to_admins(bot: Bot, message: str, admin_ids: Iterable[int]) -> None:
+    """Отправка всем администраторам одновременно, не больше admin_notify_concurrency сразу"""
+    semaphore = asyncio.Semaphore(settings.admin_notify_concurrency)
+
+    async def send(admin_id: int) -> None:
+        async with semaphore:
+            try:
+                await bot.send_message(admin_id, message, parse_mode="Markdown")
+            except TelegramAPIError as e:
+                # Ошибка отправки одному админу не мешает остальным
+                ADMIN_NOTIFICATIONS.labels("failed").inc()
+                logger.warning(f"Admin notification to {admin_id} failed: {e}")
+            else:
+                ADMIN_NOTIFICATIONS.labels("sent").inc()
+
+    with send_as(SendPriority.BULK):
+        await asyncio.gather(*(send(admin_id) for admin_id in admin_ids))
+
+
+async def _send_admin_digest(bot: Bot, key: Tuple[str, Tuple[int, ...]], window: float) -> None:
+    """По окончании окна - одна сводка о подавленных повторах"""
+    await asyncio.sleep(window)
+    repeated = _admin_digests.pop(key, 0)
+    if repeated:
+        message, admin_ids = key
+        await _send_to_admins(bot, f"{message}\n\n_Повторилось еще {repeated} раз за {window:g} с_", admin_ids)
+
+
 async def notify_admins(bot: Bot, message: str, admin_ids: list[int]) -> None:
-    """Отправка уведомлений администраторам"""
-    for admin_id in admin_ids:
-        try:
-            await bot.send_message(admin_id, message, parse_mode="Markdown")
-        except Exception:
-            # Игнорируем ошибки отправки отдельным админам
-            pass
\ No newline at end of file
+    """
+    Отправка уведомлений администраторам
+
+    Первое уведомление отправляется сразу. Такие же уведомления в течение
+    admin_notify_digest_seconds только считаются и уходят одной сводкой
+    в конце окна: всплеск ошибок не превращается в поток одинаковых сообщений.
+    """
+    window = settings.admin_notify_digest_seconds
+    key = (message, tuple(admin_ids))
+    if key in _admin_digests:
+        _admin_digests[key] += 1
+        ADMIN_NOTIFICATIONS.labels("coalesced").inc()
+        return
+
+    if window > 0:
+        _admin_digests[key] = 0
+        task = asyncio.create_task(_send_admin_digest(bot, key, window))
+        _admin_digest_tasks.add(task)
+        task.add_done_callback(_admin_digest_tasks.discard)
+    await _send_to_admins(bot, message, admin_ids)
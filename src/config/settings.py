@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Dict, Literal, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -13,12 +13,87 @@ class Settings(BaseSettings):
     webhook_secret: Optional[str] = None
     bot_username: str = "KreditScoreBot"
     
+    # Обработка обновлений: по порядку внутри чата, параллельно между чатами
+    update_workers: int = 8
+    update_queue_size: int = 1000  # Всего ожидающих обновлений; при переполнении webhook отвечает 503
+    update_chat_queue_size: int = 20  # Ожидающих обновлений одного чата, лишние отбрасываются
+    update_drain_seconds: float = 10.0  # Сколько ждать разбора очереди при остановке
+    
+    # Процессы бота: при bot_workers > 1 обновления распределяются по процессам по telegram_id
+    bot_workers: int = 1
+    bot_shard_socket_dir: str = "/tmp"  # Unix-сокеты процессов бота
+    bot_shard_buffer_bytes: int = 1048576  # Неотправленные в процесс байты, сверх - 503 для webhook
+    
+    # Исходящие сообщения: лимиты Telegram (~30 сообщений/с на бота, ~1/с в чат)
+    send_global_rate: float = 30.0  # На бота целиком, делится между bot_workers процессами
+    send_chat_rate: float = 1.0
+    send_chat_burst: int = 3  # Сколько сообщений подряд можно отправить в чат без ожидания
+    send_max_retries: int = 3  # Повторы после 429 (retry_after)
+    
     # Database
     database_url: str
+    database_replica_url: Optional[str] = None
     postgres_user: str = "kreditscore_user"
     postgres_password: str = "secure_password"
     postgres_db: str = "kreditscore"
     
+    # Пул соединений и кэширование запросов
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_statement_cache_size: int = 500  # Prepared statements asyncpg на соединение
+    db_compiled_cache_size: int = 1000  # Кэш скомпилированного SQL в SQLAlchemy
+    db_pgbouncer_transaction_mode: bool = False  # PgBouncer pool_mode=transaction
+    
+    # Read replica: сколько секунд после записи читать пользователя с primary
+    replica_read_your_writes_seconds: int = 5
+    
+    # Архивирование заявок: перенос архивных заявок из рабочей таблицы
+    archive_batch_size: int = 1000
+    archive_grace_hours: int = 24  # Сколько часов архивная заявка остается в рабочей таблице
+    archive_interval_seconds: int = 300
+    
+    # История скоринга: отложенная пакетная запись
+    score_history_batch_size: int = 500  # Запись сразу при накоплении пачки
+    score_history_flush_seconds: float = 2.0
+    score_history_max_buffer: int = 50_000  # Предел буфера, если база недоступна
+    score_history_partitions_ahead: int = 2  # На сколько месяцев вперед создавать секции
+    
+    # Отложенные задачи (scheduled_jobs): выполняются всеми процессами бота
+    job_concurrency: int = 20  # Одновременно выполняемых задач в процессе
+    job_poll_seconds: float = 5.0
+    job_lease_seconds: int = 300  # Через сколько задачу упавшего процесса подхватит другой
+    job_max_attempts: int = 5
+    job_retry_seconds: int = 30  # Пауза перед повтором, удваивается с каждой попыткой
+    
+    # Кэш языка пользователя в I18nMiddleware: без запроса к базе на каждое обновление
+    language_cache_size: int = 100_000
+    language_cache_ttl_seconds: int = 3600
+    language_cache_negative_ttl_seconds: int = 30  # Незарегистрированные пользователи
+    language_cache_shared: bool = False  # Второй уровень в Redis, общий для экземпляров бота
+    language_cache_shared_local_ttl_seconds: int = 10  # TTL в процессе при общем уровне
+    
+    # Рассылки: выполняются задачами scheduled_jobs
+    broadcast_batch_size: int = 500  # Получателей на странице; прогресс сохраняется после каждой
+    broadcast_slice_seconds: int = 120  # Время работы одной задачи, должно быть меньше job_lease_seconds
+    
+    # Уведомления администраторам
+    admin_notify_concurrency: int = 10  # Одновременных отправок одного уведомления
+    admin_notify_digest_seconds: float = 60.0  # Окно сводки одинаковых уведомлений, 0 - без сводок
+    
+    # FSM-хранилище бота: memory теряет диалоги при перезапуске,
+    # redis - общее для нескольких процессов бота
+    fsm_storage: Literal["memory", "db", "redis"] = "db"
+    fsm_cache_size: int = 10_000  # Записей FSM в памяти процесса
+    fsm_flush_seconds: float = 1.0  # Как часто изменения FSM пишутся в базу
+    fsm_flush_batch: int = 500  # Запись сразу при накоплении изменений
+    fsm_state_ttl_seconds: int = 7 * 24 * 3600  # Брошенный диалог в Redis удаляется через неделю
+    
+    # Выгрузка данных для аналитики
+    admin_api_token: Optional[str] = None  # Токен admin API (заголовок X-Admin-Token)
+    export_chunk_rows: int = 50_000  # Строк в группе строк Parquet
+    export_queue_chunks: int = 16  # Буфер чанков COPY между БД и клиентом
+    export_progress_rows: int = 100_000  # Как часто писать прогресс в лог
+    
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     
@@ -62,11 +137,30 @@ class Settings(BaseSettings):
     # Rate limiting
     rate_limit_messages_per_minute: int = 20
     rate_limit_commands_per_minute: int = 10
+    # memory - лимит в каждом процессе; redis - общий для всех процессов бота (REDIS_URL)
+    rate_limit_backend: Literal["memory", "redis"] = "memory"
+    rate_limit_redis_timeout_seconds: float = 0.2  # Дольше - проверка в процессе
+    rate_limit_redis_retry_seconds: float = 30.0  # Пауза перед новой попыткой после сбоя Redis
     
     # Bank simulation
     bank_response_delay_minutes: int = 10
     bank_approval_probability: float = 0.7
     
+    # Партнерские банки: опрос параллельно, с таймаутом и повторным (hedged) запросом
+    bank_timeout_seconds: float = 10.0  # Банк, не ответивший за это время, пропускается
+    bank_hedge_seconds: float = 2.0  # Через сколько дублировать запрос к медленному банку
+    bank_enough_offers: int = 3  # После стольких одобрений остальные банки не ждем
+    bank_stub_latency_median_seconds: float = 0.5  # Задержка банков-заглушек (логнормальная)
+    bank_stub_latency_sigma: float = 1.0
+    bank_stub_error_probability: float = 0.05
+    
+    # Прием решений банков (POST /api/v1/banks/{bank_code}/decisions)
+    bank_api_tokens: Dict[str, str] = {}  # Код банка -> токен (заголовок X-Bank-Token), JSON
+    bank_ingest_queue_size: int = 10_000  # Решений в буфере; при переполнении эндпоинт отвечает 503
+    bank_ingest_batch_size: int = 500  # Решений в одной транзакции
+    bank_ingest_flush_seconds: float = 0.5  # Сколько копить решения перед записью
+    bank_ingest_retry_seconds: float = 5.0  # Пауза перед повтором записи после ошибки БД
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -87,9 +181,20 @@ class Settings(BaseSettings):
     @property
     def database_url_async(self) -> str:
         """Преобразование URL для асинхронного драйвера"""
-        if self.database_url.startswith("postgresql://"):
-            return self.database_url.replace("postgresql://", "postgresql+asyncpg://")
-        return self.database_url
+        return self._to_async_url(self.database_url)
+
+    @property
+    def database_replica_url_async(self) -> Optional[str]:
+        """URL реплики для асинхронного драйвера (None, если реплика не настроена)"""
+        if not self.database_replica_url:
+            return None
+        return self._to_async_url(self.database_replica_url)
+
+    @staticmethod
+    def _to_async_url(url: str) -> str:
+        if url.startswith("postgresql://"):
+            return url.replace("postgresql://", "postgresql+asyncpg://")
+        return url
 
     def get_webhook_path(self) -> str:
         """Получение пути для webhook"""
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from prometheus_client import Counter, Histogram
+
+from src.config.settings import settings
+from src.core.enums import BankOfferStatus, LoanType
+
+logger = logging.getLogger(__name__)
+
+BANK_REQUESTS = Counter("bank_requests_total", "Partner bank offer requests", ["bank", "outcome"])
+BANK_HEDGED = Counter("bank_hedged_requests_total", "Duplicate requests sent to slow or failing banks", ["bank"])
+BANK_LATENCY = Histogram(
+    "bank_request_seconds",
+    "Partner bank response time including the hedged request",
+    ["bank"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+# Допустимые ставки по типу кредита, %
+RATE_LIMITS = {
+    LoanType.CARLOAN: (Decimal("4"), Decimal("48")),
+    LoanType.MICROLOAN: (Decimal("18"), Decimal("79")),
+}
+
+
+@dataclass
+class BankRequest:
+    """Параметры заявки, отправляемые в банк"""
+    application_id: int
+    loan_type: LoanType
+    amount: Decimal
+    annual_rate: Decimal
+    term_months: int
+
+
+@dataclass
+class BankDecision:
+    """Ответ банка на заявку"""
+    bank_code: str
+    status: BankOfferStatus
+    annual_rate: Optional[Decimal] = None
+    amount: Optional[Decimal] = None
+    term_months: Optional[int] = None
+
+    @property
+    def approved(self) -> bool:
+        return self.status == BankOfferStatus.APPROVED
+
+
+class BankError(Exception):
+    """Банк не смог обработать запрос"""
+
+
+class BankAdapter(ABC):
+    """
+    Интеграция с партнерским банком
+
+    Адаптер должен допускать повторный вызов для той же заявки:
+    медленному банку отправляется дублирующий запрос.
+    """
+
+    code: str
+    name: str
+
+    @abstractmethod
+    async def request_offer(self, request: BankRequest) -> BankDecision:
+        """
+        Запрос предложения по заявке
+
+        Raises:
+            BankError: Банк недоступен или вернул ошибку
+        """
+
+
+class StubBankAdapter(BankAdapter):
+    """
+    Банк-заглушка: ставка заявки со сдвигом, случайное одобрение
+
+    Задержка ответа распределена логнормально (медиана и sigma из настроек),
+    как у реальных API: большинство ответов быстрые, но есть длинный хвост.
+    """
+
+    def __init__(
+        self,
+        code: str,
+        name: str,
+        rate_offset: Decimal,
+        approval_probability: Optional[float] = None,
+        latency_median: Optional[float] = None,
+        latency_sigma: Optional[float] = None,
+        error_probability: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.code = code
+        self.name = name
+        self.rate_offset = rate_offset
+        self.approval_probability = (
+            settings.bank_approval_probability if approval_probability is None else approval_probability
+        )
+        self.latency_median = (
+            settings.bank_stub_latency_median_seconds if latency_median is None else latency_median
+        )
+        self.latency_sigma = settings.bank_stub_latency_sigma if latency_sigma is None else latency_sigma
+        self.error_probability = (
+            settings.bank_stub_error_probability if error_probability is None else error_probability
+        )
+        self.rng = rng or random.Random()
+
+    def latency(self) -> float:
+        if self.latency_median <= 0:
+            return 0.0
+        return self.rng.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+
+    async def request_offer(self, request: BankRequest) -> BankDecision:
+        await asyncio.sleep(self.latency())
+        if self.rng.random() < self.error_probability:
+            raise BankError(f"{self.name} is unavailable")
+
+        rate = request.annual_rate + self.rate_offset
+        low, high = RATE_LIMITS[request.loan_type]
+        if self.rng.random() >= self.approval_probability or not low <= rate <= high:
+            return BankDecision(self.code, BankOfferStatus.DECLINED)
+
+        return BankDecision(
+            self.code,
+            BankOfferStatus.APPROVED,
+            annual_rate=rate,
+            amount=request.amount,
+            term_months=request.term_months,
+        )
+
+
+# Партнерские банки-заглушки: код, название, сдвиг ставки относительно заявки
+STUB_BANKS = [
+    ("kapitalbank", "Kapitalbank", Decimal("-2")),
+    ("uzpromstroybank", "Uzpromstroybank", Decimal("-1")),
+    ("ipotekabank", "Ipoteka-bank", Decimal("0")),
+    ("hamkorbank", "Hamkorbank", Decimal("1")),
+]
+
+
+def create_bank_adapters() -> List[BankAdapter]:
+    """Адаптеры партнерских банков; реальные интеграции заменяют здесь заглушки"""
+    return [StubBankAdapter(code, name, offset) for code, name, offset in STUB_BANKS]
+
+
+def bank_names() -> Dict[str, str]:
+    """Названия банков по коду для отображения"""
+    return {code: name for code, name, _ in STUB_BANKS}
+
+
+async def request_with_hedge(adapter: BankAdapter, request: BankRequest, hedge_after: float) -> BankDecision:
+    """
+    Запрос к банку с дублированием
+
+    Если банк не ответил за hedge_after секунд или ответил ошибкой,
+    параллельно отправляется второй запрос; используется первый успешный
+    ответ, оставшийся запрос отменяется.
+    """
+    attempts = {asyncio.create_task(adapter.request_offer(request))}
+    hedged = False
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                attempts,
+                timeout=None if hedged else hedge_after,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                attempts.discard(task)
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+
+            if not hedged:
+                hedged = True
+                BANK_HEDGED.labels(adapter.code).inc()
+                attempts.add(asyncio.create_task(adapter.request_offer(request)))
+            elif not attempts:
+                raise error
+    finally:
+        for task in attempts:
+            task.cancel()
+        await asyncio.gather(*attempts, return_exceptions=True)
+
+
+async def collect_offers(
+    adapters: List[BankAdapter],
+    request: BankRequest,
+    timeout: Optional[float] = None,
+    hedge_after: Optional[float] = None,
+    enough: Optional[int] = None,
+) -> List[BankDecision]:
+    """
+    Параллельный опрос банков
+
+    Каждый банк ограничен timeout секундами; не ответивший вовремя или
+    с ошибкой банк пропускается. Как только набралось enough одобрений,
+    остальные банки не ждем.
+
+    Args:
+        adapters: Банки
+        request: Заявка
+        timeout: Таймаут на банк, сек
+        hedge_after: Через сколько секунд дублировать запрос
+        enough: Достаточное число одобрений
+
+    Returns:
+        Ответы успевших банков
+    """
+    timeout = timeout or settings.bank_timeout_seconds
+    hedge_after = hedge_after or settings.bank_hedge_seconds
+    enough = enough or settings.bank_enough_offers
+    started = time.monotonic()
+
+    tasks = {
+        asyncio.create_task(asyncio.wait_for(request_with_hedge(adapter, request, hedge_after), timeout)): adapter
+        for adapter in adapters
+    }
+    pending = set(tasks)
+    decisions: List[BankDecision] = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                adapter = tasks[task]
+                try:
+                    decision = task.result()
+                except asyncio.TimeoutError:
+                    BANK_REQUESTS.labels(adapter.code, "timeout").inc()
+                    logger.warning(f"Bank {adapter.code} timed out on application {request.application_id}")
+                    continue
+                except Exception as e:
+                    BANK_REQUESTS.labels(adapter.code, "error").inc()
+                    logger.warning(f"Bank {adapter.code} failed on application {request.application_id}: {e}")
+                    continue
+
+                BANK_REQUESTS.labels(adapter.code, decision.status.value).inc()
+                BANK_LATENCY.labels(adapter.code).observe(time.monotonic() - started)
+                decisions.append(decision)
+
+            if sum(decision.approved for decision in decisions) >= enough:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return decisions
@@ -12,6 +12,11 @@ class LoanStatus(str, Enum):
     ARCHIVED = "archived"
 
 
+class BankOfferStatus(str, Enum):
+    APPROVED = "approved"
+    DECLINED = "declined"
+
+
 class CarCondition(str, Enum):
     NEW = "new"
     USED = "used"
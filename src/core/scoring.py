@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from src.core.enums import (
     Gender,
@@ -100,6 +100,10 @@ class ScoringCalculator:
     # Бонус за реферала
     REFERRAL_BONUS = 20
 
+    # Версия правил: увеличивается при любом изменении SCORING_WEIGHTS,
+    # в том числе порядка правил - от него зависят биты маски в истории баллов
+    RULES_VERSION = 1
+
     @classmethod
     def calculate_score(cls, data: PersonalData) -> int:
         """
@@ -256,6 +260,47 @@ class ScoringCalculator:
         breakdown["total_score"] = cls.calculate_score(data)
         return breakdown
 
+    @classmethod
+    def get_matched_rules(cls, data: PersonalData) -> int:
+        """
+        Битовая маска сработавших правил
+        
+        Бит i соответствует i-му правилу SCORING_WEIGHTS.
+        
+        Args:
+            data: Персональные данные
+            
+        Returns:
+            Маска сработавших правил
+        """
+        values = {
+            "age": data.age,
+            "gender": data.gender,
+            "work_experience": data.work_experience_months,
+            "address_stability": data.address_stability_years,
+            "housing": data.housing_status,
+            "marital": data.marital_status,
+            "education": data.education,
+            "closed_loans": data.closed_loans_count,
+            "other_loans_ok": data.pdn_with_other_loans if data.has_other_loans else None,
+            "region": data.region,
+            "device": data.device_type,
+        }
+
+        mask = 0
+        for bit, (name, rule) in enumerate(cls.SCORING_WEIGHTS.items()):
+            if values[name] is not None and rule["condition"](values[name]):
+                mask |= 1 << bit
+        return mask
+
+    @classmethod
+    def rules_from_mask(cls, mask: int) -> List[str]:
+        """Названия правил из битовой маски текущей версии правил"""
+        return [
+            name for bit, name in enumerate(cls.SCORING_WEIGHTS)
+            if mask & (1 << bit)
+        ]
+
     @classmethod
     def get_score_level(cls, score: int) -> str:
         """Определение уровня скоринга"""
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Insert, delete, func, insert, select
+
+from src.config.settings import settings
+from src.db.database import close_db, get_db_context
+from src.db.models import LoanApplication, LoanApplicationArchive
+
+logger = logging.getLogger(__name__)
+
+# Колонки, общие для рабочей и архивной таблиц
+ARCHIVE_COLUMNS = LoanApplication.__table__.columns.keys()
+
+
+def move_archived_batch(cutoff: datetime, batch_size: int) -> Insert:
+    """
+    Перенос пачки архивных заявок в loan_applications_archive одним запросом
+
+    DELETE ... RETURNING и INSERT выполняются в одной транзакции через CTE.
+    SKIP LOCKED позволяет нескольким архиваторам работать параллельно,
+    не мешая друг другу и обработчикам, которые держат блокировки строк.
+
+    Args:
+        cutoff: Переносятся заявки, не менявшиеся с этого момента
+        batch_size: Размер пачки
+    """
+    pending = (
+        select(LoanApplication.id)
+        .where(LoanApplication.is_archived == True)  # noqa: E712
+        .where(LoanApplication.updated_at < cutoff)
+        .order_by(LoanApplication.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    moved = (
+        delete(LoanApplication)
+        .where(LoanApplication.id.in_(pending.scalar_subquery()))
+        .returning(*(LoanApplication.__table__.c[name] for name in ARCHIVE_COLUMNS))
+        .cte("moved")
+    )
+
+    return insert(LoanApplicationArchive).from_select(
+        [*ARCHIVE_COLUMNS, "archived_at"],
+        select(*(moved.c[name] for name in ARCHIVE_COLUMNS), func.now()),
+    )
+
+
+async def archive_applications(
+    batch_size: Optional[int] = None,
+    grace_hours: Optional[int] = None,
+) -> int:
+    """
+    Перенос всех накопившихся архивных заявок пачками
+
+    Каждая пачка - отдельная короткая транзакция, поэтому архиватор
+    не держит долгих блокировок и не раздувает WAL одной транзакцией.
+
+    Returns:
+        Количество перенесенных заявок
+    """
+    batch_size = batch_size or settings.archive_batch_size
+    grace_hours = settings.archive_grace_hours if grace_hours is None else grace_hours
+    cutoff = datetime.utcnow() - timedelta(hours=grace_hours)
+
+    total = 0
+    while True:
+        async with get_db_context() as db:
+            result = await db.execute(move_archived_batch(cutoff, batch_size))
+            moved = result.rowcount
+
+        total += moved
+        if moved < batch_size:
+            return total
+
+
+async def run_archiver() -> None:
+    """Фоновый цикл архиватора"""
+    while True:
+        try:
+            moved = await archive_applications()
+            if moved:
+                logger.info(f"Archived {moved} loan applications")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Archiver error: {e}", exc_info=True)
+
+        await asyncio.sleep(settings.archive_interval_seconds)
+
+
+async def _main() -> None:
+    """Разовый запуск архиватора (cron, ручной запуск)"""
+    try:
+        moved = await archive_applications()
+        logger.info(f"Archived {moved} loan applications")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=getattr(logging, settings.log_level))
+    asyncio.run(_main())
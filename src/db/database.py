@@ -1,17 +1,70 @@
+import logging
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Optional, Set
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 
 from src.config.settings import settings
 
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def _engine_options() -> Dict[str, Any]:
+    """Параметры движка: пул и кэширование prepared statements"""
+    if settings.db_pgbouncer_transaction_mode:
+        # PgBouncer в режиме transaction отдает разные серверные соединения
+        # на каждую транзакцию, поэтому prepared statements кэшировать нельзя,
+        # а имена должны быть уникальными. Пулом управляет сам PgBouncer.
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        }
+
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": True,
+        "connect_args": {
+            # Кэш prepared statements SQLAlchemy-адаптера и самого asyncpg:
+            # повторные запросы не тратят время Postgres на parse/plan
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+            "statement_cache_size": settings.db_statement_cache_size,
+        },
+    }
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,  # Отключаем SQL логи для продакшена
+        query_cache_size=settings.db_compiled_cache_size,
+        **_engine_options(),
+    )
+
+
 # Создаем асинхронный движок
-engine = create_async_engine(
-    settings.database_url_async,
-    echo=False,  # Отключаем SQL логи для продакшена
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
+engine = _create_engine(settings.database_url_async)
+
+# Движок реплики для запросов только на чтение (если реплика настроена)
+replica_engine = (
+    _create_engine(settings.database_replica_url_async)
+    if settings.database_replica_url_async
+    else None
 )
 
 # Создаем фабрику сессий
@@ -21,6 +74,62 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Фабрика сессий для чтения: реплика или primary, если реплики нет
+replica_session_maker = (
+    async_sessionmaker(
+        replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+    if replica_engine is not None
+    else async_session_maker
+)
+
+# Telegram ID пользователя, чье обновление сейчас обрабатывается.
+# Выставляется middleware, чтобы записи в БД автоматически помечали пользователя.
+current_telegram_id: ContextVar[Optional[int]] = ContextVar("current_telegram_id", default=None)
+
+# Пользователи, недавно писавшие в БД: их чтения идут на primary (read-your-writes)
+_recent_writers: TTLCache = TTLCache(
+    maxsize=100_000,
+    ttl=settings.replica_read_your_writes_seconds,
+)
+
+
+def mark_recent_write(telegram_id: int) -> None:
+    """Пометить, что пользователь только что записал данные"""
+    _recent_writers[telegram_id] = True
+
+
+def has_recent_write(telegram_id: int) -> bool:
+    """Писал ли пользователь в БД в пределах окна read-your-writes"""
+    return telegram_id in _recent_writers
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_writer_on_commit(session: Session) -> None:
+    if not session.info.pop("has_writes", False):
+        return
+    telegram_id = current_telegram_id.get()
+    if telegram_id is not None:
+        mark_recent_write(telegram_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_writes_on_rollback(session: Session) -> None:
+    session.info.pop("has_writes", None)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency для получения сессии базы данных"""
@@ -35,6 +144,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency для получения сессии только на чтение (реплика)"""
+    async with replica_session_maker() as session:
+        yield session
+
+
 @asynccontextmanager
 async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
     """Context manager для работы с базой данных"""
@@ -49,15 +164,74 @@ async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-async def init_db() -> None:
-    """Инициализация базы данных"""
-    from src.db.models import Base
-    
-    async with engine.begin() as conn:
-        # Создаем таблицы если их нет
-        await conn.run_sync(Base.metadata.create_all)
+@asynccontextmanager
+async def get_read_db_context(telegram_id: Optional[int] = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Context manager для запросов только на чтение
+
+    Запросы идут на реплику, кроме пользователей, которые недавно
+    что-то записали: они читают с primary, чтобы видеть свои изменения.
+
+    Args:
+        telegram_id: Telegram ID пользователя (по умолчанию - из текущего обновления)
+    """
+    if telegram_id is None:
+        telegram_id = current_telegram_id.get()
+
+    session_maker = replica_session_maker
+    if telegram_id is not None and has_recent_write(telegram_id):
+        session_maker = async_session_maker
+
+    async with session_maker() as session:
+        yield session
+
+
+def verify_schema_heads(current: Set[str], scripts: ScriptDirectory) -> None:
+    """
+    Сравнение ревизии схемы БД с ревизиями миграций кода
+
+    Args:
+        current: Ревизии из таблицы alembic_version
+        scripts: Каталог миграций
+
+    Raises:
+        RuntimeError: Если схема не размечена или отстает от кода
+    """
+    expected = set(scripts.get_heads())
+    if current == expected:
+        return
+
+    known = {script.revision for script in scripts.walk_revisions()}
+    if current and not current & known:
+        # Миграции новой версии уже применены, а этот процесс еще из старой
+        # (rolling deploy): схема меняется совместимо, поэтому не падаем
+        logger.warning("Schema revision %s is newer than code heads %s", current, expected)
+        return
+
+    raise RuntimeError(
+        f"Схема БД на ревизии {sorted(current) or 'без версии'}, "
+        f"ожидается {sorted(expected)}. Выполните `alembic upgrade head`"
+    )
+
+
+async def check_schema_version() -> None:
+    """
+    Проверка версии схемы БД при старте
+
+    Схема создается и обновляется только миграциями (`alembic upgrade head`)
+    до запуска процессов, поэтому при старте достаточно одного чтения
+    alembic_version вместо create_all с отражением всех таблиц.
+    """
+    async with engine.connect() as conn:
+        current = await conn.run_sync(
+            lambda sync_conn: set(MigrationContext.configure(sync_conn).get_current_heads())
+        )
+
+    verify_schema_heads(current, ScriptDirectory(str(MIGRATIONS_DIR)))
 
 
 async def close_db() -> None:
     """Закрытие соединения с базой данных"""
-    await engine.dispose()
\ No newline at end of file
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
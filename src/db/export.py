@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+import logging
+import zlib
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Enum,
+    Integer,
+    Numeric,
+    Select,
+    SmallInteger,
+    String,
+    Text,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config.settings import settings
+from src.db.database import close_db, engine, replica_engine
+from src.db.models import (
+    LoanApplication,
+    LoanApplicationArchive,
+    PersonalData,
+    ReferralRegistration,
+    ScoreHistory,
+    User,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Колбэк прогресса: (таблица, выгружено строк, выгружено байт)
+ProgressCallback = Callable[[str, int, int], None]
+
+
+def _history_query() -> Select:
+    """Все заявки: рабочая таблица и архив"""
+    columns = LoanApplication.__table__.columns.keys()
+    return union_all(
+        select(*(getattr(LoanApplication, name) for name in columns)),
+        select(*(getattr(LoanApplicationArchive, name) for name in columns)),
+    )
+
+
+EXPORT_TABLES: Dict[str, Callable[[], Select]] = {
+    "users": lambda: select(User.__table__),
+    "personal_data": lambda: select(PersonalData.__table__),
+    "loan_applications": _history_query,
+    "referral_registrations": lambda: select(ReferralRegistration.__table__),
+    "score_history": lambda: select(ScoreHistory.__table__),
+}
+
+# Колонки выгрузки (для схемы Parquet) - колонки исходной модели
+EXPORT_COLUMNS = {
+    "users": User.__table__.columns,
+    "personal_data": PersonalData.__table__.columns,
+    "loan_applications": LoanApplication.__table__.columns,
+    "referral_registrations": ReferralRegistration.__table__.columns,
+    "score_history": ScoreHistory.__table__.columns,
+}
+
+
+def export_sql(table: str) -> str:
+    """SQL выгрузки таблицы для COPY и серверного курсора"""
+    query = EXPORT_TABLES[table]()
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _export_engine() -> AsyncEngine:
+    # Выгрузка читает таблицы целиком - ее место на реплике
+    return replica_engine if replica_engine is not None else engine
+
+
+async def _copy_csv_gzip(
+    table: str,
+    progress: Optional[ProgressCallback],
+) -> AsyncIterator[bytes]:
+    """
+    CSV через COPY ... TO STDOUT со сжатием gzip на лету
+
+    COPY пишет в ограниченную очередь: если потребитель (файл, HTTP-клиент)
+    не успевает, Postgres ждет, и память не растет.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.export_queue_chunks)
+    compressor = zlib.compressobj(wbits=31)  # 31 - формат gzip
+
+    async def write(chunk: bytes) -> None:
+        await queue.put(chunk)
+
+    async def run_copy() -> None:
+        try:
+            async with _export_engine().connect() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_from_query(
+                    export_sql(table), output=write, format="csv", header=True
+                )
+            await queue.put(None)
+        except BaseException:
+            # Ошибка или отмена: потребитель мог уйти, и полную очередь никто
+            # не разберет - данные уже не нужны, метка конца ставится без ожидания
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+            raise
+
+    copy_task = asyncio.create_task(run_copy())
+    rows = 0
+    size = 0
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            # Строки считаются по переводам строк: поля с переносами дают завышенную оценку
+            rows += chunk.count(b"\n")
+            size += len(chunk)
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+            if progress:
+                progress(table, max(rows - 1, 0), size)
+        # Сначала ошибка COPY: иначе трейлер gzip сделал бы оборванный CSV целым архивом
+        await copy_task
+        yield compressor.flush()
+    finally:
+        # Клиент отключился или COPY упал: соединение выгрузки освобождается всегда
+        copy_task.cancel()
+        await asyncio.gather(copy_task, return_exceptions=True)
+
+
+def _arrow_schema(table: str):
+    """Схема Parquet по типам колонок модели"""
+    import pyarrow as pa
+
+    def arrow_type(column_type):
+        if isinstance(column_type, BigInteger):
+            return pa.int64()
+        if isinstance(column_type, SmallInteger):
+            return pa.int16()
+        if isinstance(column_type, Integer):
+            return pa.int32()
+        if isinstance(column_type, Numeric):
+            return pa.decimal128(column_type.precision, column_type.scale)
+        if isinstance(column_type, Boolean):
+            return pa.bool_()
+        if isinstance(column_type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(column_type, (Enum, String, Text)):
+            return pa.string()
+        raise TypeError(f"Нет типа Parquet для {column_type!r}")
+
+    return pa.schema([(column.name, arrow_type(column.type)) for column in EXPORT_COLUMNS[table]])
+
+
+class _ChunkSink:
+    """Файлоподобный приемник Parquet: байты забираются после каждой группы строк"""
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def _cursor_parquet(
+    table: str,
+    progress: Optional[ProgressCallback],
+) -> AsyncIterator[bytes]:
+    """
+    Parquet через серверный курсор: каждая пачка строк - отдельная группа строк
+
+    В памяти одновременно находится не больше одной пачки.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Для выгрузки в Parquet установите pyarrow") from e
+
+    schema = _arrow_schema(table)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    rows = 0
+    size = 0
+
+    async with _export_engine().connect() as conn:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+        async with driver.transaction(readonly=True):
+            cursor = await driver.cursor(export_sql(table))
+            while True:
+                records = await cursor.fetch(settings.export_chunk_rows)
+                if not records:
+                    break
+                # Пачка строк транспонируется в колонки: так Arrow строит массивы без словарей
+                columns = zip(*records)
+                batch = pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema,
+                )
+                writer.write_table(batch)
+                rows += len(records)
+                data = sink.drain()
+                size += len(data)
+                if data:
+                    yield data
+                if progress:
+                    progress(table, rows, size)
+
+    writer.close()
+    yield sink.drain()
+
+
+def export_table(
+    table: str,
+    fmt: str = "csv",
+    progress: Optional[ProgressCallback] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Потоковая выгрузка таблицы
+
+    Args:
+        table: Имя таблицы из EXPORT_TABLES
+        fmt: csv (gzip) или parquet
+        progress: Колбэк прогресса
+
+    Returns:
+        Асинхронный итератор байтов файла выгрузки
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Неизвестная таблица: {table}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+
+    if fmt == "csv":
+        return _copy_csv_gzip(table, progress)
+    return _cursor_parquet(table, progress)
+
+
+def export_filename(table: str, fmt: str) -> str:
+    return f"{table}.csv.gz" if fmt == "csv" else f"{table}.parquet"
+
+
+def log_progress() -> ProgressCallback:
+    """Колбэк прогресса, пишущий в лог не чаще, чем раз в export_progress_rows строк"""
+    last_report: Dict[str, int] = {}
+
+    def report(table: str, rows: int, size: int) -> None:
+        if rows - last_report.get(table, 0) >= settings.export_progress_rows:
+            last_report[table] = rows
+            logger.info(f"Export {table}: {rows} rows, {size / 1024 / 1024:.1f} MB")
+
+    return report
+
+
+async def export_to_dir(tables: List[str], fmt: str, output_dir: Path) -> None:
+    """Выгрузка таблиц в файлы с отчетом о прогрессе в лог"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report = log_progress()
+
+    for table in tables:
+        path = output_dir / export_filename(table, fmt)
+        with path.open("wb") as f:
+            async for chunk in export_table(table, fmt, report):
+                f.write(chunk)
+        logger.info(f"{table}: exported to {path} ({path.stat().st_size / 1024 / 1024:.1f} MB)")
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        await export_to_dir(args.tables or list(EXPORT_TABLES), args.format, Path(args.output))
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Выгрузка таблиц в CSV (gzip) или Parquet")
+    parser.add_argument("tables", nargs="*", help=f"Таблицы: {', '.join(EXPORT_TABLES)} (по умолчанию все)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--output", default="export", help="Каталог для файлов")
+    args = parser.parse_args()
+
+    unknown = set(args.tables) - set(EXPORT_TABLES)
+    if unknown:
+        parser.error(f"неизвестные таблицы: {', '.join(sorted(unknown))}")
+
+    logging.basicConfig(level=getattr(logging, settings.log_level))
+    asyncio.run(_main(args))
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import Update, delete, select, update
+from sqlalchemy.engine import Row
+
+from src.config.settings import settings
+from src.db.database import get_db_context
+from src.db.models import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def new_job(kind: str, payload: Dict[str, Any], delay_seconds: float = 0) -> ScheduledJob:
+    """
+    Задача для добавления в сессию
+
+    Задача добавляется в той же транзакции, что и изменение, которое
+    ее порождает: либо сохраняются оба, либо ничего.
+
+    Args:
+        kind: Тип задачи (ключ обработчика JobWorker)
+        payload: Параметры задачи, сериализуемые в JSON
+        delay_seconds: Через сколько секунд выполнить
+    """
+    return ScheduledJob(
+        kind=kind,
+        payload=json.dumps(payload),
+        run_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+        attempts=0,
+    )
+
+
+def claim_due_jobs(now: datetime, limit: int, lease_seconds: int) -> Update:
+    """
+    Захват пачки наступивших задач одним запросом
+
+    SKIP LOCKED позволяет нескольким процессам разбирать очередь
+    параллельно: каждый получает свои задачи. Захват переносит run_at
+    на конец аренды, поэтому задача упавшего процесса снова станет
+    доступна, а не потеряется.
+    """
+    due = (
+        select(ScheduledJob.id)
+        .where(ScheduledJob.failed_at.is_(None))
+        .where(ScheduledJob.run_at <= now)
+        .order_by(ScheduledJob.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(ScheduledJob)
+        .where(ScheduledJob.id.in_(due.scalar_subquery()))
+        .values(run_at=now + timedelta(seconds=lease_seconds), attempts=ScheduledJob.attempts + 1)
+        .returning(ScheduledJob.id, ScheduledJob.kind, ScheduledJob.payload, ScheduledJob.attempts)
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    """Пауза перед следующей попыткой: job_retry_seconds, удваивается с каждой попыткой"""
+    return settings.job_retry_seconds * 2 ** (attempts - 1)
+
+
+class JobWorker:
+    """
+    Выполнение отложенных задач из scheduled_jobs
+
+    Ожидающая задача - строка в базе, а не корутина в памяти: тысячи
+    задач не занимают память процесса и переживают перезапуск. Процесс
+    выполняет не больше job_concurrency задач одновременно; свободные
+    места заполняются задачами, время которых наступило.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, JobHandler],
+        concurrency: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+    ) -> None:
+        self.handlers = handlers
+        self.concurrency = concurrency or settings.job_concurrency
+        self.poll_seconds = poll_seconds or settings.job_poll_seconds
+        self._running: Set[asyncio.Task] = set()
+
+    async def claim(self, limit: int) -> List[Row]:
+        async with get_db_context() as db:
+            result = await db.execute(claim_due_jobs(datetime.utcnow(), limit, settings.job_lease_seconds))
+            return list(result)
+
+    async def complete(self, job: Row) -> None:
+        async with get_db_context() as db:
+            await db.execute(delete(ScheduledJob).where(ScheduledJob.id == job.id))
+
+    async def fail(self, job: Row, error: BaseException) -> None:
+        """Повтор задачи позже или, если попытки исчерпаны, отметка failed_at"""
+        now = datetime.utcnow()
+        if job.attempts >= settings.job_max_attempts:
+            values = {"failed_at": now, "last_error": repr(error)}
+            logger.error(f"Job {job.id} ({job.kind}) failed after {job.attempts} attempts: {error!r}")
+        else:
+            values = {"run_at": now + timedelta(seconds=retry_delay(job.attempts)), "last_error": repr(error)}
+            logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed: {error!r}")
+
+        async with get_db_context() as db:
+            await db.execute(update(ScheduledJob).where(ScheduledJob.id == job.id).values(**values))
+
+    async def execute(self, job: Row) -> None:
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job.kind!r}")
+            await handler(json.loads(job.payload))
+        except Exception as e:
+            await self.fail(job, e)
+            return
+
+        await self.complete(job)
+
+    async def _execute(self, job: Row) -> None:
+        try:
+            await self.execute(job)
+        except Exception as e:
+            # Не удалось записать результат - задача повторится по окончании аренды
+            logger.error(f"Job {job.id} ({job.kind}) bookkeeping error: {e}", exc_info=True)
+
+    async def run(self) -> None:
+        """Фоновый цикл; при остановке прерванные задачи повторятся после аренды"""
+        try:
+            while True:
+                free = self.concurrency - len(self._running)
+                jobs: List[Row] = []
+                if free:
+                    try:
+                        jobs = await self.claim(free)
+                    except Exception as e:
+                        logger.error(f"Job claim error: {e}", exc_info=True)
+
+                for job in jobs:
+                    task = asyncio.create_task(self._execute(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+
+                # Пачка заполнена - наступивших задач может быть больше
+                if free and len(jobs) == free:
+                    continue
+
+                # Ждем освобождения места или следующего опроса
+                if self._running and not free:
+                    await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    await asyncio.sleep(self.poll_seconds)
+        finally:
+            for task in self._running:
+                task.cancel()
+            await asyncio.gather(*self._running, return_exceptions=True)
@@ -30,6 +30,17 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Секции секционированных таблиц создаются в рантайме и не описаны в моделях
+PARTITIONED_TABLES = ("score_history",)
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """Autogenerate не сравнивает секции с моделями"""
+    if type_ == "table":
+        return not any(name.startswith(f"{table}_") for table in PARTITIONED_TABLES)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -56,6 +67,7 @@ def run_migrations_offline() -> None:
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -68,6 +80,7 @@ def do_run_migrations(connection: Connection) -> None:
         target_metadata=target_metadata,
         compare_type=True,
         compare_server_default=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -0,0 +1,134 @@
+"""baseline
+
+Схема на момент перехода с create_all на миграции. Базы, созданные
+через create_all, размечаются командой `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 22:18:20.936673
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('telegram_id', sa.BigInteger(), nullable=False),
+    sa.Column('username', sa.String(length=255), nullable=True),
+    sa.Column('first_name', sa.String(length=255), nullable=True),
+    sa.Column('last_name', sa.String(length=255), nullable=True),
+    sa.Column('phone_number', sa.String(length=20), nullable=True),
+    sa.Column('language_code', sa.String(length=10), nullable=True),
+    sa.Column('referral_code', sa.String(length=20), nullable=False),
+    sa.Column('referred_by_id', sa.Integer(), nullable=True),
+    sa.Column('referral_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['referred_by_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('referral_code')
+    )
+    op.create_index(op.f('ix_users_telegram_id'), 'users', ['telegram_id'], unique=True)
+    op.create_table('bot_states',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('state_data', sa.Text(), nullable=True),
+    sa.Column('current_application_data', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('loan_applications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('loan_type', sa.Enum('MICROLOAN', 'CARLOAN', name='loantype'), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('annual_rate', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('term_months', sa.Integer(), nullable=False),
+    sa.Column('car_condition', sa.Enum('NEW', 'USED', name='carcondition'), nullable=True),
+    sa.Column('receive_method', sa.Enum('CARD', 'CASH', name='receivemethod'), nullable=True),
+    sa.Column('monthly_payment', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('pdn_value', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('status', sa.Enum('NEW', 'SENT', 'ARCHIVED', name='loanstatus'), nullable=False),
+    sa.Column('is_archived', sa.Boolean(), nullable=False),
+    sa.Column('sent_to_bank_at', sa.DateTime(), nullable=True),
+    sa.Column('bank_response_at', sa.DateTime(), nullable=True),
+    sa.Column('bank_response', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_user_archived', 'loan_applications', ['user_id', 'is_archived'], unique=False)
+    op.create_index('idx_user_status', 'loan_applications', ['user_id', 'status'], unique=False)
+    op.create_table('personal_data',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('gender', sa.Enum('MALE', 'FEMALE', name='gender'), nullable=True),
+    sa.Column('region', sa.Enum('TASHKENT', 'TASHKENT_REGION', 'ANDIJAN', 'BUKHARA', 'FERGANA', 'JIZZAKH', 'NAMANGAN', 'NAVOIY', 'QASHQADARYO', 'SAMARKAND', 'SIRDARYO', 'SURXONDARYO', 'XORAZM', 'KARAKALPAKSTAN', name='region'), nullable=True),
+    sa.Column('device_type', sa.Enum('APPLE', 'ANDROID', 'OTHER', name='devicetype'), nullable=True),
+    sa.Column('monthly_income', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('work_experience_months', sa.Integer(), nullable=True),
+    sa.Column('address_stability_years', sa.Integer(), nullable=True),
+    sa.Column('housing_status', sa.Enum('OWN', 'OWN_WITH_MORTGAGE', 'RENT', 'RELATIVES', name='housingstatus'), nullable=True),
+    sa.Column('marital_status', sa.Enum('SINGLE', 'MARRIED', 'DIVORCED', 'WIDOWED', name='maritalstatus'), nullable=True),
+    sa.Column('education', sa.Enum('SECONDARY', 'VOCATIONAL', 'INCOMPLETE_HIGHER', 'HIGHER', 'POSTGRADUATE', name='education'), nullable=True),
+    sa.Column('closed_loans_count', sa.Integer(), nullable=True),
+    sa.Column('has_other_loans', sa.Boolean(), nullable=True),
+    sa.Column('other_loans_monthly_payment', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('current_score', sa.Integer(), nullable=True),
+    sa.Column('score_updated_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('referral_registrations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('referrer_id', sa.Integer(), nullable=False),
+    sa.Column('referred_user_id', sa.Integer(), nullable=False),
+    sa.Column('bonus_points', sa.Integer(), nullable=True),
+    sa.Column('bonus_applied', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['referred_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['referrer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('referred_user_id', name='uq_referred_user')
+    )
+    op.create_index('idx_referrer_created', 'referral_registrations', ['referrer_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_referrer_created', table_name='referral_registrations')
+    op.drop_table('referral_registrations')
+    op.drop_table('personal_data')
+    op.drop_index('idx_user_status', table_name='loan_applications')
+    op.drop_index('idx_user_archived', table_name='loan_applications')
+    op.drop_table('loan_applications')
+    op.drop_table('bot_states')
+    op.drop_index(op.f('ix_users_telegram_id'), table_name='users')
+    op.drop_table('users')
+
+    # Enum-типы Postgres не удаляются вместе с таблицами
+    bind = op.get_bind()
+    for name in (
+        'loantype', 'carcondition', 'receivemethod', 'loanstatus', 'gender', 'region',
+        'devicetype', 'housingstatus', 'maritalstatus', 'education',
+    ):
+        sa.Enum(name=name).drop(bind, checkfirst=True)
+    # ### end Alembic commands ###
\ No newline at end of file
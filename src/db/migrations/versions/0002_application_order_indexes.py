@@ -0,0 +1,68 @@
+"""application order indexes
+
+Индексы под порядок (created_at, id) заявок пользователя: keyset-пагинация
+и поиск активной заявки без сортировки. idx_user_archived покрывается
+новым idx_user_active_created. Индексы строятся CONCURRENTLY, чтобы не
+блокировать запись в loan_applications.
+
+idx_user_created объявлен в модели вместе с keyset-пагинацией, но
+create_all не добавляет индексы к существующим таблицам: базы, созданные
+до перехода на миграции, получают его здесь. IF NOT EXISTS пропускает
+базы, где он уже есть.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 22:31:04.117529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_user_active_created',
+            'loan_applications',
+            ['user_id', 'is_archived', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'idx_user_created',
+            'loan_applications',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_user_archived',
+            table_name='loan_applications',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_user_archived',
+            'loan_applications',
+            ['user_id', 'is_archived'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index('idx_user_created', table_name='loan_applications', postgresql_concurrently=True)
+        op.drop_index('idx_user_active_created', table_name='loan_applications', postgresql_concurrently=True)
@@ -0,0 +1,90 @@
+"""loan applications archive
+
+Архивные заявки переносятся в loan_applications_archive фоновым
+архиватором (src/db/archive.py). В рабочей таблице остаются почти только
+живые заявки, и idx_user_created обслуживает поиск активной заявки:
+idx_user_active_created больше не нужен. idx_archived_pending - очередь
+архиватора.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 22:21:08.171661
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _enum(name: str) -> postgresql.ENUM:
+    # Типы уже созданы вместе с loan_applications
+    return postgresql.ENUM(name=name, create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table('loan_applications_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('loan_type', _enum('loantype'), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('annual_rate', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('term_months', sa.Integer(), nullable=False),
+    sa.Column('car_condition', _enum('carcondition'), nullable=True),
+    sa.Column('receive_method', _enum('receivemethod'), nullable=True),
+    sa.Column('monthly_payment', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('pdn_value', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('status', _enum('loanstatus'), nullable=False),
+    sa.Column('is_archived', sa.Boolean(), nullable=False),
+    sa.Column('sent_to_bank_at', sa.DateTime(), nullable=True),
+    sa.Column('bank_response_at', sa.DateTime(), nullable=True),
+    sa.Column('bank_response', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_archive_user_created', 'loan_applications_archive', ['user_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_archived_pending',
+            'loan_applications',
+            ['id'],
+            unique=False,
+            postgresql_where=sa.text('is_archived = true'),
+            postgresql_concurrently=True,
+        )
+        op.drop_index('idx_user_active_created', table_name='loan_applications', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    # Перенесенные заявки возвращаются в рабочую таблицу
+    op.execute(
+        'INSERT INTO loan_applications (id, user_id, loan_type, amount, annual_rate, term_months, '
+        'car_condition, receive_method, monthly_payment, pdn_value, status, is_archived, '
+        'sent_to_bank_at, bank_response_at, bank_response, created_at, updated_at) '
+        'SELECT id, user_id, loan_type, amount, annual_rate, term_months, car_condition, '
+        'receive_method, monthly_payment, pdn_value, status, is_archived, sent_to_bank_at, '
+        'bank_response_at, bank_response, created_at, updated_at FROM loan_applications_archive'
+    )
+    op.drop_index('idx_archive_user_created', table_name='loan_applications_archive')
+    op.drop_table('loan_applications_archive')
+
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_archived_pending', table_name='loan_applications', postgresql_concurrently=True)
+        op.create_index(
+            'idx_user_active_created',
+            'loan_applications',
+            ['user_id', 'is_archived', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
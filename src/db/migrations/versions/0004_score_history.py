@@ -0,0 +1,40 @@
+"""score history
+
+История скоринг-балла, секционированная по месяцам. Месячные секции
+создает писатель истории (src/db/score_history.py) заранее, секция
+по умолчанию принимает строки вне созданных секций.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 22:35:18.946197
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('score_history',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), nullable=False),
+    sa.Column('score', sa.SmallInteger(), nullable=False),
+    sa.Column('rules_version', sa.SmallInteger(), nullable=False),
+    sa.Column('rules_mask', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'recorded_at', name='score_history_pkey'),
+    postgresql_partition_by='RANGE (recorded_at)'
+    )
+    op.execute('CREATE TABLE score_history_default PARTITION OF score_history DEFAULT')
+
+
+def downgrade() -> None:
+    # Секции удаляются вместе с родительской таблицей
+    op.drop_table('score_history')
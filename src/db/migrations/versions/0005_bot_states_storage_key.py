@@ -0,0 +1,43 @@
+"""bot states storage key
+
+bot_states становится хранилищем FSM aiogram (src/bot/storage/database.py):
+строка ищется по ключу FSM, user_id необязателен - диалог начинается
+до регистрации пользователя.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 22:42:02.982754
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('bot_states', sa.Column('storage_key', sa.String(length=100), nullable=True))
+    # Таблица раньше не использовалась; старым строкам достается уникальный ключ-заглушка
+    op.execute("UPDATE bot_states SET storage_key = 'legacy:' || id WHERE storage_key IS NULL")
+    op.alter_column('bot_states', 'storage_key', existing_type=sa.String(length=100), nullable=False)
+    op.alter_column('bot_states', 'user_id',
+               existing_type=sa.INTEGER(),
+               nullable=True)
+    op.create_unique_constraint('bot_states_storage_key_key', 'bot_states', ['storage_key'])
+
+
+def downgrade() -> None:
+    # Состояния без пользователя нельзя сохранить в старой схеме
+    op.execute('DELETE FROM bot_states WHERE user_id IS NULL')
+    op.drop_constraint('bot_states_storage_key_key', 'bot_states', type_='unique')
+    op.alter_column('bot_states', 'user_id',
+               existing_type=sa.INTEGER(),
+               nullable=False)
+    op.drop_column('bot_states', 'storage_key')
@@ -0,0 +1,42 @@
+"""scheduled jobs
+
+Очередь отложенных задач (src/db/jobs.py): ответ банка на заявку
+хранится строкой в базе, а не спящей корутиной в процессе бота.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 22:59:36.096601
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('scheduled_jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('run_at', sa.DateTime(), nullable=False),
+    sa.Column('attempts', sa.SmallInteger(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('failed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_jobs_due', 'scheduled_jobs', ['run_at'], unique=False, postgresql_where=sa.text('failed_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_jobs_due', table_name='scheduled_jobs', postgresql_where=sa.text('failed_at IS NULL'))
+    op.drop_table('scheduled_jobs')
+    # ### end Alembic commands ###
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""bank offers
+
+Ответы партнерских банков на заявку (src/core/banks.py): по строке
+на банк, повтор задачи не дублирует предложения.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 23:05:25.041399
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('bank_offers',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    sa.Column('bank_code', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.Enum('APPROVED', 'DECLINED', name='bankofferstatus'), nullable=False),
+    sa.Column('annual_rate', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('amount', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('term_months', sa.Integer(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('application_id', 'bank_code', name='uq_offer_application_bank')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('bank_offers')
+    sa.Enum(name='bankofferstatus').drop(op.get_bind())
+    # ### end Alembic commands ###
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""bank offer indexes
+
+Индексы bank_offers под предложения заявки (лучшее первым) и ответы
+банка за период. Индексы строятся CONCURRENTLY, чтобы не блокировать
+запись ответов банков.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 23:12:02.655883
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_offers_application_best',
+            'bank_offers',
+            ['application_id', 'status', 'annual_rate'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'idx_offers_bank_received',
+            'bank_offers',
+            ['bank_code', 'received_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_offers_bank_received', table_name='bank_offers', postgresql_concurrently=True)
+        op.drop_index('idx_offers_application_best', table_name='bank_offers', postgresql_concurrently=True)
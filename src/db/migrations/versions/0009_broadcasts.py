@@ -0,0 +1,46 @@
+"""broadcasts
+
+Рассылки с сохранением прогресса (src/bot/broadcast.py) и отметка
+пользователей, заблокировавших бота. Колонка users.bot_blocked_at
+допускает NULL - добавление не переписывает таблицу.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 23:16:37.864250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('broadcasts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('language_code', sa.String(length=10), nullable=True),
+    sa.Column('min_score', sa.Integer(), nullable=True),
+    sa.Column('last_user_id', sa.Integer(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('blocked_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('cancelled_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column('users', sa.Column('bot_blocked_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'bot_blocked_at')
+    op.drop_table('broadcasts')
+    # ### end Alembic commands ###
\ No newline at end of file
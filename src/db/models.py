@@ -3,6 +3,7 @@ from decimal import Decimal
 from typing import Optional
 
 from sqlalchemy import (
+    DDL,
     BigInteger,
     Boolean,
     Column,
@@ -12,14 +13,18 @@ from sqlalchemy import (
     Index,
     Integer,
     Numeric,
+    PrimaryKeyConstraint,
+    SmallInteger,
     String,
     Text,
     UniqueConstraint,
+    event,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
 from src.core.enums import (
+    BankOfferStatus,
     CarCondition,
     DeviceType,
     Education,
@@ -52,6 +57,9 @@ class User(Base):
     referred_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     referral_count = Column(Integer, default=0)
     
+    # Пользователь заблокировал бота: рассылки его пропускают
+    bot_blocked_at = Column(DateTime, nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -149,13 +157,93 @@ class LoanApplication(Base):
     # Indexes
     __table_args__ = (
         Index("idx_user_status", "user_id", "status"),
-        Index("idx_user_archived", "user_id", "is_archived"),
+        # Активная заявка и keyset-пагинация по (created_at, id). Архивные
+        # заявки переносит архиватор, поэтому в таблице почти только живые
+        Index("idx_user_created", user_id, created_at.desc(), id.desc()),
+        # Очередь архиватора: архивные заявки, еще не перенесенные в архив
+        Index("idx_archived_pending", id, postgresql_where=is_archived == True),  # noqa: E712
     )
     
     def __repr__(self):
         return f"<LoanApplication(id={self.id}, user_id={self.user_id}, type={self.loan_type}, status={self.status})>"
 
 
+class LoanApplicationArchive(Base):
+    """Архив заявок: архивные заявки, перенесенные из loan_applications"""
+    __tablename__ = "loan_applications_archive"
+
+    # ID сохраняется из loan_applications
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, nullable=False)
+    
+    # Параметры кредита
+    loan_type = Column(Enum(LoanType), nullable=False)
+    amount = Column(Numeric(15, 2), nullable=False)
+    annual_rate = Column(Numeric(5, 2), nullable=False)
+    term_months = Column(Integer, nullable=False)
+    car_condition = Column(Enum(CarCondition), nullable=True)
+    receive_method = Column(Enum(ReceiveMethod), nullable=True)
+    monthly_payment = Column(Numeric(15, 2), nullable=False)
+    pdn_value = Column(Numeric(5, 2), nullable=False)
+    
+    # Статус
+    status = Column(Enum(LoanStatus), nullable=False)
+    is_archived = Column(Boolean, default=True, nullable=False)
+    
+    # Банк
+    sent_to_bank_at = Column(DateTime, nullable=True)
+    bank_response_at = Column(DateTime, nullable=True)
+    bank_response = Column(Text, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        Index("idx_archive_user_created", user_id, created_at.desc(), id.desc()),
+    )
+    
+    def __repr__(self):
+        return f"<LoanApplicationArchive(id={self.id}, user_id={self.user_id}, status={self.status})>"
+
+
+class ScoreHistory(Base):
+    """
+    История скоринг-балла пользователя
+
+    Таблица только пополняется и секционирована по месяцам (см.
+    src/db/score_history.py). Строка компактна: балл - smallint,
+    сработавшие правила - битовая маска ScoringCalculator.get_matched_rules
+    для версии правил rules_version.
+    """
+    __tablename__ = "score_history"
+
+    user_id = Column(Integer, nullable=False)
+    recorded_at = Column(DateTime, nullable=False)
+    score = Column(SmallInteger, nullable=False)
+    rules_version = Column(SmallInteger, nullable=False)
+    rules_mask = Column(Integer, nullable=False)
+    
+    # Ключ секционирования входит в первичный ключ; он же - индекс для выборки диапазона
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "recorded_at", name="score_history_pkey"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
+    
+    def __repr__(self):
+        return f"<ScoreHistory(user_id={self.user_id}, score={self.score}, at={self.recorded_at})>"
+
+
+# Секция по умолчанию: строки вне созданных месячных секций не теряются
+event.listen(
+    ScoreHistory.__table__,
+    "after_create",
+    DDL("CREATE TABLE score_history_default PARTITION OF score_history DEFAULT"),
+)
+
+
 class ReferralRegistration(Base):
     """Регистрации по реферальным ссылкам"""
     __tablename__ = "referral_registrations"
@@ -186,11 +274,13 @@ class ReferralRegistration(Base):
 
 
 class BotState(Base):
-    """Состояние FSM бота для пользователя"""
+    """Состояние FSM бота (src/bot/storage/database.py)"""
     __tablename__ = "bot_states"
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+    # Ключ FSM aiogram: бот:чат:пользователь Telegram; диалог начинается до создания User
+    storage_key = Column(String(100), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=True)
     
     # FSM состояние
     state = Column(String(100), nullable=True)
@@ -203,4 +293,101 @@ class BotState(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
-        return f"<BotState(user_id={self.user_id}, state={self.state})>"
\ No newline at end of file
+        return f"<BotState(storage_key={self.storage_key}, state={self.state})>"
+
+
+class BankOffer(Base):
+    """
+    Ответ партнерского банка на заявку (src/core/banks.py)
+
+    Без внешнего ключа: архиватор переносит заявки в loan_applications_archive
+    с сохранением id, предложения остаются привязаны к заявке.
+    """
+    __tablename__ = "bank_offers"
+
+    id = Column(BigInteger, primary_key=True)
+    application_id = Column(Integer, nullable=False)
+    bank_code = Column(String(50), nullable=False)
+    status = Column(Enum(BankOfferStatus), nullable=False)
+    
+    # Условия одобренного предложения
+    annual_rate = Column(Numeric(5, 2), nullable=True)
+    amount = Column(Numeric(15, 2), nullable=True)
+    term_months = Column(Integer, nullable=True)
+    
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # Один ответ банка на заявку: повтор задачи не дублирует предложения
+        UniqueConstraint("application_id", "bank_code", name="uq_offer_application_bank"),
+        # Предложения заявки в порядке показа: одобренные по возрастанию ставки,
+        # затем отказы; первая строка - лучшее предложение
+        Index("idx_offers_application_best", application_id, status, annual_rate),
+        # Ответы банка за период
+        Index("idx_offers_bank_received", bank_code, received_at),
+    )
+    
+    def __repr__(self):
+        return f"<BankOffer(application_id={self.application_id}, bank={self.bank_code}, status={self.status})>"
+
+
+class Broadcast(Base):
+    """
+    Рассылка (src/bot/broadcast.py)
+
+    last_user_id - позиция keyset-обхода получателей по users.id: после
+    каждой страницы прогресс сохраняется, и прерванная рассылка
+    продолжается с нее, а не начинается заново.
+    """
+    __tablename__ = "broadcasts"
+
+    id = Column(Integer, primary_key=True)
+    message = Column(Text, nullable=False)  # Исходный текст, переводится simple_gettext
+    
+    # Сегмент получателей
+    language_code = Column(String(10), nullable=True)
+    min_score = Column(Integer, nullable=True)
+    
+    # Прогресс
+    last_user_id = Column(Integer, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    blocked_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    cancelled_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<Broadcast(id={self.id}, last_user_id={self.last_user_id}, sent={self.sent_count})>"
+
+
+class ScheduledJob(Base):
+    """
+    Отложенная задача (src/db/jobs.py)
+
+    Строка удаляется после выполнения. run_at - время следующей попытки,
+    у захваченной задачи - конец аренды: если процесс упал, задачу
+    подхватит другой. failed_at отмечает задачу, исчерпавшую попытки.
+    """
+    __tablename__ = "scheduled_jobs"
+
+    id = Column(BigInteger, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    run_at = Column(DateTime, nullable=False)
+    attempts = Column(SmallInteger, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    failed_at = Column(DateTime, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Очередь к выполнению: только незавершенные задачи по времени запуска
+    __table_args__ = (
+        Index("idx_jobs_due", run_at, postgresql_where=failed_at.is_(None)),
+    )
+    
+    def __repr__(self):
+        return f"<ScheduledJob(id={self.id}, kind={self.kind}, run_at={self.run_at})>"
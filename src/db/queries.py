@@ -0,0 +1,335 @@
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import Insert, Select, exists, func, lambda_stmt, or_, select, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from src.core.banks import BankDecision
+from src.core.enums import BankOfferStatus, LoanStatus
+from src.db.models import (
+    BankOffer,
+    BotState,
+    LoanApplication,
+    LoanApplicationArchive,
+    PersonalData,
+    ReferralRegistration,
+    ScoreHistory,
+    User,
+)
+
+# Горячие запросы построены через lambda_stmt: SQLAlchemy кэширует конструкцию
+# и скомпилированный SQL по месту определения лямбды, а значения из замыкания
+# становятся bind-параметрами. Одинаковый текст SQL позволяет asyncpg
+# переиспользовать prepared statement на соединении.
+
+
+def user_by_telegram_id(telegram_id: int) -> StatementLambdaElement:
+    """Пользователь по Telegram ID"""
+    return lambda_stmt(lambda: select(User).where(User.telegram_id == telegram_id))
+
+
+def user_language(telegram_id: int) -> StatementLambdaElement:
+    """Сохраненный язык пользователя по Telegram ID, без загрузки всей строки"""
+    return lambda_stmt(lambda: select(User.language_code).where(User.telegram_id == telegram_id))
+
+
+def user_by_id(user_id: int) -> StatementLambdaElement:
+    """Пользователь по внутреннему ID"""
+    return lambda_stmt(lambda: select(User).where(User.id == user_id))
+
+
+def user_by_referral_code(referral_code: str) -> StatementLambdaElement:
+    """Пользователь по реферальному коду"""
+    return lambda_stmt(lambda: select(User).where(User.referral_code == referral_code))
+
+
+def set_bot_blocked(telegram_id: int, blocked_at: Optional[datetime]) -> StatementLambdaElement:
+    """Отметка блокировки бота пользователем (None - разблокировал)"""
+    return lambda_stmt(
+        lambda: update(User)
+        .where(User.telegram_id == telegram_id)
+        .values(bot_blocked_at=blocked_at)
+    )
+
+
+def update_user_language(telegram_id: int, language_code: str) -> StatementLambdaElement:
+    """Смена языка пользователя"""
+    return lambda_stmt(
+        lambda: update(User)
+        .where(User.telegram_id == telegram_id)
+        .values(language_code=language_code)
+    )
+
+
+def bot_state_by_key(storage_key: str) -> StatementLambdaElement:
+    """Состояние и данные FSM по ключу хранилища"""
+    return lambda_stmt(
+        lambda: select(BotState.state, BotState.state_data).where(BotState.storage_key == storage_key)
+    )
+
+
+def personal_data_by_user_id(user_id: int) -> StatementLambdaElement:
+    """Персональные данные пользователя"""
+    return lambda_stmt(lambda: select(PersonalData).where(PersonalData.user_id == user_id))
+
+
+def application_by_id(application_id: int) -> StatementLambdaElement:
+    """Заявка по ID"""
+    return lambda_stmt(lambda: select(LoanApplication).where(LoanApplication.id == application_id))
+
+
+def active_application(user_id: int, status: Optional[LoanStatus] = None) -> StatementLambdaElement:
+    """
+    Последняя активная (неархивная) заявка пользователя
+
+    Args:
+        user_id: ID пользователя
+        status: Дополнительный фильтр по статусу заявки
+
+    Returns:
+        Запрос, возвращающий не более одной заявки
+    """
+    stmt = lambda_stmt(
+        lambda: select(LoanApplication)
+        .where(LoanApplication.user_id == user_id)
+        .where(LoanApplication.is_archived == False)  # noqa: E712
+        .order_by(LoanApplication.created_at.desc())
+        .limit(1)
+    )
+
+    if status is not None:
+        stmt += lambda s: s.where(LoanApplication.status == status)
+
+    return stmt
+
+
+def archive_active_applications(user_id: int) -> StatementLambdaElement:
+    """Архивирование всех активных заявок пользователя"""
+    return lambda_stmt(
+        lambda: update(LoanApplication)
+        .where(LoanApplication.user_id == user_id)
+        .where(LoanApplication.is_archived == False)  # noqa: E712
+        .values(is_archived=True)
+    )
+
+
+def unapplied_referral_registrations(referrer_id: int) -> StatementLambdaElement:
+    """Реферальные регистрации, бонус за которые еще не применен"""
+    return lambda_stmt(
+        lambda: select(ReferralRegistration)
+        .where(ReferralRegistration.referrer_id == referrer_id)
+        .where(ReferralRegistration.bonus_applied == False)  # noqa: E712
+    )
+
+
+def insert_bank_offers(decisions: Iterable[Tuple[int, BankDecision]], received_at: datetime) -> Insert:
+    """
+    Вставка ответов банков одним запросом
+
+    Ответ банка на заявку сохраняется один раз: повтор (задача, повторная
+    отправка банком) пропускается. RETURNING возвращает только новые ответы.
+
+    Args:
+        decisions: Пары (ID заявки, ответ банка)
+        received_at: Время получения
+    """
+    return (
+        insert(BankOffer)
+        .values([
+            {
+                "application_id": application_id,
+                "bank_code": decision.bank_code,
+                "status": decision.status,
+                "annual_rate": decision.annual_rate,
+                "amount": decision.amount,
+                "term_months": decision.term_months,
+                "received_at": received_at,
+            }
+            for application_id, decision in decisions
+        ])
+        .on_conflict_do_nothing(index_elements=[BankOffer.application_id, BankOffer.bank_code])
+        .returning(BankOffer.application_id, BankOffer.bank_code, BankOffer.status, BankOffer.annual_rate)
+    )
+
+
+def approved_offer_counts(application_ids: Iterable[int]) -> Select:
+    """Число одобривших банков по заявкам: строки (application_id, approved)"""
+    return (
+        select(
+            BankOffer.application_id,
+            func.count().filter(BankOffer.status == BankOfferStatus.APPROVED).label("approved"),
+        )
+        .where(BankOffer.application_id.in_(list(application_ids)))
+        .group_by(BankOffer.application_id)
+    )
+
+
+def application_offers(user_id: int, application_id: int) -> StatementLambdaElement:
+    """
+    Предложения банков по заявке пользователя, лучшее первым
+
+    Одобренные по возрастанию ставки, затем отказы - в порядке индекса
+    idx_offers_application_best, без сортировки. Заявка может быть уже
+    перенесена в архив; чужая заявка дает пустой список.
+    """
+    return lambda_stmt(
+        lambda: select(BankOffer)
+        .where(BankOffer.application_id == application_id)
+        .where(
+            or_(
+                exists()
+                .where(LoanApplication.id == application_id)
+                .where(LoanApplication.user_id == user_id),
+                exists()
+                .where(LoanApplicationArchive.id == application_id)
+                .where(LoanApplicationArchive.user_id == user_id),
+            )
+        )
+        .order_by(BankOffer.status, BankOffer.annual_rate)
+    )
+
+
+def bank_offers_by_time(bank_code: str, since: datetime, until: datetime, limit: int) -> StatementLambdaElement:
+    """Ответы банка за период, от новых к старым (индекс idx_offers_bank_received)"""
+    return lambda_stmt(
+        lambda: select(BankOffer)
+        .where(BankOffer.bank_code == bank_code)
+        .where(BankOffer.received_at >= since)
+        .where(BankOffer.received_at < until)
+        .order_by(BankOffer.received_at.desc())
+        .limit(limit)
+    )
+
+
+def broadcast_recipients(
+    after_user_id: int,
+    limit: int,
+    language_code: Optional[str] = None,
+    min_score: Optional[int] = None,
+) -> StatementLambdaElement:
+    """
+    Страница получателей рассылки по возрастанию users.id
+
+    Keyset по первичному ключу: страница читается диапазоном индекса
+    с позиции after_user_id, без OFFSET. Пользователи, заблокировавшие
+    бота, пропускаются.
+
+    Args:
+        after_user_id: ID последнего получателя предыдущей страницы
+        limit: Размер страницы
+        language_code: Только пользователи с этим языком
+        min_score: Только пользователи с баллом не ниже
+
+    Returns:
+        Строки (id, telegram_id, language_code)
+    """
+    stmt = lambda_stmt(
+        lambda: select(User.id, User.telegram_id, User.language_code)
+        .where(User.id > after_user_id)
+        .where(User.bot_blocked_at.is_(None))
+        .order_by(User.id)
+        .limit(limit)
+    )
+
+    if language_code is not None:
+        stmt += lambda s: s.where(User.language_code == language_code)
+    if min_score is not None:
+        stmt += lambda s: s.join(PersonalData, PersonalData.user_id == User.id).where(
+            PersonalData.current_score >= min_score
+        )
+
+    return stmt
+
+
+def _application_columns(model) -> Select:
+    """Колонки заявки из рабочей или архивной таблицы"""
+    return select(*(getattr(model, name) for name in LoanApplication.__table__.columns.keys()))
+
+
+def user_applications(
+    user_id: int,
+    include_archived: bool = False,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> Select:
+    """
+    Заявки пользователя от новых к старым для keyset-пагинации
+
+    Порядок (created_at, id) покрывается индексами idx_user_created
+    и idx_archive_user_created, поэтому страница читается диапазоном
+    индекса без сортировки и OFFSET. Архивные заявки лежат в двух таблицах
+    (еще не перенесенные и loan_applications_archive): фильтры стоят над
+    UNION ALL, Postgres протаскивает их в обе ветки и сливает упорядоченные
+    индексы через Merge Append.
+
+    Args:
+        user_id: ID пользователя
+        include_archived: Включать архивные заявки
+        after: Позиция (created_at, id) последней заявки предыдущей страницы
+    """
+    if include_archived:
+        history = union_all(
+            _application_columns(LoanApplication),
+            _application_columns(LoanApplicationArchive),
+        ).subquery("history")
+        application = aliased(LoanApplication, history)
+        query = select(application).where(application.user_id == user_id)
+    else:
+        application = LoanApplication
+        query = (
+            select(LoanApplication)
+            .where(LoanApplication.user_id == user_id)
+            .where(LoanApplication.is_archived == False)  # noqa: E712
+        )
+
+    if after is not None:
+        query = query.where(tuple_(application.created_at, application.id) < tuple_(*after))
+
+    return query.order_by(application.created_at.desc(), application.id.desc())
+
+
+# Интервалы сжатия истории балла для графиков
+SCORE_HISTORY_BUCKETS = ("day", "week", "month")
+
+
+def score_history_buckets(
+    user_id: int,
+    since: datetime,
+    until: datetime,
+    bucket: str,
+) -> StatementLambdaElement:
+    """
+    История балла пользователя, сжатая до интервалов для графика
+
+    Диапазон по recorded_at отсекает лишние месячные секции, внутри секции
+    точки читаются по первичному ключу (user_id, recorded_at).
+
+    Args:
+        user_id: ID пользователя
+        since: Начало периода (включительно)
+        until: Конец периода (не включительно)
+        bucket: Интервал из SCORE_HISTORY_BUCKETS
+
+    Returns:
+        Строки (bucket, min_score, max_score, last_score, points) по возрастанию bucket
+    """
+    if bucket not in SCORE_HISTORY_BUCKETS:
+        raise ValueError(f"Неизвестный интервал: {bucket}")
+
+    return lambda_stmt(
+        lambda: select(
+            func.date_trunc(bucket, ScoreHistory.recorded_at).label("bucket"),
+            func.min(ScoreHistory.score).label("min_score"),
+            func.max(ScoreHistory.score).label("max_score"),
+            func.array_agg(
+                aggregate_order_by(ScoreHistory.score, ScoreHistory.recorded_at.desc())
+            )[1].label("last_score"),
+            func.count().label("points"),
+        )
+        .where(ScoreHistory.user_id == user_id)
+        .where(ScoreHistory.recorded_at >= since)
+        .where(ScoreHistory.recorded_at < until)
+        .group_by("bucket")
+        .order_by("bucket")
+    )
@@ -0,0 +1,23 @@
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from src.config.settings import settings
+
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """Общий клиент Redis (пул соединений создается при первом обращении)"""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.redis_url)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Закрытие пула соединений Redis"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+
+from src.config.settings import settings
+from src.core.scoring import ScoringCalculator
+from src.db.database import get_db_context
+from src.db.models import ScoreHistory
+
+logger = logging.getLogger(__name__)
+
+# Секция по умолчанию (миграция 0004): строки вне созданных месячных секций
+DEFAULT_PARTITION = "score_history_default"
+# SQLSTATE check_violation: строки месяца уже лежат в секции по умолчанию
+CHECK_VIOLATION = "23514"
+
+
+def month_start(moment: datetime) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"score_history_y{month.year}m{month.month:02d}"
+
+
+def partition_ddl(month: date) -> str:
+    """DDL месячной секции score_history"""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF score_history "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    )
+
+
+def move_from_default_ddl(month: date) -> List[str]:
+    """
+    DDL секции месяца, строки которого уже попали в секцию по умолчанию
+
+    Пока секция по умолчанию содержит строки месяца, секцию месяца не
+    создать: секция по умолчанию отсоединяется, строки месяца переносятся
+    в новую секцию, и она присоединяется обратно. Выполняется одной
+    транзакцией.
+    """
+    bounds = f"recorded_at >= '{month.isoformat()}' AND recorded_at < '{next_month(month).isoformat()}'"
+    return [
+        f"ALTER TABLE score_history DETACH PARTITION {DEFAULT_PARTITION}",
+        partition_ddl(month),
+        f"INSERT INTO score_history SELECT * FROM {DEFAULT_PARTITION} WHERE {bounds}",
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE {bounds}",
+        f"ALTER TABLE score_history ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT",
+    ]
+
+
+async def _create_partition(month: date) -> None:
+    try:
+        async with get_db_context() as db:
+            await db.execute(text(partition_ddl(month)))
+        return
+    except DBAPIError as e:
+        if getattr(e.orig, "sqlstate", None) != CHECK_VIOLATION:
+            raise
+
+    logger.warning(f"Score history rows for {month:%Y-%m} are in the default partition, moving them")
+    try:
+        async with get_db_context() as db:
+            for statement in move_from_default_ddl(month):
+                await db.execute(text(statement))
+    except DBAPIError as e:
+        # Строки месяца остаются в секции по умолчанию - запись истории не прерывается
+        logger.error(f"Score history partition for {month:%Y-%m} not created: {e}")
+
+
+async def ensure_partitions(months_ahead: Optional[int] = None) -> None:
+    """
+    Создание секций текущего и следующих месяцев
+
+    Секции создаются заранее, чтобы строки не попадали в секцию
+    по умолчанию. Если строки месяца уже там, они переносятся в секцию
+    месяца; неудача переноса только логируется.
+    """
+    months_ahead = settings.score_history_partitions_ahead if months_ahead is None else months_ahead
+    month = month_start(datetime.utcnow())
+
+    # Каждая секция - своей транзакцией: ошибка одного месяца не отменяет остальные
+    for _ in range(months_ahead + 1):
+        await _create_partition(month)
+        month = next_month(month)
+
+
+class ScoreHistoryWriter:
+    """
+    Отложенная пакетная запись истории баллов
+
+    Обработчик только кладет точку в буфер, фоновая задача пишет буфер
+    одним INSERT по наполнении пачки или раз в score_history_flush_seconds.
+    Если база недоступна, буфер ограничен score_history_max_buffer:
+    при переполнении отбрасываются самые старые точки.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=settings.score_history_max_buffer)
+        self._ready = asyncio.Event()
+        self._partitions_month: Optional[date] = None
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def record(
+        self,
+        user_id: int,
+        score: int,
+        rules_mask: int,
+        recorded_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Добавление точки истории без обращения к базе
+
+        Args:
+            user_id: ID пользователя
+            score: Новый балл
+            rules_mask: Маска ScoringCalculator.get_matched_rules
+            recorded_at: Время изменения балла (UTC)
+        """
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+
+        self._buffer.append({
+            "user_id": user_id,
+            "recorded_at": recorded_at or datetime.utcnow(),
+            "score": score,
+            "rules_version": ScoringCalculator.RULES_VERSION,
+            "rules_mask": rules_mask,
+        })
+
+        if len(self._buffer) >= settings.score_history_batch_size:
+            self._ready.set()
+
+    async def _ensure_partitions(self) -> None:
+        # Секции проверяются при первой записи и при смене месяца
+        month = month_start(datetime.utcnow())
+        if self._partitions_month != month:
+            await ensure_partitions()
+            self._partitions_month = month
+
+    async def flush(self) -> int:
+        """
+        Запись накопленных точек одной транзакцией
+
+        Returns:
+            Количество записанных точек
+        """
+        if self.dropped:
+            logger.warning(f"Score history buffer overflow, dropped {self.dropped} points")
+            self.dropped = 0
+
+        if not self._buffer:
+            return 0
+
+        rows = list(self._buffer)
+        self._buffer.clear()
+
+        try:
+            await self._ensure_partitions()
+            async with get_db_context() as db:
+                await db.execute(insert(ScoreHistory).on_conflict_do_nothing(), rows)
+        except BaseException:
+            # Ошибка или отмена посреди записи: точки возвращаются в буфер
+            # перед новыми, лишние старые отбрасываются
+            self._buffer = deque([*rows, *self._buffer], maxlen=self._buffer.maxlen)
+            raise
+
+        return len(rows)
+
+    async def run(self) -> None:
+        """Фоновый цикл записи; при остановке буфер дописывается"""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._ready.wait(), settings.score_history_flush_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._ready.clear()
+
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"Score history flush error: {e}", exc_info=True)
+        finally:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Score history final flush error: {e}", exc_info=True)
+
+
+score_history_writer = ScoreHistoryWriter()
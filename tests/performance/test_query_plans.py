@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.enums import LoanStatus
+from src.db.archive import move_archived_batch
+from src.db.jobs import claim_due_jobs
+from src.db.queries import (
+    active_application,
+    application_by_id,
+    application_offers,
+    archive_active_applications,
+    bank_offers_by_time,
+    bot_state_by_key,
+    broadcast_recipients,
+    personal_data_by_user_id,
+    score_history_buckets,
+    unapplied_referral_registrations,
+    update_user_language,
+    user_applications,
+    user_by_id,
+    user_by_referral_code,
+    user_by_telegram_id,
+    user_language,
+)
+
+# Таблицы, растущие вместе с числом пользователей: полный просмотр по ним недопустим
+BIG_TABLES = {
+    "bot_states",
+    "users",
+    "personal_data",
+    "loan_applications",
+    "loan_applications_archive",
+    "referral_registrations",
+    "scheduled_jobs",
+    "bank_offers",
+}
+
+# Секционированные таблицы: в плане фигурируют их секции
+PARTITIONED_TABLES = ("score_history",)
+
+# Лимит страницы API с запасом на определение следующего курсора
+PAGE_LIMIT = 51
+
+# Размер пачки архиватора в проверке плана
+ARCHIVE_BATCH = 100
+
+# Размер пачки захвата отложенных задач
+JOB_BATCH = 20
+
+# Страница получателей рассылки
+BROADCAST_BATCH = 500
+
+# Бюджет прочитанных страниц: единицы на запрос пользователя,
+# для пакетных операций - на строку пачки, для годовой истории
+# тяжелого пользователя (~8760 точек) - плотное чтение по первичному ключу
+BUFFERS_BUDGET = 100
+BATCH_BUFFERS_BUDGET = {
+    "move_archived_batch": ARCHIVE_BATCH * 20,
+    "claim_due_jobs": JOB_BATCH * 20,
+    "broadcast_recipients": BROADCAST_BATCH * 20,
+    "broadcast_recipients_min_score": BROADCAST_BATCH * 20,
+    "score_history_heavy_month": 400,
+}
+
+# Группировка истории по интервалам сортирует уже агрегированные точки (не больше сотен)
+SORT_ALLOWED = {"score_history_week", "score_history_heavy_month"}
+
+HOT_QUERIES = {
+    "user_by_telegram_id": lambda s: user_by_telegram_id(s["telegram_id"]),
+    "user_language": lambda s: user_language(s["telegram_id"]),
+    "user_by_id": lambda s: user_by_id(s["user_id"]),
+    "user_by_referral_code": lambda s: user_by_referral_code(s["referral_code"]),
+    "personal_data_by_user_id": lambda s: personal_data_by_user_id(s["user_id"]),
+    "application_by_id": lambda s: application_by_id(s["application_id"]),
+    "active_application": lambda s: active_application(s["user_id"]),
+    "active_application_new": lambda s: active_application(s["user_id"], status=LoanStatus.NEW),
+    "user_applications": lambda s: user_applications(s["heavy_user_id"]).limit(PAGE_LIMIT),
+    "user_applications_archived": lambda s: user_applications(
+        s["heavy_user_id"], include_archived=True
+    ).limit(PAGE_LIMIT),
+    "user_applications_after": lambda s: user_applications(
+        s["heavy_user_id"], include_archived=True, after=s["cursor"]
+    ).limit(PAGE_LIMIT),
+    "unapplied_referral_registrations": lambda s: unapplied_referral_registrations(s["referrer_id"]),
+    "archive_active_applications": lambda s: archive_active_applications(s["user_id"]),
+    "update_user_language": lambda s: update_user_language(s["telegram_id"], "uz"),
+    "bot_state_by_key": lambda s: bot_state_by_key(s["storage_key"]),
+    "move_archived_batch": lambda s: move_archived_batch(
+        datetime.utcnow() - timedelta(hours=24), ARCHIVE_BATCH
+    ),
+    "claim_due_jobs": lambda s: claim_due_jobs(datetime.utcnow(), JOB_BATCH, 300),
+    "broadcast_recipients": lambda s: broadcast_recipients(s["user_id"], BROADCAST_BATCH),
+    "broadcast_recipients_min_score": lambda s: broadcast_recipients(
+        s["user_id"], BROADCAST_BATCH, min_score=700
+    ),
+    "application_offers": lambda s: application_offers(s["user_id"], s["application_id"]),
+    "bank_offers_by_time": lambda s: bank_offers_by_time(
+        "kapitalbank", datetime.utcnow() - timedelta(days=1), datetime.utcnow(), 100
+    ),
+    "score_history_week": lambda s: score_history_buckets(
+        s["user_id"], s["history_since"], s["history_until"], "week"
+    ),
+    "score_history_heavy_month": lambda s: score_history_buckets(
+        s["heavy_user_id"], s["history_since"], s["history_until"], "month"
+    ),
+}
+
+
+def plan_nodes(plan):
+    """Обход всех узлов плана"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def is_big_table(relation) -> bool:
+    if relation is None:
+        return False
+    return relation in BIG_TABLES or relation.startswith(
+        tuple(f"{table}_" for table in PARTITIONED_TABLES)
+    )
+
+
+def describe(plan) -> str:
+    return " -> ".join(
+        f"{node['Node Type']}({node.get('Index Name') or node.get('Relation Name', '')})"
+        for node in plan_nodes(plan)
+    )
+
+
+class TestQueryPlans:
+    """Регрессионные тесты планов горячих запросов на большой выборке"""
+
+    @pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+    def test_no_seq_scan_on_big_tables(self, explain, sample, name):
+        """Тест: горячий запрос не читает большие таблицы целиком"""
+        plan = explain(HOT_QUERIES[name](sample))
+
+        for node in plan_nodes(plan):
+            assert not (
+                node["Node Type"] == "Seq Scan" and is_big_table(node.get("Relation Name"))
+            ), describe(plan)
+
+    @pytest.mark.parametrize("name", sorted(set(HOT_QUERIES) - SORT_ALLOWED))
+    def test_no_sort(self, explain, sample, name):
+        """Тест: порядок строк берется из индекса, а не из сортировки"""
+        plan = explain(HOT_QUERIES[name](sample))
+
+        for node in plan_nodes(plan):
+            assert node["Node Type"] not in ("Sort", "Incremental Sort"), describe(plan)
+
+    @pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+    def test_buffers_budget(self, explain, sample, name):
+        """Тест: запрос читает ограниченное число страниц, не зависящее от размера таблиц"""
+        plan = explain(HOT_QUERIES[name](sample))
+        budget = BATCH_BUFFERS_BUDGET.get(name, BUFFERS_BUDGET)
+
+        assert plan["Shared Hit Blocks"] + plan["Shared Read Blocks"] < budget, describe(plan)
+
+    def test_active_application_uses_index(self, explain, sample):
+        """Тест: активная заявка читается по индексу в порядке created_at"""
+        plan = explain(active_application(sample["user_id"]))
+
+        assert "idx_user_created" in {node.get("Index Name") for node in plan_nodes(plan)}, describe(plan)
+
+    def test_application_offers_use_index(self, explain, sample):
+        """Тест: предложения заявки читаются по индексу в порядке показа"""
+        plan = explain(application_offers(sample["user_id"], sample["application_id"]))
+
+        assert "idx_offers_application_best" in {node.get("Index Name") for node in plan_nodes(plan)}, describe(plan)
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from src.db.archive import ARCHIVE_COLUMNS, move_archived_batch
+from src.db.models import LoanApplicationArchive
+
+
+class TestArchiveMover:
+    """Тесты запроса переноса архивных заявок"""
+
+    def test_move_is_single_statement(self, compile_pg):
+        """Тест: удаление и вставка в архив выполняются одним запросом"""
+        sql = str(compile_pg(move_archived_batch(datetime(2024, 1, 1), 100)))
+
+        assert sql.startswith("WITH moved AS")
+        assert "(DELETE FROM loan_applications WHERE" in sql
+        assert "RETURNING" in sql
+        assert "INSERT INTO loan_applications_archive" in sql
+
+    def test_batch_skips_locked_rows(self, compile_pg):
+        """Тест: пачка ограничена и не ждет заблокированные строки"""
+        sql = str(compile_pg(move_archived_batch(datetime(2024, 1, 1), 100)))
+
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "LIMIT" in sql
+        assert "loan_applications.is_archived = true" in sql
+
+    def test_archive_has_all_columns(self):
+        """Тест: архив хранит все колонки рабочей таблицы"""
+        archive_columns = set(LoanApplicationArchive.__table__.columns.keys())
+
+        assert set(ARCHIVE_COLUMNS) <= archive_columns
+        assert "archived_at" in archive_columns
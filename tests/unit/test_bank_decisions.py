@@ -0,0 +1,321 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.api import banks
+from src.api.banks import BankDecisionIngestion, is_rejected, is_retryable
+from src.core.banks import BankDecision
+from src.core.enums import BankOfferStatus, LoanStatus, LoanType
+from src.db.models import BankOffer, LoanApplication, ScheduledJob, User
+from src.db.queries import approved_offer_counts, insert_bank_offers
+
+TOKEN = "bank-token"
+
+
+def decision_json(application_id, status="approved", annual_rate="21.5"):
+    return {"application_id": application_id, "status": status, "annual_rate": annual_rate}
+
+
+def approved(application_id, bank_code="kapitalbank"):
+    return application_id, BankDecision(bank_code, BankOfferStatus.APPROVED, annual_rate=Decimal("20"))
+
+
+class MemoryIngestion(BankDecisionIngestion):
+    """BankDecisionIngestion, записывающий пачки в список"""
+
+    def __init__(self, failures=0, poison=(), **kwargs):
+        super().__init__(bot=None, **kwargs)
+        self.batches = []
+        self.failures = failures
+        self.poison = set(poison)  # ID заявок, которые база отвергает
+
+    async def apply(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("db is down")
+        if any(application_id in self.poison for application_id, _ in batch):
+            raise DataError("INSERT INTO bank_offers", {}, Exception("numeric field overflow"))
+        self.batches.append(batch)
+        return {}
+
+
+def make_client(monkeypatch, queue_size=10):
+    monkeypatch.setattr(banks.settings, "bank_api_tokens", {"kapitalbank": TOKEN})
+    app = FastAPI()
+    app.include_router(banks.router, prefix="/api/v1")
+    # Запись не запущена: решения остаются в буфере
+    app.state.bank_decisions = MemoryIngestion(queue_size=queue_size)
+    return TestClient(app), app.state.bank_decisions
+
+
+class TestDecisionsEndpoint:
+    """Тесты эндпоинта решений банков"""
+
+    def post(self, client, decisions, bank="kapitalbank", token=TOKEN):
+        headers = {"X-Bank-Token": token} if token else {}
+        return client.post(f"/api/v1/banks/{bank}/decisions", json={"decisions": decisions}, headers=headers)
+
+    def test_decisions_are_buffered(self, monkeypatch):
+        """Тест: решения сразу подтверждаются 202 и попадают в буфер"""
+        client, ingestion = make_client(monkeypatch)
+
+        response = self.post(client, [decision_json(1), decision_json(2, "declined", None)])
+
+        assert response.status_code == 202
+        assert response.json() == {"accepted": 2}
+        assert len(ingestion) == 2
+
+    def test_token(self, monkeypatch):
+        """Тест: без верного токена банка - 403, для неизвестного банка - 404"""
+        client, ingestion = make_client(monkeypatch)
+
+        assert self.post(client, [decision_json(1)], token=None).status_code == 403
+        assert self.post(client, [decision_json(1)], token="wrong").status_code == 403
+        assert self.post(client, [decision_json(1)], bank="unknown").status_code == 404
+        assert len(ingestion) == 0
+
+    def test_disabled(self, monkeypatch):
+        """Тест: без запущенного приема эндпоинта нет"""
+        client, _ = make_client(monkeypatch)
+        client.app.state.bank_decisions = None
+
+        assert self.post(client, [decision_json(1)]).status_code == 404
+
+    def test_approved_requires_rate(self, monkeypatch):
+        """Тест: одобрение без ставки отклоняется целиком"""
+        client, ingestion = make_client(monkeypatch)
+
+        assert self.post(client, [decision_json(1), decision_json(2, annual_rate=None)]).status_code == 422
+        assert len(ingestion) == 0
+
+    def test_out_of_range(self, monkeypatch):
+        """Тест: значения, не помещающиеся в колонки базы, отклоняются на входе"""
+        client, ingestion = make_client(monkeypatch)
+        too_big = dict(decision_json(1), amount="10000000000000")
+
+        assert self.post(client, [decision_json(2**31)]).status_code == 422
+        assert self.post(client, [too_big]).status_code == 422
+        assert self.post(client, [dict(decision_json(1), term_months=2**31)]).status_code == 422
+        assert len(ingestion) == 0
+
+    def test_full_buffer(self, monkeypatch):
+        """Тест: не помещающийся запрос отклоняется целиком с 503, банк повторит"""
+        client, ingestion = make_client(monkeypatch, queue_size=3)
+
+        assert self.post(client, [decision_json(1), decision_json(2)]).status_code == 202
+        assert self.post(client, [decision_json(3), decision_json(4)]).status_code == 503
+        assert len(ingestion) == 2
+
+
+class TestDecisionBatching:
+    """Тесты пакетной записи решений"""
+
+    async def run_until(self, ingestion, condition):
+        await ingestion.start()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if condition():
+                break
+        await ingestion.stop(drain_seconds=1)
+
+    async def test_batches(self):
+        """Тест: решения пишутся пачками не больше batch_size"""
+        ingestion = MemoryIngestion(batch_size=3, flush_seconds=0.01)
+        ingestion.submit([approved(i) for i in range(7)])
+
+        await self.run_until(ingestion, lambda: len(ingestion) == 0)
+
+        assert [len(batch) for batch in ingestion.batches] == [3, 3, 1]
+
+    async def test_flush_collects_burst(self):
+        """Тест: решения, пришедшие за flush_seconds, пишутся одной пачкой"""
+        ingestion = MemoryIngestion(batch_size=100, flush_seconds=0.05)
+        await ingestion.start()
+        for i in range(5):
+            ingestion.submit([approved(i)])
+            await asyncio.sleep(0.005)
+        await ingestion.stop(drain_seconds=1)
+
+        assert [len(batch) for batch in ingestion.batches] == [5]
+
+    async def test_retry_on_db_error(self, monkeypatch):
+        """Тест: при ошибке БД пачка повторяется, а не теряется"""
+        monkeypatch.setattr(banks.settings, "bank_ingest_retry_seconds", 0.01)
+        ingestion = MemoryIngestion(failures=2, flush_seconds=0)
+        ingestion.submit([approved(1), approved(2)])
+
+        await self.run_until(ingestion, lambda: ingestion.batches)
+
+        assert ingestion.batches == [[approved(1), approved(2)]]
+        assert len(ingestion) == 0
+
+    async def test_rejected_rows_are_dropped(self):
+        """Тест: решение, которое база отвергает, отбрасывается, остальные записываются"""
+        ingestion = MemoryIngestion(poison={3}, flush_seconds=0)
+        ingestion.submit([approved(i) for i in range(5)])
+
+        await self.run_until(ingestion, lambda: len(ingestion) == 0)
+
+        stored = sorted(application_id for batch in ingestion.batches for application_id, _ in batch)
+        assert stored == [0, 1, 2, 4]
+
+    async def test_unexpected_error_drops_batch(self, monkeypatch):
+        """Тест: пачка с ошибкой, которую повтор не исправит, не блокирует прием"""
+        ingestion = MemoryIngestion(flush_seconds=0)
+
+        async def broken(batch):
+            raise ValueError("bug")
+
+        monkeypatch.setattr(ingestion, "apply", broken)
+        ingestion.submit([approved(1)])
+
+        await self.run_until(ingestion, lambda: len(ingestion) == 0)
+
+        assert len(ingestion) == 0
+        assert ingestion._queue._unfinished_tasks == 0
+
+    def test_error_classes(self):
+        """Тест: ошибки asyncpg различаются по SQLSTATE - данные отбрасываются, соединение повторяется"""
+
+        def error(sqlstate):
+            return DBAPIError("INSERT INTO bank_offers", {}, SimpleNamespace(sqlstate=sqlstate))
+
+        assert is_rejected(error("22003")) and not is_retryable(error("22003"))
+        assert is_rejected(error("23502"))
+        assert is_retryable(error("08006")) and not is_rejected(error("08006"))
+        assert is_retryable(error("57P01"))
+        assert is_retryable(ConnectionRefusedError())
+        assert not is_retryable(error("42P01")) and not is_rejected(error("42P01"))
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        self.sent.append((chat_id, text))
+
+
+class TestOfferNotifications:
+    """Тесты уведомлений о предложениях"""
+
+    async def test_job_payload(self):
+        """Тест: задача BANK_OFFERS_JOB переживает JSON и отправляет те же предложения"""
+        offers = [BankDecision("kapitalbank", BankOfferStatus.APPROVED, annual_rate=Decimal("21.5"))]
+        payload = json.loads(json.dumps(banks.bank_offers_payload([(1001, "uz", offers)])))
+        direct, queued = FakeBot(), FakeBot()
+
+        await banks.notify_offers(direct, [(1001, "uz", offers)])
+        await banks.bank_offers_job(queued)(payload)
+
+        assert queued.sent == direct.sent
+        assert "21.5" in queued.sent[0][1]
+
+    def test_api_without_bot_does_not_send(self):
+        """Тест: процесс API без бота не создает своего - уведомления отправят процессы бота"""
+        assert banks.create_ingestion().bot is None
+
+
+class TestApplyDatabase:
+    """Тесты записи решений в настоящую базу (TEST_DATABASE_URL)"""
+
+    @pytest.fixture
+    async def session_maker(self, pg_engine, monkeypatch):
+        session_maker = async_sessionmaker(pg_engine, expire_on_commit=False)
+
+        @asynccontextmanager
+        async def context():
+            # Как get_db_context: коммит при выходе, откат при ошибке
+            async with session_maker() as session:
+                try:
+                    yield session
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+
+        monkeypatch.setattr(banks, "get_db_context", context)
+        return session_maker
+
+    async def add_application(self, session_maker, telegram_id, status=LoanStatus.SENT):
+        async with session_maker() as db:
+            user = User(telegram_id=telegram_id, referral_code=f"R{telegram_id}", language_code="ru")
+            db.add(user)
+            await db.flush()
+            application = LoanApplication(
+                user_id=user.id, loan_type=LoanType.MICROLOAN, amount=Decimal("1000000"),
+                annual_rate=Decimal("24"), term_months=12, monthly_payment=Decimal("94560"),
+                pdn_value=Decimal("20"), status=status,
+            )
+            db.add(application)
+            await db.commit()
+            return application.id
+
+    async def offers(self, session_maker):
+        async with session_maker() as db:
+            result = await db.execute(select(BankOffer.application_id, BankOffer.bank_code).order_by(BankOffer.id))
+            return [tuple(row) for row in result]
+
+    async def test_apply(self, session_maker):
+        """Тест: новые решения сохраняются, повтор и чужие заявки пропускаются, итог пишется в заявку"""
+        sent = await self.add_application(session_maker, 1001)
+        new = await self.add_application(session_maker, 1002, status=LoanStatus.NEW)
+        ingestion = BankDecisionIngestion(bot=None)
+
+        approvals = await ingestion.apply([approved(sent), approved(new), approved(sent, "hamkorbank")])
+
+        assert list(approvals) == [sent]
+        telegram_id, lang_code, offers = approvals[sent]
+        assert (telegram_id, lang_code) == (1001, "ru")
+        assert sorted(offer.bank_code for offer in offers) == ["hamkorbank", "kapitalbank"]
+        assert await ingestion.apply([approved(sent)]) == {}
+        async with session_maker() as db:
+            application = await db.get(LoanApplication, sent)
+            assert application.bank_response is not None
+            assert application.bank_response_at is not None
+            # Без бота уведомление - задача для процессов бота, одна на пачку с одобрениями
+            jobs = (await db.execute(select(ScheduledJob.kind))).scalars().all()
+            assert jobs == [banks.BANK_OFFERS_JOB]
+
+    async def test_rejected_row_is_dropped(self, session_maker):
+        """Тест: решение, которое база отвергает, не мешает записи остальных решений пачки"""
+        first = await self.add_application(session_maker, 1001)
+        second = await self.add_application(session_maker, 1002)
+        overflow = BankDecision(
+            "hamkorbank", BankOfferStatus.APPROVED, annual_rate=Decimal("20"), amount=Decimal("1e14")
+        )
+        ingestion = BankDecisionIngestion(bot=None)
+
+        approvals = await ingestion.apply_or_split([approved(first), (first, overflow), approved(second)])
+
+        assert sorted(approvals) == [first, second]
+        assert sorted(await self.offers(session_maker)) == [(first, "kapitalbank"), (second, "kapitalbank")]
+
+
+class TestOfferQueries:
+    """Тесты запросов предложений банков"""
+
+    def test_insert_skips_duplicates(self, compile_pg):
+        """Тест: ответы пишутся одним INSERT, повтор пропускается, возвращаются новые"""
+        sql = str(compile_pg(insert_bank_offers([approved(1), approved(2, "hamkorbank")], datetime(2024, 1, 1))))
+
+        assert sql.count("INSERT INTO bank_offers") == 1
+        assert "ON CONFLICT (application_id, bank_code) DO NOTHING" in sql
+        assert "RETURNING" in sql
+
+    def test_approved_counts(self, compile_pg):
+        """Тест: одобрения считаются одним запросом по всем заявкам"""
+        sql = str(compile_pg(approved_offer_counts([1, 2])))
+
+        assert "count(*) FILTER (WHERE bank_offers.status = " in sql
+        assert "GROUP BY bank_offers.application_id" in sql
@@ -0,0 +1,194 @@
+import asyncio
+import random
+import time
+from decimal import Decimal
+
+import pytest
+
+from src.core.banks import (
+    BANK_HEDGED,
+    BankAdapter,
+    BankDecision,
+    BankError,
+    BankRequest,
+    StubBankAdapter,
+    collect_offers,
+    request_with_hedge,
+)
+from src.core.enums import BankOfferStatus, LoanType
+
+
+def bank_request(loan_type=LoanType.CARLOAN, rate="20"):
+    return BankRequest(
+        application_id=1,
+        loan_type=loan_type,
+        amount=Decimal("10000000"),
+        annual_rate=Decimal(rate),
+        term_months=24,
+    )
+
+
+class FakeBank(BankAdapter):
+    """Банк с заданными задержками ответов по попыткам"""
+
+    def __init__(self, code, latencies, approve=True, fail=()):
+        self.code = code
+        self.name = code
+        self.latencies = list(latencies)
+        self.approve = approve
+        self.fail = set(fail)
+        self.calls = 0
+        self.cancelled = 0
+        self.started_at = self.finished_at = None
+
+    async def request_offer(self, request):
+        attempt = self.calls
+        self.calls += 1
+        self.started_at = time.monotonic()
+        try:
+            await asyncio.sleep(self.latencies[min(attempt, len(self.latencies) - 1)])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        self.finished_at = time.monotonic()
+        if attempt in self.fail:
+            raise BankError("boom")
+        if not self.approve:
+            return BankDecision(self.code, BankOfferStatus.DECLINED)
+        return BankDecision(self.code, BankOfferStatus.APPROVED, annual_rate=request.annual_rate)
+
+
+class TestCollectOffers:
+    """Тесты параллельного опроса банков"""
+
+    async def test_concurrent(self):
+        """Тест: банки опрашиваются параллельно - все запросы отправлены до первого ответа"""
+        banks = [FakeBank(f"bank{i}", [0.05]) for i in range(4)]
+
+        decisions = await collect_offers(banks, bank_request(), timeout=1, hedge_after=1, enough=10)
+
+        assert max(bank.started_at for bank in banks) < min(bank.finished_at for bank in banks)
+        assert sorted(decision.bank_code for decision in decisions) == ["bank0", "bank1", "bank2", "bank3"]
+
+    async def test_timeout_skips_bank(self):
+        """Тест: банк, не уложившийся в таймаут, пропускается, остальные ответы сохраняются"""
+        fast = FakeBank("fast", [0.01])
+        slow = FakeBank("slow", [5])
+
+        started = time.monotonic()
+        decisions = await collect_offers([fast, slow], bank_request(), timeout=0.1, hedge_after=1, enough=10)
+
+        assert time.monotonic() - started < 0.3
+        assert [decision.bank_code for decision in decisions] == ["fast"]
+        assert slow.cancelled == 1
+
+    async def test_error_skips_bank(self):
+        """Тест: ошибка одного банка не мешает остальным"""
+        broken = FakeBank("broken", [0.01], fail={0, 1})
+        ok = FakeBank("ok", [0.01], approve=False)
+
+        decisions = await collect_offers([broken, ok], bank_request(), timeout=1, hedge_after=1, enough=10)
+
+        assert [(decision.bank_code, decision.approved) for decision in decisions] == [("ok", False)]
+
+    async def test_enough_offers_returns_early(self):
+        """Тест: набрав enough одобрений, опрос завершается, медленные запросы отменяются"""
+        banks = [FakeBank("a", [0.01]), FakeBank("b", [0.02]), FakeBank("slow", [5])]
+
+        started = time.monotonic()
+        decisions = await collect_offers(banks, bank_request(), timeout=10, hedge_after=10, enough=2)
+
+        assert time.monotonic() - started < 0.3
+        assert [decision.bank_code for decision in decisions] == ["a", "b"]
+        assert banks[2].cancelled == 1
+
+    async def test_declines_do_not_count_as_enough(self):
+        """Тест: отказы не прерывают опрос - ждем одобрений"""
+        banks = [FakeBank("no", [0.01], approve=False), FakeBank("yes", [0.05])]
+
+        decisions = await collect_offers(banks, bank_request(), timeout=1, hedge_after=1, enough=1)
+
+        assert [decision.bank_code for decision in decisions] == ["no", "yes"]
+
+
+class TestHedging:
+    """Тесты дублирования запросов к медленному банку"""
+
+    async def test_hedge_wins(self):
+        """Тест: медленный первый запрос обгоняется дублем, первый отменяется"""
+        bank = FakeBank("bank", [5, 0.01])
+        hedged = BANK_HEDGED.labels("bank")._value.get()
+
+        started = time.monotonic()
+        decision = await request_with_hedge(bank, bank_request(), hedge_after=0.05)
+
+        assert decision.approved
+        assert time.monotonic() - started < 0.3
+        assert bank.calls == 2
+        assert bank.cancelled == 1
+        assert BANK_HEDGED.labels("bank")._value.get() == hedged + 1
+
+    async def test_fast_response_not_hedged(self):
+        """Тест: быстрый банк получает один запрос"""
+        bank = FakeBank("bank", [0.01])
+
+        await request_with_hedge(bank, bank_request(), hedge_after=0.5)
+
+        assert bank.calls == 1
+
+    async def test_hedge_after_error(self):
+        """Тест: ошибка первого запроса сразу запускает повтор"""
+        bank = FakeBank("bank", [0.01], fail={0})
+
+        started = time.monotonic()
+        decision = await request_with_hedge(bank, bank_request(), hedge_after=5)
+
+        assert decision.approved
+        assert time.monotonic() - started < 0.3
+        assert bank.calls == 2
+
+    async def test_both_attempts_fail(self):
+        """Тест: если оба запроса упали, ошибка передается вызывающему"""
+        bank = FakeBank("bank", [0.01], fail={0, 1})
+
+        with pytest.raises(BankError):
+            await request_with_hedge(bank, bank_request(), hedge_after=5)
+        assert bank.calls == 2
+
+
+class TestStubBankAdapter:
+    """Тесты банка-заглушки"""
+
+    def stub(self, offset="0", **kwargs):
+        kwargs.setdefault("approval_probability", 1.0)
+        kwargs.setdefault("error_probability", 0.0)
+        return StubBankAdapter("stub", "Stub", Decimal(offset), latency_median=0, rng=random.Random(1), **kwargs)
+
+    async def test_offer_rate(self):
+        """Тест: предложение - ставка заявки со сдвигом банка"""
+        decision = await self.stub("-2").request_offer(bank_request(rate="20"))
+
+        assert decision.approved
+        assert decision.annual_rate == Decimal("18")
+        assert decision.term_months == 24
+
+    async def test_rate_limits(self):
+        """Тест: ставка вне допустимого диапазона - отказ"""
+        carloan = await self.stub("-2").request_offer(bank_request(LoanType.CARLOAN, rate="5"))
+        microloan = await self.stub("1").request_offer(bank_request(LoanType.MICROLOAN, rate="79"))
+
+        assert not carloan.approved
+        assert not microloan.approved
+
+    async def test_error_probability(self):
+        """Тест: с заданной вероятностью банк отвечает ошибкой"""
+        with pytest.raises(BankError):
+            await self.stub(error_probability=1.0).request_offer(bank_request())
+
+    def test_latency_distribution(self):
+        """Тест: медиана задержки близка к настроенной, есть длинный хвост"""
+        stub = StubBankAdapter("stub", "Stub", Decimal("0"), latency_median=0.5, latency_sigma=1.0, rng=random.Random(1))
+        latencies = sorted(stub.latency() for _ in range(2000))
+
+        assert 0.4 < latencies[1000] < 0.6
+        assert latencies[-20] > 4
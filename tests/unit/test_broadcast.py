@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.methods import SendMessage
+
+from src.bot.broadcast import send_page
+from src.bot.middleware.send_limit import SendPriority, send_priority
+from src.db.queries import broadcast_recipients
+
+
+def recipient(user_id, language_code="ru"):
+    return SimpleNamespace(id=user_id, telegram_id=1000 + user_id, language_code=language_code)
+
+
+class FakeBot:
+    """Бот, отвечающий ошибками для заданных чатов"""
+
+    def __init__(self, blocked=(), broken=()):
+        self.blocked = set(blocked)
+        self.broken = set(broken)
+        self.sent = []
+        self.priorities = set()
+        self.parse_modes = set()
+
+    async def send_message(self, chat_id, text, parse_mode="Markdown"):
+        # По умолчанию - parse_mode бота
+        self.priorities.add(send_priority.get())
+        self.parse_modes.add(parse_mode)
+        method = SendMessage(chat_id=chat_id, text=text)
+        if chat_id in self.blocked:
+            raise TelegramForbiddenError(method=method, message="Forbidden: bot was blocked by the user")
+        if chat_id in self.broken:
+            raise TelegramBadRequest(method=method, message="Bad Request: chat not found")
+        self.sent.append((chat_id, text))
+
+
+class TestSendPage:
+    """Тесты отправки страницы рассылки"""
+
+    async def test_outcomes(self):
+        """Тест: заблокировавшие бота возвращаются для отметки, прочие ошибки только считаются"""
+        bot = FakeBot(blocked={1002}, broken={1003})
+
+        result = await send_page(bot, [recipient(i) for i in range(1, 5)], lambda lang: "text")
+
+        assert result.sent == 2
+        assert result.blocked == [2]
+        assert result.failed == 1
+        assert sorted(chat_id for chat_id, _ in bot.sent) == [1001, 1004]
+
+    async def test_language_and_priority(self):
+        """Тест: текст на языке получателя (по умолчанию ru), отправка с приоритетом BULK"""
+        bot = FakeBot()
+
+        await send_page(bot, [recipient(1, "uz"), recipient(2, None)], lambda lang: f"text-{lang}")
+
+        assert sorted(bot.sent) == [(1001, "text-uz"), (1002, "text-ru")]
+        assert bot.priorities == {SendPriority.BULK}
+
+    async def test_plain_text(self):
+        """Тест: текст рассылки уходит без разметки, "_" и "*" не ломают отправку"""
+        bot = FakeBot()
+
+        await send_page(bot, [recipient(1)], lambda lang: "promo_code *NEW*")
+
+        assert bot.parse_modes == {None}
+
+
+class TestBroadcastRecipients:
+    """Тесты запроса получателей рассылки"""
+
+    def test_keyset_page(self, compile_pg):
+        """Тест: страница читается по users.id после позиции, без OFFSET, заблокировавшие пропускаются"""
+        sql = str(compile_pg(broadcast_recipients(100, 500)))
+
+        assert "users.id >" in sql
+        assert "users.bot_blocked_at IS NULL" in sql
+        assert "ORDER BY users.id" in sql
+        assert "OFFSET" not in sql
+        assert "personal_data" not in sql
+
+    def test_segment(self, compile_pg):
+        """Тест: сегмент по языку и баллу"""
+        sql = str(compile_pg(broadcast_recipients(0, 500, language_code="uz", min_score=700)))
+
+        assert "users.language_code =" in sql
+        assert "JOIN personal_data ON personal_data.user_id = users.id" in sql
+        assert "personal_data.current_score >=" in sql
@@ -0,0 +1,164 @@
+import asyncio
+import gzip
+import os
+import zlib
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import admin
+from src.db import export
+from src.db.export import EXPORT_TABLES, export_filename, export_sql, export_table
+
+
+class TestExportQueries:
+    """Тесты запросов выгрузки"""
+
+    def test_applications_include_archive(self):
+        """Тест: выгрузка заявок читает и рабочую таблицу, и архив"""
+        sql = export_sql("loan_applications")
+
+        assert "UNION ALL" in sql
+        assert "FROM loan_applications_archive" in sql
+
+    def test_sql_has_no_parameters(self):
+        """Тест: SQL выгрузки пригоден для COPY - без параметров"""
+        for table in EXPORT_TABLES:
+            sql = export_sql(table)
+            assert "%(" not in sql and "$1" not in sql
+
+    def test_unknown_table_and_format(self):
+        """Тест: неизвестная таблица или формат отклоняются до обращения к базе"""
+        with pytest.raises(ValueError):
+            export_table("bot_states")
+        with pytest.raises(ValueError):
+            export_table("users", "xlsx")
+
+    def test_filenames(self):
+        """Тест: имена файлов выгрузки"""
+        assert export_filename("users", "csv") == "users.csv.gz"
+        assert export_filename("users", "parquet") == "users.parquet"
+
+
+class TestParquetSchema:
+    """Тесты схемы Parquet"""
+
+    def test_column_types(self):
+        """Тест: денежные суммы - decimal, идентификаторы Telegram - int64"""
+        pa = pytest.importorskip("pyarrow")
+        from src.db.export import _arrow_schema
+
+        users = _arrow_schema("users")
+        applications = _arrow_schema("loan_applications")
+
+        assert users.field("telegram_id").type == pa.int64()
+        assert applications.field("amount").type == pa.decimal128(15, 2)
+        assert applications.field("status").type == pa.string()
+
+    def test_all_tables_have_schema(self):
+        """Тест: для каждой таблицы выгрузки строится схема"""
+        pytest.importorskip("pyarrow")
+        from src.db.export import _arrow_schema
+
+        for table in EXPORT_TABLES:
+            assert len(_arrow_schema(table)) > 0
+
+
+class FakeCopyEngine:
+    """Движок, COPY которого отдает чанки и, если задано, обрывается ошибкой"""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.connected = False
+
+    async def copy_from_query(self, sql, output, **kwargs):
+        for chunk in self.chunks:
+            await output(chunk)
+        if self.error:
+            raise self.error
+
+    @asynccontextmanager
+    async def connect(self):
+        async def get_raw_connection():
+            return SimpleNamespace(driver_connection=self)
+
+        self.connected = True
+        try:
+            yield SimpleNamespace(get_raw_connection=get_raw_connection)
+        finally:
+            self.connected = False
+
+
+class TestCsvExport:
+    """Тесты выгрузки CSV через COPY"""
+
+    async def test_gzip(self, monkeypatch):
+        """Тест: выгрузка - целый gzip с CSV"""
+        engine = FakeCopyEngine([b"id\n", b"1\n2\n"])
+        monkeypatch.setattr(export, "_export_engine", lambda: engine)
+
+        parts = [part async for part in export._copy_csv_gzip("users", None)]
+
+        assert gzip.decompress(b"".join(parts)) == b"id\n1\n2\n"
+
+    async def test_failed_copy_has_no_trailer(self, monkeypatch):
+        """Тест: при обрыве COPY архив остается неполным, а не выглядит целым"""
+        engine = FakeCopyEngine([b"id\n", b"1\n"], error=ConnectionError("replica is gone"))
+        monkeypatch.setattr(export, "_export_engine", lambda: engine)
+        parts = []
+
+        with pytest.raises(ConnectionError):
+            async for part in export._copy_csv_gzip("users", None):
+                parts.append(part)
+
+        decompressor = zlib.decompressobj(wbits=31)
+        decompressor.decompress(b"".join(parts))
+        assert not decompressor.eof
+
+    async def test_client_disconnect_releases_connection(self, monkeypatch):
+        """Тест: клиент ушел при полной очереди - COPY останавливается, соединение освобождается"""
+        monkeypatch.setattr(export.settings, "export_queue_chunks", 2)
+        engine = FakeCopyEngine([os.urandom(100_000) for _ in range(20)])
+        monkeypatch.setattr(export, "_export_engine", lambda: engine)
+
+        stream = export._copy_csv_gzip("users", None)
+        await stream.__anext__()
+        await asyncio.sleep(0.01)
+        assert engine.connected
+        await stream.aclose()
+
+        assert not engine.connected
+        assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
+
+
+class TestAdminToken:
+    """Тесты доступа к admin API"""
+
+    def check(self, token):
+        asyncio.run(admin.verify_admin_token(token))
+
+    def test_disabled_without_token(self, monkeypatch):
+        """Тест: без настроенного токена admin API не существует"""
+        monkeypatch.setattr(admin.settings, "admin_api_token", None)
+
+        with pytest.raises(HTTPException) as exc:
+            self.check("anything")
+        assert exc.value.status_code == 404
+
+    def test_wrong_token(self, monkeypatch):
+        """Тест: неверный или отсутствующий токен - 403"""
+        monkeypatch.setattr(admin.settings, "admin_api_token", "secret")
+
+        for token in (None, "", "wrong"):
+            with pytest.raises(HTTPException) as exc:
+                self.check(token)
+            assert exc.value.status_code == 403
+
+    def test_valid_token(self, monkeypatch):
+        """Тест: верный токен пропускается"""
+        monkeypatch.setattr(admin.settings, "admin_api_token", "secret")
+
+        self.check("secret")
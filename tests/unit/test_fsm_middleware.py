@@ -0,0 +1,109 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from aiogram.fsm.storage.memory import DisabledEventIsolation, MemoryStorage
+
+from src.bot.middleware.fsm import BufferedFSMContextMiddleware
+from src.bot.storage.base import FSMRecord, RecordStorage, storage_key
+
+
+class CountingStorage(RecordStorage):
+    """Хранилище в памяти, считающее обращения"""
+
+    def __init__(self):
+        self.records = {}
+        self.reads = 0
+        self.writes = 0
+
+    async def get_record(self, key):
+        self.reads += 1
+        record = self.records.get(storage_key(key), FSMRecord())
+        return FSMRecord(record.state, dict(record.data))
+
+    async def set_record(self, key, state, data):
+        self.writes += 1
+        self.records[storage_key(key)] = FSMRecord(state, dict(data))
+
+    async def close(self):
+        pass
+
+
+def event_data():
+    user = SimpleNamespace(id=10)
+    return {"bot": SimpleNamespace(id=1), "event_from_user": user, "event_chat": user}
+
+
+async def process_amount(event, data):
+    """Шаг диалога как в loan.py: чтение, обновление данных, смена состояния"""
+    state = data["state"]
+    await state.get_data()
+    await state.update_data(amount=Decimal("1500000"))
+    await state.get_data()
+    await state.set_state("LoanApplicationStates:entering_rate")
+    return await state.get_state()
+
+
+class TestBufferedFSMContext:
+    """Тесты буферизованного FSM-контекста"""
+
+    async def test_one_read_one_write(self):
+        """Тест: шаг диалога - одно чтение и одна запись хранилища"""
+        storage = CountingStorage()
+        middleware = BufferedFSMContextMiddleware(storage, DisabledEventIsolation())
+
+        result = await middleware(process_amount, None, event_data())
+
+        assert result == "LoanApplicationStates:entering_rate"
+        assert (storage.reads, storage.writes) == (1, 1)
+        assert storage.records["1:10:10"].data == {"amount": Decimal("1500000")}
+
+    async def test_read_only_step_does_not_write(self):
+        """Тест: шаг без изменений не пишет в хранилище"""
+        storage = CountingStorage()
+        middleware = BufferedFSMContextMiddleware(storage, DisabledEventIsolation())
+
+        async def handler(event, data):
+            return await data["state"].get_data()
+
+        await middleware(handler, None, event_data())
+        assert (storage.reads, storage.writes) == (1, 0)
+
+    async def test_changes_written_on_error(self):
+        """Тест: изменения до ошибки сохраняются, как без буферизации"""
+        storage = CountingStorage()
+        middleware = BufferedFSMContextMiddleware(storage, DisabledEventIsolation())
+
+        async def handler(event, data):
+            await data["state"].update_data(step=1)
+            raise RuntimeError("handler failed")
+
+        with pytest.raises(RuntimeError):
+            await middleware(handler, None, event_data())
+        assert storage.records["1:10:10"].data == {"step": 1}
+
+    async def test_returned_data_is_a_copy(self):
+        """Тест: изменение полученного словаря не меняет состояние"""
+        storage = CountingStorage()
+        middleware = BufferedFSMContextMiddleware(storage, DisabledEventIsolation())
+
+        async def handler(event, data):
+            values = await data["state"].get_data()
+            values["leaked"] = True
+            return await data["state"].get_data()
+
+        assert await middleware(handler, None, event_data()) == {}
+
+    async def test_plain_storage(self):
+        """Тест: со стандартным хранилищем aiogram контекст тоже работает"""
+        storage = MemoryStorage()
+        middleware = BufferedFSMContextMiddleware(storage, DisabledEventIsolation())
+
+        await middleware(process_amount, None, event_data())
+
+        async def handler(event, data):
+            return data["raw_state"], await data["state"].get_data()
+
+        state, values = await middleware(handler, None, event_data())
+        assert state == "LoanApplicationStates:entering_rate"
+        assert values == {"amount": Decimal("1500000")}
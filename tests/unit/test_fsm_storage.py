@@ -0,0 +1,163 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from src.bot.storage import codec, database
+from src.bot.storage.base import storage_key
+from src.bot.storage.database import DatabaseStorage
+
+
+def key(user_id: int) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+
+
+class TestCodec:
+    """Тесты кодирования данных FSM"""
+
+    def test_decimal_roundtrip(self):
+        """Тест: суммы и ставки остаются Decimal после записи в базу"""
+        data = {"amount": Decimal("1500000.50"), "rate": Decimal("24"), "loan_type": "microloan"}
+
+        assert codec.loads(codec.dumps(data)) == data
+        assert isinstance(codec.loads(codec.dumps(data))["amount"], Decimal)
+
+    def test_datetime_roundtrip(self):
+        """Тест: даты восстанавливаются с типом"""
+        data = {"started_at": datetime(2024, 1, 1, 12, 30)}
+        assert codec.loads(codec.dumps(data)) == data
+
+    def test_storage_key(self):
+        """Тест: ключ хранилища однозначно задает бота, чат и пользователя"""
+        assert storage_key(key(5)) == "1:5:5"
+        assert storage_key(StorageKey(bot_id=1, chat_id=5, user_id=6, thread_id=7)) == "1:5:6:7"
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class FakeDB:
+    def __init__(self):
+        self.loads = 0
+        self.writes = []
+        self.fail = False
+        self.gate = None  # asyncio.Event: запись ждет его, как медленная база
+
+    async def execute(self, stmt, rows=None):
+        if rows is None:
+            self.loads += 1
+            return FakeResult(None)
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise ConnectionError("database is down")
+        self.writes.append(rows)
+
+
+class TestDatabaseStorage:
+    """Тесты FSM-хранилища с отложенной записью"""
+
+    @pytest.fixture
+    def db(self, monkeypatch):
+        db = FakeDB()
+
+        @asynccontextmanager
+        async def context():
+            yield db
+
+        monkeypatch.setattr(database, "get_db_context", context)
+        return db
+
+    async def test_steps_do_not_write(self, db):
+        """Тест: шаги диалога не пишут в базу синхронно"""
+        storage = DatabaseStorage(flush_seconds=60)
+        await storage.set_state(key(1), "LoanApplicationStates:entering_amount")
+        await storage.update_data(key(1), {"amount": Decimal("100")})
+
+        assert db.writes == []
+        assert await storage.get_state(key(1)) == "LoanApplicationStates:entering_amount"
+        assert db.loads == 1
+        await storage.close()
+
+    async def test_changes_are_coalesced(self, db):
+        """Тест: несколько изменений ключа между сбросами дают одну строку"""
+        storage = DatabaseStorage(flush_seconds=60)
+        for step in range(5):
+            await storage.update_data(key(1), {"step": step})
+        await storage.update_data(key(2), {"step": 0})
+
+        assert await storage.flush() == 2
+        rows = {row["storage_key"]: row for row in db.writes[0]}
+        assert codec.loads(rows["1:1:1"]["state_data"]) == {"step": 4}
+        assert await storage.flush() == 0
+        await storage.close()
+
+    async def test_failed_flush_is_retried(self, db):
+        """Тест: при ошибке базы изменения остаются грязными"""
+        storage = DatabaseStorage(flush_seconds=60)
+        await storage.set_state(key(1), "PersonalDataStates:entering_age")
+        db.fail = True
+
+        with pytest.raises(ConnectionError):
+            await storage.flush()
+
+        db.fail = False
+        assert await storage.flush() == 1
+        await storage.close()
+
+    async def test_eviction_keeps_dirty_keys(self, db):
+        """Тест: из кэша вытесняются только уже записанные ключи"""
+        storage = DatabaseStorage(cache_size=2, flush_seconds=60)
+        await storage.set_state(key(1), "a")
+        await storage.flush()
+        await storage.set_state(key(2), "b")
+        await storage.set_state(key(3), "c")
+
+        assert list(storage._cache) == ["1:2:2", "1:3:3"]
+        await storage.close()
+        assert {row["storage_key"] for row in db.writes[-1]} == {"1:2:2", "1:3:3"}
+
+    async def test_inflight_keys_are_not_evicted(self, db):
+        """Тест: ключ, запись которого еще не подтверждена, не вытесняется из кэша"""
+        storage = DatabaseStorage(cache_size=1, flush_seconds=60)
+        await storage.set_state(key(1), "a")
+        db.gate = asyncio.Event()
+        flush = asyncio.create_task(storage.flush())
+        await asyncio.sleep(0)
+
+        await storage.set_state(key(2), "b")
+        await storage.get_state(key(3))
+
+        # Ключ 1 еще пишется: чтение идет из кэша, а не из базы со старым состоянием
+        assert await storage.get_state(key(1)) == "a"
+        db.gate.set()
+        assert await flush == 1
+        await storage.close()
+
+    async def test_eviction_during_failed_flush(self, db):
+        """Тест: после неудачной записи, во время которой шло вытеснение, ключи не теряются"""
+        storage = DatabaseStorage(cache_size=1, flush_seconds=60)
+        await storage.set_state(key(1), "a")
+        db.gate = asyncio.Event()
+        db.fail = True
+        flush = asyncio.create_task(storage.flush())
+        await asyncio.sleep(0)
+
+        for user_id in range(2, 5):
+            await storage.get_state(key(user_id))
+        db.gate.set()
+        with pytest.raises(ConnectionError):
+            await flush
+
+        db.fail = False
+        assert await storage.flush() == 1
+        assert db.writes[-1][0]["storage_key"] == "1:1:1"
+        await storage.close()
@@ -0,0 +1,96 @@
+import gettext
+import os
+
+import pytest
+
+from src.bot import i18n
+from src.bot.i18n import MmapTranslations, compile_catalog, compile_catalogs, load_catalog, simple_gettext
+
+PO = '''msgid ""
+msgstr ""
+"Language: ru\\n"
+"Content-Type: text/plain; charset=UTF-8\\n"
+"Plural-Forms: nplurals=3; plural=(n%10==1 && n%100!=11 ? 0 : n%10>=2 && n%10<=4 && (n%100<10 || n%100>=20) ? 1 : 2);\\n"
+
+msgid "Back"
+msgstr "Назад"
+
+msgid "Approved by {count} banks"
+msgstr "Одобрено {count} банками"
+
+msgid "Ёлка"
+msgstr "Ель"
+
+msgid "day"
+msgid_plural "days"
+msgstr[0] "день"
+msgstr[1] "дня"
+msgstr[2] "дней"
+'''
+
+
+@pytest.fixture
+def locales(tmp_path):
+    (tmp_path / "ru.po").write_text(PO, encoding="utf-8")
+    return tmp_path
+
+
+class TestCatalogs:
+    """Тесты каталогов переводов"""
+
+    def test_compile_and_mmap(self, locales):
+        """Тест: собранный .mo читается через mmap так же, как стандартным gettext"""
+        compile_catalogs(locales)
+        catalog = load_catalog("ru", locales)
+
+        assert isinstance(catalog, MmapTranslations)
+        with open(locales / "ru.mo", "rb") as f:
+            reference = gettext.GNUTranslations(f)
+        for message in ("Back", "Approved by {count} banks", "Ёлка", "Unknown"):
+            assert catalog.gettext(message) == reference.gettext(message)
+        assert catalog.gettext("Back") == "Назад"
+        assert catalog.gettext("Unknown") == "Unknown"
+
+    def test_plural(self, locales):
+        """Тест: множественные формы по Plural-Forms каталога"""
+        catalog = MmapTranslations(compile_catalog(locales / "ru.po"))
+
+        assert [catalog.ngettext("day", "days", n) for n in (1, 3, 5, 21)] == ["день", "дня", "дней", "день"]
+        assert catalog.ngettext("hour", "hours", 2) == "hours"
+
+    def test_stale_catalog_is_not_used(self, locales):
+        """Тест: если .po новее .mo, каталог собирается из .po"""
+        compile_catalogs(locales)
+        (locales / "ru.po").write_text(PO.replace("Назад", "Обратно"), encoding="utf-8")
+        mo_mtime = (locales / "ru.mo").stat().st_mtime
+        os.utime(locales / "ru.po", (mo_mtime + 1, mo_mtime + 1))
+
+        assert load_catalog("ru", locales).gettext("Back") == "Обратно"
+
+    def test_missing_language(self, locales):
+        """Тест: для языка без файлов текст не переводится"""
+        assert load_catalog("uz", locales).gettext("Back") == "Back"
+
+
+class TestSimpleGettext:
+    """Тесты перевода из каталогов проекта"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_translations(self, monkeypatch):
+        monkeypatch.setattr(i18n, "_translations", {})
+
+    def test_project_catalogs(self):
+        """Тест: переводы берутся из src/bot/i18n/*.po"""
+        assert simple_gettext("ru", "Back") == "Назад"
+        assert simple_gettext("uz", "Back") == "Orqaga"
+        assert simple_gettext("ru", "Approved by {count} banks").format(count=2) == "Одобрено 2 банками"
+
+    def test_lazy(self):
+        """Тест: каталог языка загружается при первом обращении"""
+        simple_gettext("uz", "Back")
+
+        assert set(i18n._translations) == {"uz"}
+
+    def test_unknown_language(self):
+        """Тест: неподдерживаемый язык возвращает исходный текст"""
+        assert simple_gettext("en", "Back") == "Back"
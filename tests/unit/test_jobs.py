@@ -0,0 +1,119 @@
+import asyncio
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+from src.db import jobs
+from src.db.jobs import JobWorker, claim_due_jobs, new_job, retry_delay
+
+
+class MemoryJobWorker(JobWorker):
+    """JobWorker над списком задач в памяти"""
+
+    def __init__(self, due, handlers, concurrency):
+        super().__init__(handlers, concurrency=concurrency, poll_seconds=0.01)
+        self.due = list(due)
+        self.completed = []
+        self.failed = []
+        self.claims = []
+
+    async def claim(self, limit):
+        self.claims.append(limit)
+        claimed, self.due = self.due[:limit], self.due[limit:]
+        return claimed
+
+    async def complete(self, job):
+        self.completed.append(job.id)
+
+    async def fail(self, job, error):
+        self.failed.append((job.id, error))
+
+
+def job_row(job_id, kind="test", **payload):
+    return SimpleNamespace(id=job_id, kind=kind, payload=json.dumps(payload), attempts=1)
+
+
+class TestJobQueries:
+    """Тесты запросов очереди задач"""
+
+    def test_claim_skips_locked_rows(self, compile_pg):
+        """Тест: захват - один UPDATE по наступившим задачам, занятые строки пропускаются"""
+        sql = str(compile_pg(claim_due_jobs(datetime(2024, 1, 1), 10, 300)))
+
+        assert sql.startswith("UPDATE scheduled_jobs SET run_at=")
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "scheduled_jobs.failed_at IS NULL" in sql
+        assert "RETURNING" in sql
+
+    def test_new_job(self):
+        """Тест: задача хранит параметры в JSON и время запуска с задержкой"""
+        job = new_job("bank_response", {"application_id": 1}, delay_seconds=600)
+
+        assert json.loads(job.payload) == {"application_id": 1}
+        assert (job.run_at - datetime.utcnow()).total_seconds() > 590
+
+    def test_retry_backoff(self, monkeypatch):
+        """Тест: пауза перед повтором удваивается"""
+        monkeypatch.setattr(jobs.settings, "job_retry_seconds", 30)
+
+        assert [retry_delay(attempt) for attempt in (1, 2, 3)] == [30, 60, 120]
+
+
+class TestJobWorker:
+    """Тесты выполнения задач"""
+
+    async def run_until(self, worker, condition):
+        task = asyncio.create_task(worker.run())
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if condition():
+                break
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def test_bounded_concurrency(self):
+        """Тест: одновременно выполняется не больше concurrency задач"""
+        running = 0
+        peak = 0
+
+        async def handler(payload):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        worker = MemoryJobWorker([job_row(i) for i in range(10)], {"test": handler}, concurrency=3)
+        await self.run_until(worker, lambda: len(worker.completed) == 10)
+
+        assert sorted(worker.completed) == list(range(10))
+        assert peak == 3
+        assert max(worker.claims) == 3
+
+    async def test_failures(self):
+        """Тест: ошибка обработчика и неизвестный тип задачи идут в fail, остальные задачи выполняются"""
+        async def handler(payload):
+            if payload.get("broken"):
+                raise ValueError("boom")
+
+        due = [job_row(1), job_row(2, broken=True), job_row(3, kind="unknown")]
+        worker = MemoryJobWorker(due, {"test": handler}, concurrency=5)
+        await self.run_until(worker, lambda: len(worker.completed) + len(worker.failed) == 3)
+
+        assert worker.completed == [1]
+        assert [job_id for job_id, _ in worker.failed] == [2, 3]
+        assert isinstance(worker.failed[1][1], LookupError)
+
+    async def test_stop_cancels_running_jobs(self):
+        """Тест: при остановке выполняемые задачи прерываются и не отмечаются выполненными"""
+        started = asyncio.Event()
+
+        async def handler(payload):
+            started.set()
+            await asyncio.sleep(10)
+
+        worker = MemoryJobWorker([job_row(1)], {"test": handler}, concurrency=1)
+        await self.run_until(worker, started.is_set)
+
+        assert worker.completed == []
+        assert worker.failed == []
@@ -0,0 +1,203 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.bot.middleware import i18n
+from src.bot.middleware.i18n import LanguageCache
+from src.db.queries import user_language
+
+
+class Loader:
+    """Чтение языка из «базы» с подсчетом обращений"""
+
+    def __init__(self, languages):
+        self.languages = languages
+        self.calls = 0
+
+    async def __call__(self, telegram_id):
+        self.calls += 1
+        return self.languages.get(telegram_id)
+
+
+class BrokenRedis(FakeRedis):
+    """Недоступный Redis"""
+
+    async def execute_command(self, *args, **kwargs):
+        raise RedisConnectionError("Connection refused")
+
+
+class TestLanguageCache:
+    """Тесты кэша языка пользователя"""
+
+    async def test_hit(self):
+        """Тест: повторное обновление пользователя не обращается к базе"""
+        cache = LanguageCache(maxsize=10, shared=False)
+        load = Loader({1: "uz"})
+
+        assert await cache.get(1, load) == "uz"
+        assert await cache.get(1, load) == "uz"
+        assert load.calls == 1
+
+    async def test_invalidate(self):
+        """Тест: после смены языка читается новый язык"""
+        cache = LanguageCache(maxsize=10, shared=False)
+        load = Loader({1: "uz"})
+        await cache.get(1, load)
+
+        load.languages[1] = "ru"
+        await cache.invalidate(1)
+
+        assert await cache.get(1, load) == "ru"
+
+    async def test_negative_ttl(self, monkeypatch):
+        """Тест: незарегистрированный пользователь кэшируется на negative_ttl"""
+        now = [0.0]
+        monkeypatch.setattr(i18n.time, "monotonic", lambda: now[0])
+        cache = LanguageCache(maxsize=10, ttl=3600, negative_ttl=30, shared=False)
+        load = Loader({})
+
+        assert await cache.get(1, load) is None
+        assert await cache.get(1, load) is None
+        assert load.calls == 1
+
+        load.languages[1] = "uz"
+        now[0] = 31
+        assert await cache.get(1, load) == "uz"
+        now[0] = 1000
+        assert await cache.get(1, load) == "uz"
+        assert load.calls == 2
+
+    async def test_bounded(self):
+        """Тест: в процессе хранится не больше maxsize пользователей"""
+        cache = LanguageCache(maxsize=2, shared=False)
+        load = Loader({})
+        for telegram_id in range(5):
+            await cache.get(telegram_id, load)
+
+        assert len(cache._local) == 2
+
+
+class TestSharedLanguageCache:
+    """Тесты общего уровня кэша в Redis"""
+
+    @pytest.fixture
+    async def redis(self, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(i18n, "get_redis", lambda: redis)
+        yield redis
+        await redis.aclose()
+
+    async def test_shared_between_instances(self, redis):
+        """Тест: язык, прочитанный одним экземпляром, не читается из базы другим"""
+        load = Loader({1: "uz", 2: None})
+        first = LanguageCache(maxsize=10, shared=True)
+        second = LanguageCache(maxsize=10, shared=True)
+
+        await first.get(1, load)
+        await first.get(2, load)
+
+        assert await second.get(1, load) == "uz"
+        assert await second.get(2, load) is None
+        assert load.calls == 2
+        assert 0 < await redis.ttl("lang:2") <= 30
+
+    async def test_invalidate_shared(self, redis):
+        """Тест: смена языка сбрасывает и общий уровень"""
+        cache = LanguageCache(maxsize=10, shared=True)
+        load = Loader({1: "uz"})
+        await cache.get(1, load)
+
+        load.languages[1] = "ru"
+        await cache.invalidate(1)
+
+        assert await LanguageCache(maxsize=10, shared=True).get(1, load) == "ru"
+        assert 0 < await redis.ttl("lang:1") <= i18n.INVALIDATED_TTL_SECONDS
+
+    async def test_invalidate_reaches_other_instances(self, redis, monkeypatch):
+        """Тест: смену языка в одном экземпляре другой видит через локальный TTL общего режима"""
+        now = [0.0]
+        monkeypatch.setattr(i18n.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(i18n.settings, "language_cache_shared_local_ttl_seconds", 10)
+        load = Loader({1: "uz"})
+        first = LanguageCache(maxsize=10, ttl=3600, shared=True)
+        second = LanguageCache(maxsize=10, ttl=3600, shared=True)
+        assert await first.get(1, load) == "uz"
+        assert await second.get(1, load) == "uz"
+
+        load.languages[1] = "ru"
+        await first.invalidate(1)
+
+        assert await first.get(1, load) == "ru"
+        now[0] = 11
+        assert await second.get(1, load) == "ru"
+
+    async def test_stale_fill_after_invalidate(self, redis):
+        """Тест: чтение, начатое до смены языка, не оставляет старый язык в общем кэше"""
+        read = asyncio.Event()
+        proceed = asyncio.Event()
+
+        async def slow_load(telegram_id):
+            # Прочитали старый язык, ответ задержался до коммита смены языка
+            read.set()
+            await proceed.wait()
+            return "uz"
+
+        fill = asyncio.create_task(LanguageCache(maxsize=10, shared=True).get(1, slow_load))
+        await read.wait()
+        await LanguageCache(maxsize=10, shared=True).invalidate(1)
+        proceed.set()
+        await fill
+
+        load = Loader({1: "ru"})
+        assert await LanguageCache(maxsize=10, shared=True).get(1, load) == "ru"
+        assert load.calls == 1
+
+    async def test_redis_unavailable(self, monkeypatch):
+        """Тест: без Redis язык читается из базы"""
+        redis = BrokenRedis()
+        monkeypatch.setattr(i18n, "get_redis", lambda: redis)
+        cache = LanguageCache(maxsize=10, shared=True)
+
+        assert await cache.get(1, Loader({1: "uz"})) == "uz"
+        await cache.invalidate(1)
+
+
+class FakeSession:
+    def __init__(self, name, used):
+        self.name = name
+        self.used = used
+
+    async def execute(self, stmt):
+        self.used.append(self.name)
+        return self
+
+    def scalar_one_or_none(self):
+        return "uz"
+
+
+class TestLanguageQuery:
+    """Тест запроса языка"""
+
+    async def test_primary(self, monkeypatch):
+        """Тест: для общего кэша язык читается с primary, иначе - с реплики"""
+        used = []
+
+        @asynccontextmanager
+        async def session(name):
+            yield FakeSession(name, used)
+
+        monkeypatch.setattr(i18n, "async_session_maker", lambda: session("primary"))
+        monkeypatch.setattr(i18n, "get_read_db_context", lambda telegram_id: session("replica"))
+
+        assert await i18n.load_user_language(1) == "uz"
+        assert await i18n.load_user_language(1, primary=True) == "uz"
+        assert used == ["replica", "primary"]
+
+    def test_reads_only_language(self, compile_pg):
+        """Тест: читается только language_code, без всей строки пользователя"""
+        sql = str(compile_pg(user_language(1)))
+
+        assert sql.startswith("SELECT users.language_code \nFROM users")
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+from alembic.script import ScriptDirectory
+
+from src.db.database import MIGRATIONS_DIR, verify_schema_heads
+from src.db.models import Base
+
+
+@pytest.fixture(scope="module")
+def scripts():
+    return ScriptDirectory(str(MIGRATIONS_DIR))
+
+
+class TestMigrations:
+    """Тесты каталога миграций"""
+
+    def test_single_head(self, scripts):
+        """Тест: у миграций одна голова (нет неслитых веток)"""
+        assert len(scripts.get_heads()) == 1
+
+    def test_chain_starts_from_baseline(self, scripts):
+        """Тест: цепочка ревизий начинается с baseline"""
+        assert scripts.get_base() == "0001"
+
+    def test_model_indexes_have_migrations(self):
+        """Тест: каждый индекс моделей создается миграцией, а не только create_all"""
+        sources = "\n".join(path.read_text() for path in Path(MIGRATIONS_DIR, "versions").glob("*.py"))
+        missing = [
+            index.name
+            for table in Base.metadata.tables.values()
+            for index in table.indexes
+            if f"'{index.name}'" not in sources
+        ]
+
+        assert missing == []
+
+
+class TestSchemaVersionCheck:
+    """Тесты проверки версии схемы при старте"""
+
+    def test_current_schema_passes(self, scripts):
+        """Тест: схема на последней ревизии"""
+        verify_schema_heads(set(scripts.get_heads()), scripts)
+
+    def test_outdated_schema_fails(self, scripts):
+        """Тест: отстающая схема останавливает запуск"""
+        with pytest.raises(RuntimeError, match="alembic upgrade head"):
+            verify_schema_heads({"0001"}, scripts)
+
+    def test_unversioned_schema_fails(self, scripts):
+        """Тест: неразмеченная база останавливает запуск"""
+        with pytest.raises(RuntimeError):
+            verify_schema_heads(set(), scripts)
+
+    def test_newer_schema_allowed(self, scripts):
+        """Тест: схема новее кода допускается во время rolling deploy"""
+        verify_schema_heads({"ffffffffffff"}, scripts)
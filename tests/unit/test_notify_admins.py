@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import SendMessage
+
+from src.bot import utils
+from src.bot.middleware.send_limit import SendPriority, send_priority
+from src.bot.utils import notify_admins
+
+
+class SlowBot:
+    """Бот с задержкой ответа; учитывает одновременные отправки"""
+
+    def __init__(self, delay=0.05, blocked=()):
+        self.delay = delay
+        self.blocked = set(blocked)
+        self.sent = []
+        self.active = 0
+        self.max_active = 0
+        self.priorities = set()
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        self.priorities.add(send_priority.get())
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if chat_id in self.blocked:
+                raise TelegramForbiddenError(method=SendMessage(chat_id=chat_id, text=text), message="Forbidden")
+            self.sent.append((chat_id, text))
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture(autouse=True)
+async def clean_digests(monkeypatch):
+    monkeypatch.setattr(utils.settings, "admin_notify_digest_seconds", 0)
+    utils._admin_digests.clear()
+    yield
+    for task in utils._admin_digest_tasks:
+        task.cancel()
+    await asyncio.gather(*utils._admin_digest_tasks, return_exceptions=True)
+    utils._admin_digests.clear()
+
+
+class TestNotifyAdmins:
+    """Тесты уведомлений администраторам"""
+
+    async def test_concurrent_bounded(self, monkeypatch):
+        """Тест: отправки идут одновременно, но не больше admin_notify_concurrency"""
+        monkeypatch.setattr(utils.settings, "admin_notify_concurrency", 3)
+        bot = SlowBot()
+
+        await notify_admins(bot, "alert", list(range(10)))
+
+        assert len(bot.sent) == 10
+        assert bot.max_active == 3
+        assert bot.priorities == {SendPriority.BULK}
+
+    async def test_failure_does_not_stop_others(self):
+        """Тест: ошибка отправки одному админу не мешает остальным"""
+        bot = SlowBot(delay=0, blocked={2})
+
+        await notify_admins(bot, "alert", [1, 2, 3])
+
+        assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 3]
+
+    async def test_digest(self, monkeypatch):
+        """Тест: повторы в окне не отправляются, а уходят одной сводкой"""
+        monkeypatch.setattr(utils.settings, "admin_notify_digest_seconds", 0.05)
+        bot = SlowBot(delay=0)
+
+        for _ in range(4):
+            await notify_admins(bot, "db is down", [1])
+        await notify_admins(bot, "other", [1])
+        assert [text for _, text in bot.sent] == ["db is down", "other"]
+
+        await asyncio.sleep(0.1)
+
+        assert len(bot.sent) == 3
+        assert "Повторилось еще 3 раз" in bot.sent[2][1]
+
+        # Окно закрыто: следующее уведомление снова уходит сразу
+        await notify_admins(bot, "db is down", [1])
+        assert bot.sent[-1] == (1, "db is down")
@@ -0,0 +1,28 @@
+import pytest
+from datetime import datetime
+
+from src.api.pagination import decode_cursor, encode_cursor
+
+
+class TestCursor:
+    """Тесты курсора keyset-пагинации"""
+
+    def test_roundtrip(self):
+        """Тест: курсор декодируется в исходную позицию"""
+        created_at = datetime(2024, 5, 17, 12, 30, 45, 123456)
+
+        cursor = encode_cursor(created_at, 42)
+
+        assert decode_cursor(cursor) == (created_at, 42)
+
+    def test_cursor_is_url_safe(self):
+        """Тест: курсор можно передавать в query-параметре без экранирования"""
+        cursor = encode_cursor(datetime(2024, 1, 1), 10**9)
+
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", "WyJ4IiwxXQ"])
+    def test_invalid_cursor(self, cursor):
+        """Тест: поврежденный курсор вызывает ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
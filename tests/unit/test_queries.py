@@ -0,0 +1,131 @@
+import pytest
+from datetime import datetime
+
+from src.core.enums import LoanStatus
+from src.db.queries import (
+    active_application,
+    application_by_id,
+    application_offers,
+    archive_active_applications,
+    bank_offers_by_time,
+    bot_state_by_key,
+    personal_data_by_user_id,
+    score_history_buckets,
+    unapplied_referral_registrations,
+    user_applications,
+    user_by_id,
+    user_by_referral_code,
+    user_by_telegram_id,
+)
+
+
+class TestHotQueries:
+    """Тесты кэшируемых горячих запросов"""
+
+    @pytest.mark.parametrize("factory", [
+        user_by_telegram_id,
+        user_by_id,
+        personal_data_by_user_id,
+        application_by_id,
+        active_application,
+        user_by_referral_code,
+        unapplied_referral_registrations,
+        archive_active_applications,
+        bot_state_by_key,
+    ])
+    def test_cache_key_shared_between_values(self, compile_pg, factory):
+        """Тест: разные значения дают один ключ кэша и один текст SQL"""
+        first = factory(1)
+        second = factory(2)
+
+        assert first._generate_cache_key().key == second._generate_cache_key().key
+        assert str(compile_pg(first)) == str(compile_pg(second))
+
+    def test_values_become_parameters(self, compile_pg):
+        """Тест: значения передаются как bind-параметры"""
+        compiled = compile_pg(user_by_telegram_id(123456789))
+
+        assert "123456789" not in str(compiled)
+        assert 123456789 in compiled.params.values()
+
+    def test_active_application_is_limited(self, compile_pg):
+        """Тест: активная заявка выбирается одной строкой по дате"""
+        sql = str(compile_pg(active_application(1)))
+
+        assert "is_archived = false" in sql
+        assert "ORDER BY loan_applications.created_at DESC" in sql
+        assert "LIMIT" in sql
+
+    def test_active_application_with_status(self, compile_pg):
+        """Тест: фильтр по статусу добавляется только когда задан"""
+        plain = compile_pg(active_application(1))
+        with_status = compile_pg(active_application(1, status=LoanStatus.NEW))
+
+        assert "loan_applications.status =" not in str(plain)
+        assert "loan_applications.status =" in str(with_status)
+        assert LoanStatus.NEW in with_status.params.values()
+
+    def test_user_applications_keyset(self, compile_pg):
+        """Тест: страница заявок строится по (created_at, id) без OFFSET"""
+        sql = str(compile_pg(user_applications(1, after=(datetime(2024, 1, 1), 10))))
+
+        assert "(loan_applications.created_at, loan_applications.id) <" in sql
+        assert "ORDER BY loan_applications.created_at DESC, loan_applications.id DESC" in sql
+        assert "OFFSET" not in sql
+
+    def test_user_applications_include_archived(self, compile_pg):
+        """Тест: архивные заявки фильтруются только по умолчанию"""
+        assert "is_archived" in str(compile_pg(user_applications(1)))
+        assert "is_archived =" not in str(compile_pg(user_applications(1, include_archived=True)))
+
+    def test_user_applications_history_union(self, compile_pg):
+        """Тест: история объединяет рабочую и архивную таблицы, фильтры над UNION ALL"""
+        sql = str(compile_pg(user_applications(1, include_archived=True, after=(datetime(2024, 1, 1), 10))))
+
+        assert "UNION ALL" in sql
+        assert "FROM loan_applications_archive" in sql
+        assert "AS history \nWHERE history.user_id =" in sql
+        assert "(history.created_at, history.id) <" in sql
+
+    def test_archive_active_applications(self, compile_pg):
+        """Тест: архивируется только активная часть заявок пользователя"""
+        stmt = archive_active_applications(1)
+        sql = str(compile_pg(stmt))
+
+        assert stmt.is_update
+        assert sql.startswith("UPDATE loan_applications SET is_archived=")
+        assert "loan_applications.is_archived = false" in sql
+
+    def test_score_history_buckets(self, compile_pg):
+        """Тест: история сжимается по интервалам и ограничена диапазоном времени"""
+        sql = str(compile_pg(score_history_buckets(1, datetime(2024, 1, 1), datetime(2025, 1, 1), "week")))
+
+        assert "date_trunc(" in sql
+        assert "score_history.recorded_at >=" in sql
+        assert "score_history.recorded_at <" in sql
+        assert "GROUP BY bucket ORDER BY bucket" in sql
+
+    def test_score_history_unknown_bucket(self):
+        """Тест: неизвестный интервал отклоняется"""
+        with pytest.raises(ValueError):
+            score_history_buckets(1, datetime(2024, 1, 1), datetime(2025, 1, 1), "year")
+
+    def test_application_offers(self, compile_pg):
+        """Тест: предложения заявки - одобренные по ставке, только по заявке пользователя (в т.ч. архивной)"""
+        first = application_offers(1, 10)
+        second = application_offers(2, 20)
+        sql = str(compile_pg(first))
+
+        assert first._generate_cache_key().key == second._generate_cache_key().key
+        assert "ORDER BY bank_offers.status, bank_offers.annual_rate" in sql
+        assert "loan_applications.user_id =" in sql
+        assert "loan_applications_archive.user_id =" in sql
+
+    def test_bank_offers_by_time(self, compile_pg):
+        """Тест: ответы банка за период от новых к старым с ограничением"""
+        sql = str(compile_pg(bank_offers_by_time("kapitalbank", datetime(2024, 1, 1), datetime(2024, 1, 2), 100)))
+
+        assert "bank_offers.bank_code =" in sql
+        assert "bank_offers.received_at >=" in sql
+        assert "ORDER BY bank_offers.received_at DESC" in sql
+        assert "LIMIT" in sql
@@ -0,0 +1,159 @@
+from types import SimpleNamespace
+
+import pytest
+from aiogram.types import Update
+from fakeredis.aioredis import FakeRedis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.bot.dispatcher import create_dispatcher
+from src.bot.middleware import rate_limit
+from src.bot.middleware.fsm import BufferedFSMContextMiddleware
+from src.bot.middleware.i18n import I18nMiddleware
+from src.bot.middleware.rate_limit import RATE_LIMIT_FALLBACKS, GCRA, RateLimitMiddleware
+
+
+class TestGCRA:
+    """Тесты GCRA"""
+
+    def test_burst_then_rate(self):
+        """Тест: limit событий проходят сразу, дальше - по одному через period / limit"""
+        limiter = GCRA(limit=3, period=60)
+
+        assert [limiter.hit(1, now=0) for _ in range(3)] == [0, 0, 0]
+        assert limiter.hit(1, now=0) == pytest.approx(20)
+        assert limiter.hit(1, now=19) > 0
+        assert limiter.hit(1, now=20) == 0
+
+    def test_keys_are_independent(self):
+        """Тест: лимит считается по каждому ключу отдельно"""
+        limiter = GCRA(limit=1, period=60)
+
+        assert limiter.hit(1, now=0) == 0
+        assert limiter.hit(2, now=0) == 0
+        assert limiter.hit(1, now=0) > 0
+
+    def test_rejected_event_is_not_counted(self):
+        """Тест: отклоненные события не отодвигают время следующего"""
+        limiter = GCRA(limit=1, period=60)
+        limiter.hit(1, now=0)
+
+        for _ in range(100):
+            limiter.hit(1, now=30)
+
+        assert limiter.hit(1, now=60) == 0
+
+    def test_sweep_keeps_active_keys(self, monkeypatch):
+        """Тест: чистка удаляет только ключи, для которых лимит уже не действует"""
+        monkeypatch.setattr(rate_limit, "SWEEP_MIN_SIZE", 4)
+        limiter = GCRA(limit=2, period=60)
+        for key in range(3):
+            limiter.hit(key, now=0)
+
+        limiter.hit("active", now=100)
+        limiter.hit("active", now=100)
+
+        assert len(limiter) == 1
+        assert limiter.hit("active", now=100) > 0
+
+
+def message(user_id, text="hi"):
+    return SimpleNamespace(from_user=SimpleNamespace(id=user_id), text=text)
+
+
+async def deliver(middleware, events):
+    """Прогон событий через middleware: (обработанные тексты, предупреждения)"""
+    handled, warned = [], []
+
+    async def handler(event, data):
+        handled.append(event.text)
+
+    async def warn(event, limit_type):
+        warned.append(limit_type)
+
+    middleware._send_limit_message = warn
+    for event in events:
+        await middleware(handler, event, {})
+    return handled, warned
+
+
+class BrokenRedis(FakeRedis):
+    """Недоступный Redis"""
+
+    async def evalsha(self, *args, **kwargs):
+        raise RedisConnectionError("Connection refused")
+
+
+class TestRateLimitMiddleware:
+    """Тесты ограничения входящих обновлений"""
+
+    @pytest.fixture(autouse=True)
+    def plain_message(self, monkeypatch):
+        monkeypatch.setattr(rate_limit, "Message", SimpleNamespace)
+
+    async def test_limits(self):
+        """Тест: сверх лимита обновление не доходит до обработчика, команды считаются отдельно"""
+        middleware = RateLimitMiddleware(messages_per_minute=2, commands_per_minute=1)
+
+        handled, warned = await deliver(middleware, [message(1, text) for text in ("a", "b", "c", "/start", "/start")])
+
+        assert handled == ["a", "b", "/start"]
+        assert warned == ["сообщений", "команд"]
+
+    async def test_redis_shared_between_processes(self):
+        """Тест: с Redis лимит общий для middleware разных процессов"""
+        pytest.importorskip("lupa")
+        redis = FakeRedis()
+        first = RateLimitMiddleware(messages_per_minute=2, redis=redis)
+        second = RateLimitMiddleware(messages_per_minute=2, redis=redis)
+
+        handled_first, _ = await deliver(first, [message(1, "a")])
+        handled_second, warned = await deliver(second, [message(1, "b"), message(1, "c"), message(2, "d")])
+
+        assert handled_first + handled_second == ["a", "b", "d"]
+        assert warned == ["сообщений"]
+        # Ключ живет, пока лимит действует
+        ttl = await redis.pttl("ratelimit:SimpleNamespace:message:1")
+        assert 0 < ttl <= 60_000
+        await redis.aclose()
+
+    async def test_redis_fallback(self):
+        """Тест: без Redis лимит считается в процессе, Redis не опрашивается до паузы"""
+        redis = BrokenRedis()
+        middleware = RateLimitMiddleware(messages_per_minute=2, redis=redis)
+        fallbacks = RATE_LIMIT_FALLBACKS._value.get()
+
+        handled, warned = await deliver(middleware, [message(1, text) for text in "abc"])
+
+        assert handled == ["a", "b"]
+        assert warned == ["сообщений"]
+        assert RATE_LIMIT_FALLBACKS._value.get() - fallbacks == 3
+        assert middleware._redis_retry_at > 0
+        await redis.aclose()
+
+    def test_runs_first(self):
+        """Тест: лимит проверяется раньше FSM-хранилища и I18nMiddleware"""
+        dp = create_dispatcher()
+
+        outer = [type(m) for m in dp.update.outer_middleware._middlewares]
+        assert outer.index(RateLimitMiddleware) < outer.index(BufferedFSMContextMiddleware)
+        for observer in (dp.message, dp.callback_query):
+            assert I18nMiddleware in [type(m) for m in observer.middleware._middlewares]
+
+    async def test_update_level(self):
+        """Тест: на уровне обновления лимит считается по сообщению, обработчик получает обновление"""
+        middleware = RateLimitMiddleware(messages_per_minute=1)
+        received = []
+
+        async def handler(event, data):
+            received.append(event)
+
+        async def warn(event, limit_type):
+            pass
+
+        middleware._send_limit_message = warn
+        updates = [Update.model_construct(update_id=i, message=message(1, "a"), callback_query=None) for i in range(2)]
+        other = Update.model_construct(update_id=2, message=None, callback_query=None)
+        for update in (*updates, other):
+            await middleware(handler, update, {})
+
+        assert received == [updates[0], other]
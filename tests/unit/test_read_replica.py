@@ -0,0 +1,126 @@
+import pytest
+from contextlib import asynccontextmanager
+from sqlalchemy import Column, Integer, create_engine, update
+from sqlalchemy.orm import Session, declarative_base
+
+from src.db import database
+from src.db.database import current_telegram_id, get_read_db_context, has_recent_write, mark_recent_write
+
+LocalBase = declarative_base()
+
+
+class Item(LocalBase):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer)
+
+
+@pytest.fixture
+def sqlite_session():
+    """Синхронная сессия SQLite: события Session те же, что и у AsyncSession"""
+    engine = create_engine("sqlite://")
+    LocalBase.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clear_writers():
+    database._recent_writers.clear()
+    yield
+    database._recent_writers.clear()
+
+
+class TestReadYourWrites:
+    """Тесты маркера недавней записи"""
+
+    def test_mark_recent_write(self):
+        """Тест: пометка пользователя"""
+        assert not has_recent_write(1)
+        mark_recent_write(1)
+        assert has_recent_write(1)
+        assert not has_recent_write(2)
+
+    def test_commit_with_changes_marks_current_user(self, sqlite_session):
+        """Тест: коммит с изменениями помечает пользователя обновления"""
+        token = current_telegram_id.set(100)
+        try:
+            sqlite_session.add(Item(value=1))
+            sqlite_session.commit()
+        finally:
+            current_telegram_id.reset(token)
+
+        assert has_recent_write(100)
+
+    def test_bulk_update_marks_current_user(self, sqlite_session):
+        """Тест: UPDATE через execute тоже считается записью"""
+        token = current_telegram_id.set(200)
+        try:
+            sqlite_session.execute(update(Item).values(value=2))
+            sqlite_session.commit()
+        finally:
+            current_telegram_id.reset(token)
+
+        assert has_recent_write(200)
+
+    def test_read_only_commit_does_not_mark(self, sqlite_session):
+        """Тест: коммит без изменений не помечает пользователя"""
+        token = current_telegram_id.set(300)
+        try:
+            sqlite_session.query(Item).all()
+            sqlite_session.commit()
+        finally:
+            current_telegram_id.reset(token)
+
+        assert not has_recent_write(300)
+
+    def test_rollback_does_not_mark(self, sqlite_session):
+        """Тест: откаченная запись не помечает пользователя"""
+        token = current_telegram_id.set(400)
+        try:
+            sqlite_session.add(Item(value=1))
+            sqlite_session.flush()
+            sqlite_session.rollback()
+            sqlite_session.commit()
+        finally:
+            current_telegram_id.reset(token)
+
+        assert not has_recent_write(400)
+
+
+class TestReadRouting:
+    """Тесты маршрутизации чтений между репликой и primary"""
+
+    @pytest.fixture
+    def makers(self, monkeypatch):
+        def make(name):
+            @asynccontextmanager
+            async def maker():
+                yield name
+            return maker
+
+        monkeypatch.setattr(database, "async_session_maker", make("primary"))
+        monkeypatch.setattr(database, "replica_session_maker", make("replica"))
+
+    async def test_reads_go_to_replica(self, makers):
+        """Тест: по умолчанию чтение идет на реплику"""
+        async with get_read_db_context(1) as session:
+            assert session == "replica"
+
+    async def test_recent_writer_reads_primary(self, makers):
+        """Тест: недавно писавший пользователь читает с primary"""
+        mark_recent_write(1)
+        async with get_read_db_context(1) as session:
+            assert session == "primary"
+
+    async def test_user_taken_from_context(self, makers):
+        """Тест: пользователь берется из текущего обновления"""
+        mark_recent_write(5)
+        token = current_telegram_id.set(5)
+        try:
+            async with get_read_db_context() as session:
+                assert session == "primary"
+        finally:
+            current_telegram_id.reset(token)
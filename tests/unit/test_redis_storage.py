@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from fakeredis.aioredis import FakeRedis
+
+from src.bot.states import LoanApplicationStates
+from src.bot.storage import codec
+from src.bot.storage.redis import RedisStorage
+
+KEY = StorageKey(bot_id=1, chat_id=10, user_id=10)
+
+
+class TestMsgpackCodec:
+    """Тесты msgpack-кодирования данных FSM"""
+
+    def test_decimal_roundtrip(self):
+        """Тест: Decimal сохраняет тип и точность"""
+        data = {"amount": Decimal("1500000.50"), "term_months": 12, "loan_type": "microloan"}
+
+        assert codec.unpackb(codec.packb(data)) == data
+        assert isinstance(codec.unpackb(codec.packb(data))["amount"], Decimal)
+
+    def test_more_compact_than_json(self):
+        """Тест: msgpack компактнее JSON для типичных данных заявки"""
+        data = {"amount": Decimal("1500000"), "rate": Decimal("24.5"), "term_months": 12, "loan_type": "microloan"}
+
+        assert len(codec.packb(data)) < len(codec.dumps(data).encode())
+
+
+class TestRedisStorage:
+    """Тесты FSM-хранилища в Redis"""
+
+    @pytest.fixture
+    async def redis(self):
+        redis = FakeRedis()
+        yield redis
+        await redis.aclose()
+
+    async def test_state_and_data(self, redis):
+        """Тест: состояние и данные хранятся независимо"""
+        storage = RedisStorage(redis, ttl=60)
+        await storage.set_data(KEY, {"amount": Decimal("100")})
+        await storage.set_state(KEY, LoanApplicationStates.entering_rate)
+
+        assert await storage.get_state(KEY) == LoanApplicationStates.entering_rate.state
+        assert await storage.get_data(KEY) == {"amount": Decimal("100")}
+
+    async def test_idle_flow_expires(self, redis):
+        """Тест: каждое обращение продлевает TTL диалога"""
+        storage = RedisStorage(redis, ttl=60)
+        await storage.set_state(KEY, "LoanApplicationStates:entering_amount")
+        await redis.expire("fsm:1:10:10", 5)
+        await storage.get_data(KEY)
+
+        assert 55 < await redis.ttl("fsm:1:10:10") <= 60
+
+    async def test_clear_removes_key(self, redis):
+        """Тест: очищенный диалог не занимает место в Redis"""
+        storage = RedisStorage(redis, ttl=60)
+        await storage.set_record(KEY, "LoanApplicationStates:entering_amount", {"amount": Decimal("1")})
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+
+        assert await redis.exists("fsm:1:10:10") == 0
+        record = await storage.get_record(KEY)
+        assert record.state is None and record.data == {}
+
+    async def test_shared_between_workers(self, redis):
+        """Тест: процессы бота видят состояние друг друга"""
+        await RedisStorage(redis, ttl=60).update_data(KEY, {"rate": Decimal("24")})
+
+        assert await RedisStorage(redis, ttl=60).get_data(KEY) == {"rate": Decimal("24")}
@@ -0,0 +1,147 @@
+import asyncio
+
+from aiogram.types import Update
+
+from src.bot.scheduler import UPDATES_REJECTED, UpdateScheduler, update_chat_key
+
+
+def message_update(update_id, chat_id):
+    chat = {"id": chat_id, "type": "private"}
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {"message_id": update_id, "date": 0, "chat": chat, "from": {"id": chat_id, "is_bot": False, "first_name": "U"}, "text": "x"},
+    })
+
+
+def callback_update(update_id, chat_id, data="confirm_send"):
+    user = {"id": chat_id, "is_bot": False, "first_name": "U"}
+    return Update.model_validate({
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": "1",
+            "data": data,
+            "message": {"message_id": 1, "date": 0, "chat": {"id": chat_id, "type": "private"}, "text": "x"},
+        },
+    })
+
+
+class RecordingDispatcher:
+    """Диспетчер, отмечающий начало и конец обработки каждого обновления"""
+
+    def __init__(self, delay=0.01, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.events = []
+        self.running = 0
+        self.max_running = 0
+
+    async def feed_update(self, bot, update):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.events.append(("start", update.update_id))
+        try:
+            await asyncio.sleep(self.delay)
+            if update.update_id == self.fail_on:
+                raise RuntimeError("handler error")
+        finally:
+            self.events.append(("end", update.update_id))
+            self.running -= 1
+
+
+def rejected(reason):
+    return UPDATES_REJECTED.labels(reason)._value.get()
+
+
+class TestUpdateChatKey:
+    """Тесты ключа очереди"""
+
+    def test_message_and_callback_share_chat(self):
+        """Тест: сообщение и нажатие кнопки одного чата попадают в одну очередь"""
+        assert update_chat_key(message_update(1, 10)) == update_chat_key(callback_update(2, 10))
+        assert update_chat_key(message_update(1, 10)) != update_chat_key(message_update(2, 11))
+
+    def test_update_without_chat(self):
+        """Тест: обновление без чата и пользователя не упорядочивается с другими"""
+        first = update_chat_key(Update(update_id=1))
+        second = update_chat_key(Update(update_id=2))
+
+        assert first != second
+
+
+class TestUpdateScheduler:
+    """Тесты планировщика обновлений"""
+
+    async def test_chat_updates_are_sequential(self):
+        """Тест: двойное нажатие confirm_send обрабатывается строго после первого"""
+        dispatcher = RecordingDispatcher()
+        scheduler = UpdateScheduler(None, dispatcher, workers=4, queue_size=10, chat_queue_size=5)
+        scheduler.start_workers()
+
+        scheduler.submit(callback_update(1, 10))
+        scheduler.submit(callback_update(2, 10))
+        scheduler.submit(message_update(3, 10))
+        await scheduler.stop_workers(drain_seconds=1)
+
+        assert dispatcher.events == [
+            ("start", 1), ("end", 1), ("start", 2), ("end", 2), ("start", 3), ("end", 3),
+        ]
+
+    async def test_chats_run_in_parallel(self):
+        """Тест: разные чаты обрабатываются одновременно, не больше workers"""
+        dispatcher = RecordingDispatcher(delay=0.05)
+        scheduler = UpdateScheduler(None, dispatcher, workers=3, queue_size=20, chat_queue_size=5)
+        scheduler.start_workers()
+
+        for update_id in range(6):
+            scheduler.submit(message_update(update_id, 100 + update_id))
+        await scheduler.stop_workers(drain_seconds=1)
+
+        assert dispatcher.max_running == 3
+        assert len(dispatcher.events) == 12
+
+    async def test_error_does_not_block_chat(self):
+        """Тест: ошибка обработчика не останавливает очередь чата"""
+        dispatcher = RecordingDispatcher(fail_on=1)
+        scheduler = UpdateScheduler(None, dispatcher, workers=1, queue_size=10, chat_queue_size=5)
+        scheduler.start_workers()
+
+        scheduler.submit(message_update(1, 10))
+        scheduler.submit(message_update(2, 10))
+        await scheduler.stop_workers(drain_seconds=1)
+
+        assert ("end", 2) in dispatcher.events
+        assert len(scheduler) == 0
+
+    async def test_queue_limits(self):
+        """Тест: общий лимит и лимит чата отклоняют обновления с учетом в метриках"""
+        scheduler = UpdateScheduler(None, RecordingDispatcher(), workers=1, queue_size=3, chat_queue_size=2)
+        chat_full = rejected("chat_queue_full")
+        queue_full = rejected("queue_full")
+
+        assert scheduler.submit(message_update(1, 10))
+        assert scheduler.submit(message_update(2, 10))
+        assert not scheduler.submit(message_update(3, 10))
+        assert scheduler.submit(message_update(4, 11))
+        assert not scheduler.submit(message_update(5, 12))
+
+        assert len(scheduler) == 3
+        assert rejected("chat_queue_full") == chat_full + 1
+        assert rejected("queue_full") == queue_full + 1
+
+    async def test_put_waits_for_space(self):
+        """Тест: put при полной очереди ждет, пока обработчик освободит место"""
+        dispatcher = RecordingDispatcher()
+        scheduler = UpdateScheduler(None, dispatcher, workers=1, queue_size=1, chat_queue_size=5)
+        scheduler.submit(message_update(1, 10))
+
+        waiting = asyncio.create_task(scheduler.put(message_update(2, 11)))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        scheduler.start_workers()
+        assert await asyncio.wait_for(waiting, 1)
+        await scheduler.stop_workers(drain_seconds=1)
+
+        assert [e for e in dispatcher.events if e[0] == "end"] == [("end", 1), ("end", 2)]
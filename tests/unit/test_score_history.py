@@ -0,0 +1,200 @@
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import Optional
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.core.scoring import ScoringCalculator
+from src.db import score_history
+from src.db.score_history import (
+    ScoreHistoryWriter, ensure_partitions, month_start, move_from_default_ddl, next_month, partition_ddl,
+    partition_name,
+)
+
+
+class TestPartitions:
+    """Тесты месячных секций истории баллов"""
+
+    def test_partition_bounds(self):
+        """Тест: секция покрывает ровно один месяц"""
+        ddl = partition_ddl(date(2024, 3, 1))
+
+        assert "score_history_y2024m03 PARTITION OF score_history" in ddl
+        assert "FROM ('2024-03-01') TO ('2024-04-01')" in ddl
+
+    def test_year_boundary(self):
+        """Тест: декабрьская секция заканчивается в январе следующего года"""
+        assert next_month(date(2024, 12, 1)) == date(2025, 1, 1)
+        assert partition_name(date(2024, 12, 1)) == "score_history_y2024m12"
+
+
+class FakeSession:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.rows = []
+
+    async def execute(self, stmt, rows):
+        if self.fail:
+            raise ConnectionError("database is down")
+        self.rows.extend(rows)
+
+
+class TestScoreHistoryWriter:
+    """Тесты отложенной записи истории баллов"""
+
+    @pytest.fixture
+    def session(self, monkeypatch):
+        session = FakeSession()
+
+        @asynccontextmanager
+        async def context():
+            yield session
+
+        async def no_partitions():
+            pass
+
+        monkeypatch.setattr(score_history, "get_db_context", context)
+        monkeypatch.setattr(score_history, "ensure_partitions", no_partitions)
+        return session
+
+    async def test_record_is_buffered(self, session):
+        """Тест: запись точки не обращается к базе до сброса буфера"""
+        writer = ScoreHistoryWriter()
+        writer.record(1, 700, 0b101, datetime(2024, 1, 1))
+
+        assert session.rows == []
+        assert await writer.flush() == 1
+        assert session.rows == [{
+            "user_id": 1,
+            "recorded_at": datetime(2024, 1, 1),
+            "score": 700,
+            "rules_version": ScoringCalculator.RULES_VERSION,
+            "rules_mask": 0b101,
+        }]
+        assert len(writer) == 0
+
+    async def test_failed_flush_keeps_points(self, session):
+        """Тест: при ошибке базы точки остаются в буфере в исходном порядке"""
+        writer = ScoreHistoryWriter()
+        writer.record(1, 600, 0)
+        session.fail = True
+
+        with pytest.raises(ConnectionError):
+            await writer.flush()
+        writer.record(1, 650, 0)
+
+        session.fail = False
+        await writer.flush()
+        assert [row["score"] for row in session.rows] == [600, 650]
+
+    async def test_buffer_is_bounded(self, session, monkeypatch):
+        """Тест: переполненный буфер отбрасывает самые старые точки"""
+        monkeypatch.setattr(score_history.settings, "score_history_max_buffer", 2)
+        writer = ScoreHistoryWriter()
+        for score in (600, 610, 620):
+            writer.record(1, score, 0)
+
+        assert writer.dropped == 1
+        await writer.flush()
+        assert [row["score"] for row in session.rows] == [610, 620]
+
+
+class CheckViolation(Exception):
+    sqlstate = "23514"
+
+
+class DDLSession:
+    def __init__(self, fail_on: Optional[date] = None, move_fails: bool = False):
+        self.fail_on = fail_on
+        self.move_fails = move_fails
+        self.statements = []
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        # Секцию месяца нельзя создать, пока секция по умолчанию присоединена
+        detached = bool(self.statements) and "DETACH" in self.statements[-1]
+        if self.fail_on and sql == partition_ddl(self.fail_on) and (self.move_fails or not detached):
+            raise DBAPIError(sql, None, CheckViolation())
+        self.statements.append(sql)
+
+
+class TestEnsurePartitions:
+    """Тесты создания секций поверх строк в секции по умолчанию"""
+
+    @pytest.fixture
+    def session(self, monkeypatch):
+        session = DDLSession()
+
+        @asynccontextmanager
+        async def context():
+            yield session
+
+        monkeypatch.setattr(score_history, "get_db_context", context)
+        return session
+
+    async def test_rows_moved_from_default(self, session):
+        """Тест: строки месяца из секции по умолчанию переносятся в новую секцию"""
+        month = next_month(month_start(datetime.utcnow()))
+        session.fail_on = month
+
+        await ensure_partitions(months_ahead=2)
+
+        assert session.statements == [
+            partition_ddl(month_start(datetime.utcnow())),
+            *move_from_default_ddl(month),
+            partition_ddl(next_month(month)),
+        ]
+
+    async def test_failed_move_does_not_fail(self, session):
+        """Тест: неудачный перенос пропускает месяц, но не останавливает остальные секции"""
+        month = month_start(datetime.utcnow())
+        session.fail_on = month
+        session.move_fails = True
+
+        await ensure_partitions(months_ahead=1)
+
+        assert session.statements[-1] == partition_ddl(next_month(month))
+
+
+class TestEnsurePartitionsDatabase:
+    """Тесты секций на настоящей базе (TEST_DATABASE_URL)"""
+
+    async def test_rows_moved_from_default(self, pg_engine, monkeypatch):
+        """Тест: строка будущего месяца в секции по умолчанию не мешает создать его секцию"""
+        session_maker = async_sessionmaker(pg_engine)
+
+        @asynccontextmanager
+        async def context():
+            async with session_maker() as session:
+                try:
+                    yield session
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+
+        monkeypatch.setattr(score_history, "get_db_context", context)
+        month = next_month(month_start(datetime.utcnow()))
+        recorded_at = datetime(month.year, month.month, 15)
+
+        async with context() as db:
+            await db.execute(
+                text("INSERT INTO score_history VALUES (1, :at, 700, 1, 0)"), {"at": recorded_at},
+            )
+
+        await ensure_partitions(months_ahead=1)
+
+        async with context() as db:
+            in_month = await db.execute(text(f"SELECT count(*) FROM {partition_name(month)}"))
+            in_default = await db.execute(text("SELECT count(*) FROM score_history_default"))
+            default = await db.execute(text(
+                "SELECT partition_bound FROM (SELECT pg_get_expr(relpartbound, oid) AS partition_bound "
+                "FROM pg_class WHERE relname = 'score_history_default' "
+                "AND relnamespace = current_schema()::regnamespace) AS bounds"
+            ))
+            assert in_month.scalar() == 1
+            assert in_default.scalar() == 0
+            assert default.scalar() == "DEFAULT"
@@ -208,4 +208,39 @@ class TestScoringCalculator:
         assert "670" in message
         assert "Хороший" in message
         assert "✅" in message
-        assert "+70" in message
\ No newline at end of file
+        assert "+70" in message
+
+
+class TestMatchedRules:
+    """Тесты битовой маски сработавших правил"""
+
+    def test_empty_data(self):
+        """Тест: без данных правила не срабатывают"""
+        assert ScoringCalculator.get_matched_rules(PersonalData()) == 0
+
+    def test_mask_matches_breakdown(self):
+        """Тест: маска содержит те же правила, что и детализация"""
+        data = PersonalData(
+            age=40,
+            gender=Gender.FEMALE,
+            education=Education.HIGHER,
+            has_other_loans=True,
+            pdn_with_other_loans=Decimal("30"),
+            device_type=DeviceType.APPLE,
+        )
+        mask = ScoringCalculator.get_matched_rules(data)
+        rules = ScoringCalculator.rules_from_mask(mask)
+
+        assert rules == ["age", "gender", "education", "other_loans_ok", "device"]
+        descriptions = {c["name"] for c in ScoringCalculator.get_score_breakdown(data)["components"]}
+        assert descriptions == {ScoringCalculator.SCORING_WEIGHTS[r]["description"] for r in rules}
+
+    def test_other_loans_need_flag(self):
+        """Тест: ПДН с другими кредитами учитывается только при наличии кредитов"""
+        data = PersonalData(has_other_loans=False, pdn_with_other_loans=Decimal("30"))
+        assert ScoringCalculator.get_matched_rules(data) == 0
+
+    def test_mask_fits_column(self):
+        """Тест: все правила помещаются в маску истории баллов"""
+        assert len(ScoringCalculator.SCORING_WEIGHTS) < 31
+
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+
+from src.bot.middleware.send_limit import (
+    SEND_RETRIES,
+    SendLimitMiddleware,
+    SendPriority,
+    TokenBucket,
+    send_as,
+)
+
+
+class FakeApi:
+    """make_request, запоминающий отправки и отвечающий 429 заданное число раз"""
+
+    def __init__(self, flood=0, retry_after=0):
+        self.sent = []
+        self.flood = flood
+        self.retry_after = retry_after
+
+    async def __call__(self, bot, method):
+        if self.flood:
+            self.flood -= 1
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=self.retry_after)
+        self.sent.append(getattr(method, "text", None))
+        return "ok"
+
+
+def send(chat_id, text="x"):
+    return SendMessage(chat_id=chat_id, text=text)
+
+
+class TestTokenBucket:
+    """Тесты token bucket"""
+
+    def test_burst_then_rate(self):
+        """Тест: capacity токенов сразу, дальше - ожидание по rate"""
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+    def test_block(self):
+        """Тест: после 429 токен появляется не раньше retry_after"""
+        bucket = TokenBucket(rate=10, capacity=5)
+        bucket.block(2)
+
+        assert bucket.delay() == pytest.approx(2, abs=0.01)
+
+
+class TestSendLimitMiddleware:
+    """Тесты ограничения исходящих сообщений"""
+
+    async def test_chat_limit(self):
+        """Тест: сообщения в один чат растягиваются по chat_rate, другие чаты не ждут"""
+        api = FakeApi()
+        middleware = SendLimitMiddleware(global_rate=1000, chat_rate=20, chat_burst=1)
+
+        started = time.monotonic()
+        await asyncio.gather(*(middleware(api, None, send(1)) for _ in range(3)))
+        one_chat = time.monotonic() - started
+
+        started = time.monotonic()
+        await asyncio.gather(*(middleware(api, None, send(chat_id)) for chat_id in range(10, 13)))
+        many_chats = time.monotonic() - started
+
+        assert one_chat >= 0.09
+        assert many_chats < 0.05
+        assert len(api.sent) == 6
+
+    async def test_interactive_ahead_of_bulk(self):
+        """Тест: ответ пользователю обгоняет ожидающую рассылку"""
+        api = FakeApi()
+        middleware = SendLimitMiddleware(global_rate=50, chat_rate=1000, chat_burst=100)
+        middleware.bucket = TokenBucket(rate=50, capacity=1)
+
+        async def bulk(index):
+            with send_as(SendPriority.BULK):
+                await middleware(api, None, send(100 + index, f"bulk{index}"))
+
+        tasks = [asyncio.create_task(bulk(index)) for index in range(4)]
+        await asyncio.sleep(0)
+        await middleware(api, None, send(1, "reply"))
+        await asyncio.gather(*tasks)
+
+        assert api.sent.index("reply") <= 1
+        assert sorted(api.sent) == ["bulk0", "bulk1", "bulk2", "bulk3", "reply"]
+
+    async def test_retry_after(self):
+        """Тест: после 429 сообщение отправляется повторно, а не теряется"""
+        api = FakeApi(flood=2)
+        middleware = SendLimitMiddleware(global_rate=1000, chat_rate=1000, chat_burst=10, max_retries=3)
+        retries = SEND_RETRIES._value.get()
+
+        assert await middleware(api, None, send(1)) == "ok"
+        assert api.sent == ["x"]
+        assert SEND_RETRIES._value.get() == retries + 2
+
+    async def test_retries_exhausted(self):
+        """Тест: исчерпав повторы, ошибка 429 передается вызывающему"""
+        api = FakeApi(flood=5)
+        middleware = SendLimitMiddleware(global_rate=1000, chat_rate=1000, chat_burst=10, max_retries=1)
+
+        with pytest.raises(TelegramRetryAfter):
+            await middleware(api, None, send(1))
+        assert api.sent == []
+
+    async def test_unlimited_methods_pass(self):
+        """Тест: методы без чата (answerCallbackQuery) не ждут токенов"""
+        api = FakeApi()
+        middleware = SendLimitMiddleware(global_rate=1000, chat_rate=1, chat_burst=1)
+        middleware.bucket.block(60)
+
+        await asyncio.wait_for(middleware(api, None, AnswerCallbackQuery(callback_query_id="1")), 0.1)
+        assert api.sent == [None]
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from collections import Counter
+
+from aiogram.types import Update
+
+from src.bot import shards
+from src.bot.shards import ShardRouter, shard_of, update_shard
+
+
+def message_update(update_id, user_id, chat_id=None):
+    user = {"id": user_id, "is_bot": False, "first_name": "U"}
+    chat = {"id": user_id, "type": "private"} if chat_id is None else {"id": chat_id, "type": "group"}
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {"message_id": update_id, "date": 0, "chat": chat, "from": user, "text": "x"},
+    })
+
+
+class TestShardOf:
+    """Тесты распределения пользователей по процессам"""
+
+    def test_stable_and_in_range(self):
+        """Тест: пользователь всегда попадает в один процесс из N"""
+        for telegram_id in (1, 42, 5_000_000_000, -100123):
+            assert shard_of(telegram_id, 4) == shard_of(telegram_id, 4)
+            assert 0 <= shard_of(telegram_id, 4) < 4
+
+    def test_distribution(self):
+        """Тест: последовательные telegram_id распределяются равномерно"""
+        counts = Counter(shard_of(telegram_id, 4) for telegram_id in range(100_000, 140_000))
+
+        assert min(counts.values()) > 9_000
+
+    def test_update_shard_by_user(self):
+        """Тест: обновления пользователя идут в его процесс"""
+        assert update_shard(message_update(1, 777), 8) == shard_of(777, 8)
+
+    def test_group_chat_in_one_shard(self):
+        """Тест: обновления группы от разных пользователей идут в процесс чата, как очередь планировщика"""
+        shards_of_group = {update_shard(message_update(i, 1000 + i, chat_id=-100500), 8) for i in range(20)}
+
+        assert shards_of_group == {shard_of(-100500, 8)}
+
+
+class TestShardRouter:
+    """Тесты передачи обновлений процессам"""
+
+    async def test_routes_updates_in_order(self, tmp_path, monkeypatch):
+        """Тест: каждый процесс получает обновления своих пользователей по порядку"""
+        monkeypatch.setattr(shards.settings, "bot_shard_socket_dir", str(tmp_path))
+        received = {0: [], 1: []}
+
+        def handler(index):
+            async def handle(reader, writer):
+                async for line in reader:
+                    received[index].append(Update.model_validate_json(line))
+            return handle
+
+        servers = [
+            await asyncio.start_unix_server(handler(index), shards.shard_socket_path(index))
+            for index in range(2)
+        ]
+        router = ShardRouter(shards=2)
+        await router.start()
+
+        updates = [message_update(update_id, 1000 + update_id % 5) for update_id in range(20)]
+        for update in updates[:10]:
+            assert router.submit(update)
+        for update in updates[10:]:
+            assert await router.put(update)
+        await router.stop()
+        await asyncio.sleep(0.05)
+        for server in servers:
+            server.close()
+
+        for index in range(2):
+            expected = [u.update_id for u in updates if shard_of(u.message.from_user.id, 2) == index]
+            assert [u.update_id for u in received[index]] == expected
+        assert received[0][0].message.text == "x"
+
+    async def test_reconnects_to_restarted_worker(self, tmp_path, monkeypatch):
+        """Тест: после падения процесса фронт переподключается к перезапущенному"""
+        monkeypatch.setattr(shards.settings, "bot_shard_socket_dir", str(tmp_path))
+        received = []
+        connections = []
+
+        async def handle(reader, writer):
+            connections.append(writer)
+            async for line in reader:
+                received.append(Update.model_validate_json(line).update_id)
+
+        path = shards.shard_socket_path(0)
+        server = await asyncio.start_unix_server(handle, path)
+        router = ShardRouter(shards=1)
+        await router.start()
+        assert router.submit(message_update(1, 1))
+        await asyncio.sleep(0.05)
+
+        # Процесс упал: сокет закрыт, новый процесс открывает его заново
+        server.close()
+        connections[0].close()
+        await asyncio.sleep(0.05)
+        assert not router.submit(message_update(2, 1))
+        server = await asyncio.start_unix_server(handle, path)
+
+        assert await router.put(message_update(3, 1))
+        assert router.submit(message_update(4, 1))
+        await router.stop()
+        await asyncio.sleep(0.05)
+        server.close()
+
+        assert received == [1, 3, 4]
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.updates = []
+
+    async def put(self, update):
+        if update.update_id == 13:
+            raise RuntimeError("scheduler is broken")
+        self.updates.append(update.update_id)
+        return True
+
+
+class TestShardWorker:
+    """Тесты процесса бота"""
+
+    async def test_bad_lines_are_skipped(self):
+        """Тест: неразбираемое, слишком длинное или упавшее обновление не закрывает соединение"""
+        reader = asyncio.StreamReader(limit=1024)
+        scheduler = FakeScheduler()
+        for line in (
+            message_update(1, 1).model_dump_json(exclude_unset=True),
+            "not json",
+            "x" * 5000,
+            message_update(13, 1).model_dump_json(exclude_unset=True),
+            message_update(2, 1).model_dump_json(exclude_unset=True),
+        ):
+            reader.feed_data(line.encode() + b"\n")
+        reader.feed_eof()
+
+        await shards.read_updates(reader, bot=None, scheduler=scheduler)
+
+        assert scheduler.updates == [1, 2]
+
+
+class FakeProcess:
+    def __init__(self, index, alive=True):
+        self.name = f"bot-shard-{index}"
+        self.exitcode = None if alive else 1
+        self.alive = alive
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+
+class TestShardSupervisor:
+    """Тесты перезапуска процессов бота"""
+
+    def test_dead_process_is_restarted(self, monkeypatch):
+        """Тест: упавший процесс заменяется новым с тем же номером"""
+        monkeypatch.setattr(shards, "SHARD_SUPERVISE_SECONDS", 0.01)
+        monkeypatch.setattr(shards.settings, "bot_workers", 2)
+        started = []
+
+        def start_shard(index):
+            started.append(index)
+            # Первый запуск процесса 1 сразу падает
+            return FakeProcess(index, alive=started.count(1) != 1 or index != 1)
+
+        monkeypatch.setattr(shards, "_start_shard", start_shard)
+        processes = shards.start_shards()
+        for _ in range(100):
+            if started.count(1) == 2:
+                break
+            time.sleep(0.01)
+        shards.stop_shards(processes)
+
+        assert started[:3] == [0, 1, 1]
+        assert len(processes) == 2
+        assert not shards._supervisor.is_alive()
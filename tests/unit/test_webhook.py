@@ -0,0 +1,82 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api import webhook
+from src.api.webhook import WebhookIngestion
+from src.bot.scheduler import UpdateScheduler
+
+SECRET = "s3cret"
+
+
+def update_json(update_id):
+    return {"update_id": update_id}
+
+
+def make_client(monkeypatch, queue_size=10):
+    monkeypatch.setattr(webhook.settings, "webhook_secret", SECRET)
+    app = FastAPI()
+    app.include_router(webhook.router)
+    # Обработчики не запущены: обновления остаются в очереди
+    scheduler = UpdateScheduler(bot=None, dispatcher=None, workers=1, queue_size=queue_size)
+    app.state.webhook = WebhookIngestion(bot=None, scheduler=scheduler, allowed_updates=[])
+    return TestClient(app), scheduler
+
+
+class TestWebhookEndpoint:
+    """Тесты эндпоинта webhook"""
+
+    def post(self, client, secret=SECRET, token=SECRET, update_id=1):
+        headers = {"X-Telegram-Bot-Api-Secret-Token": token} if token else {}
+        return client.post(f"/webhook/{secret}", json=update_json(update_id), headers=headers)
+
+    def test_update_is_queued(self, monkeypatch):
+        """Тест: обновление сразу подтверждается и попадает в очередь"""
+        client, scheduler = make_client(monkeypatch)
+
+        response = self.post(client)
+
+        assert response.status_code == 200
+        assert len(scheduler) == 1
+
+    def test_wrong_path_secret(self, monkeypatch):
+        """Тест: неверный секрет в пути - 404, обновление не принимается"""
+        client, scheduler = make_client(monkeypatch)
+
+        assert self.post(client, secret="wrong").status_code == 404
+        assert len(scheduler) == 0
+
+    def test_wrong_header_token(self, monkeypatch):
+        """Тест: без верного заголовка X-Telegram-Bot-Api-Secret-Token - 403"""
+        client, scheduler = make_client(monkeypatch)
+
+        assert self.post(client, token=None).status_code == 403
+        assert self.post(client, token="wrong").status_code == 403
+        assert len(scheduler) == 0
+
+    def test_disabled_webhook(self, monkeypatch):
+        """Тест: без запущенного приема эндпоинта нет"""
+        client, _ = make_client(monkeypatch)
+        client.app.state.webhook = None
+
+        assert self.post(client).status_code == 404
+
+    def test_malformed_update(self, monkeypatch):
+        """Тест: неразбираемое обновление подтверждается 200, чтобы Telegram не повторял его"""
+        client, scheduler = make_client(monkeypatch)
+        headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+
+        for body in ({"update_id": "not a number"}, {"message": {}}):
+            response = client.post(f"/webhook/{SECRET}", json=body, headers=headers)
+            assert response.status_code == 200
+            assert response.json() == {"status": "ignored"}
+        response = client.post(f"/webhook/{SECRET}", content=b"{not json", headers=headers)
+        assert response.status_code == 200
+        assert len(scheduler) == 0
+
+    def test_full_queue(self, monkeypatch):
+        """Тест: при переполненной очереди - 503, Telegram повторит доставку"""
+        client, scheduler = make_client(monkeypatch, queue_size=2)
+
+        assert [self.post(client, update_id=i).status_code for i in range(3)] == [200, 200, 503]
+        assert len(scheduler) == 2
+